@@ -0,0 +1 @@
+# Performance benchmarks for the engine, agents, training and tournament
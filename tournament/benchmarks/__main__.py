@@ -0,0 +1,66 @@
+"""
+Benchmark runner
+================
+Ejecutar desde el directorio `tournament`:
+
+    python -m benchmarks                      # corre todo y compara con baseline.json
+    python -m benchmarks --only mcts_act      # solo algunos benchmarks
+    python -m benchmarks --update-baseline    # guarda los resultados como nuevo baseline
+    python -m benchmarks --runs 1             # una sola pasada (más rápido, más ruido)
+
+Cada benchmark se repite `--runs` veces (en pasadas intercaladas) y se compara
+la mejor repetición. Termina con
+código 1 si alguna métrica empeora más que su tolerancia (la propia de las
+micro-métricas más ruidosas o `--tolerance`).
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import bench_agents, bench_engine, bench_runs, bench_solver, bench_startup  # noqa: F401  (register benchmarks)
+from benchmarks.harness import BASELINE_PATH, BENCHMARKS, compare, load_json, run, write_json
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Connect 4 performance benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks a ejecutar")
+    parser.add_argument("--output", default="benchmarks/results/latest.json", help="Archivo JSON de resultados")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline contra el que se compara")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Empeoramiento relativo permitido antes de fallar (0.25 = 25%%)")
+    parser.add_argument("--runs", type=int, default=3, help="Repeticiones de cada benchmark (se usa la mejor)")
+    parser.add_argument("--update-baseline", action="store_true", help="Guardar los resultados como baseline")
+    args = parser.parse_args()
+
+    current = run(args.only, args.runs)
+    write_json(args.output, current)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.update_baseline:
+        baseline = load_json(args.baseline) or {"results": {}}
+        baseline.update({k: v for k, v in current.items() if k != "results"})
+        baseline["results"].update(current["results"])
+        write_json(args.baseline, baseline)
+        print(f"Baseline actualizado en {args.baseline}")
+        return 0
+
+    baseline = load_json(args.baseline)
+    if baseline is None:
+        print(f"No existe baseline en {args.baseline}; ejecutar con --update-baseline")
+        return 0
+
+    regressions = compare(current, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regresión(es) por encima de la tolerancia ({args.tolerance:.0%} por defecto):")
+        for line in regressions:
+            print(f"   {line}")
+        return 1
+    print(f"\n✅ Sin regresiones (tolerancia {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
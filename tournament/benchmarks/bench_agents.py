@@ -0,0 +1,198 @@
+"""Per-move cost of the built-in agents"""
+
+import random
+import time
+
+import numpy as np
+
+from connect4 import bitboard as bb
+from connect4.base_policy import Policy
+from connect4.batch import play_batch
+from connect4.policy import MCTSAgent
+from learning.q_learning_agent import QLearningAgent
+
+from .bench_engine import random_positions
+from .harness import Metric, benchmark, rate, seed_everything
+
+
+@benchmark("mcts_act")
+def bench_mcts_act() -> dict[str, Metric]:
+    random.seed(1)
+    positions = random_positions(5, min_moves=6, max_moves=14)
+    agent = MCTSAgent(iterations=100)
+    agent.mount()
+
+    def search():
+        seed_everything()
+        total, iterations = 0.0, 0
+        for state in positions:
+            start = time.perf_counter()
+            agent.act(state.board)
+            total += time.perf_counter() - start
+            iterations += agent.get_search_stats()["iterations"]
+        return total, iterations
+
+    total, iterations = min(search() for _ in range(3))
+    return {
+        "latency_ms": Metric(total / len(positions) * 1e3, "ms/move", higher_is_better=False),
+        "iterations_per_s": Metric(iterations / total if total > 0 else 0.0, "it/s"),
+    }
+
+
+@benchmark("q_learning")
+def bench_q_learning() -> dict[str, Metric]:
+    random.seed(2)
+    positions = random_positions(500)
+    agent = QLearningAgent(epsilon=0.0)
+    for state in positions:
+        key = agent.get_state_key(state.board)
+        for col in state.get_free_cols():
+            agent.q_table[(key, col)] = random.random()
+
+    boards = [state.board for state in positions]
+    nexts = [state.transition(state.get_free_cols()[0]).board for state in positions]
+    next_valid = [[c for c in range(7) if b[0][c] == 0] for b in nexts]
+
+    def acts():
+        for board in boards:
+            agent.act(board)
+
+    def updates():
+        for board, nxt, valid in zip(boards, nexts, next_valid):
+            agent.update(board, 3, 0.5, nxt, valid)
+
+    stack = np.array(boards)
+
+    def act_batch():
+        agent.act_batch(stack)
+
+    next_stack = np.array(nexts)
+    columns, rewards, dones = np.full(len(boards), 3), np.full(len(boards), 0.5), np.zeros(len(boards), dtype=bool)
+
+    def update_batch():
+        agent.update_batch(stack, columns, rewards, next_stack, dones)
+
+    return {
+        "act_per_s": Metric(rate(len(boards), acts), "ops/s"),
+        "act_batch_per_s": Metric(rate(len(boards), act_batch), "ops/s"),
+        "update_per_s": Metric(rate(len(boards), updates), "ops/s"),
+        "update_batch_per_s": Metric(rate(len(boards), update_batch), "ops/s"),
+    }
+
+
+class _RandomPolicy(Policy):
+    """Uniform random mover with a vectorized `act_batch`."""
+
+    def act(self, board):
+        return int(np.random.choice(np.flatnonzero(board[0] == 0)))
+
+    def act_batch(self, boards):
+        scores = np.random.rand(boards.shape[0], boards.shape[2])
+        scores[boards[:, 0, :] != 0] = -1.0
+        return scores.argmax(axis=1)
+
+
+class _Unbatched(Policy):
+    """Hides a policy's `act_batch`, so the runner falls back to one `act` call per position."""
+
+    def __init__(self, policy):
+        self.policy = policy
+
+    def act(self, board):
+        return self.policy.act(board)
+
+
+@benchmark("batched_games")
+def bench_batched_games() -> dict[str, Metric]:
+    """Random-vs-random games through `play_batch`, with vectorized and per-position `act`."""
+    games = 1000
+    seed_everything()
+    batched = play_batch(_RandomPolicy(), _RandomPolicy(), games)["games_per_second"]
+    seed_everything()
+    looped = play_batch(_Unbatched(_RandomPolicy()), _Unbatched(_RandomPolicy()), games)["games_per_second"]
+    return {
+        "batched_games_per_s": Metric(batched, "games/s"),
+        "looped_games_per_s": Metric(looped, "games/s"),
+    }
+
+
+@benchmark("mcts_tactical")
+def bench_mcts_tactical() -> dict[str, Metric]:
+    """Iterations MCTSAgent needs before a forced win three plies deep is proven."""
+    position, mask, _ = bb.from_moves("4433")
+    board = bb.to_array(position, mask, -1)
+    agent = MCTSAgent(iterations=2000)
+    seed_everything()
+    agent.act(board)
+    return {"iterations_to_solve": Metric(agent.get_search_stats()["iterations"], "it", higher_is_better=False)}
+
+
+@benchmark("mcts_rave")
+def bench_mcts_rave() -> dict[str, Metric]:
+    """RAVE at a quarter of the default iteration budget (its strength is checked with the evaluation tools)."""
+    random.seed(1)
+    positions = random_positions(5, min_moves=6, max_moves=14)
+    agent = MCTSAgent(iterations=100, rave=True)
+
+    def search():
+        seed_everything()
+        start = time.perf_counter()
+        for state in positions:
+            agent.act(state.board)
+        return time.perf_counter() - start
+
+    total = min(search() for _ in range(3))
+    return {"latency_ms": Metric(total / len(positions) * 1e3, "ms/move", higher_is_better=False)}
+
+
+@benchmark("mcts_ponder")
+def bench_mcts_ponder() -> dict[str, Metric]:
+    """Move latency of MCTSAgent against an opponent that thinks 0.3 s per move, with and without pondering."""
+    from connect4.connect_state import ConnectState
+
+    def play(ponder):
+        seed_everything()
+        agent = MCTSAgent(iterations=100, ponder=ponder, ponder_budget=1.0)
+        agent.mount()
+        state, total, moves, reused = ConnectState(), 0.0, 0, 0
+        while not state.is_final() and moves < 6:
+            if state.player == -1:
+                start = time.perf_counter()
+                col = agent.act(state.view())
+                total += time.perf_counter() - start
+                moves += 1
+                reused += agent.get_search_stats().get("reused_visits", 0)
+            else:
+                time.sleep(0.3)  # the opponent's thinking time
+                col = random.choice(state.get_free_cols())
+            state = state.transition(col)
+        agent.close()
+        return total / moves * 1e3, reused / moves
+
+    plain_ms, _ = play(False)
+    ponder_ms, reused = play(True)
+    return {
+        "latency_ms": Metric(plain_ms, "ms/move", higher_is_better=False),
+        "ponder_latency_ms": Metric(ponder_ms, "ms/move", higher_is_better=False),
+        "reused_visits": Metric(reused, "visits/move", tolerance=0.75),  # depends on thread scheduling
+    }
+
+
+@benchmark("mcts_memory")
+def bench_mcts_memory() -> dict[str, Metric]:
+    """Peak tree size and traced allocations of one search, unbounded and with a node budget."""
+    import tracemalloc
+
+    position, mask, _ = bb.from_moves("4435")
+    board = bb.to_array(position, mask, -1)
+    metrics = {}
+    for label, max_nodes in (("unbounded", None), ("bounded", 50)):
+        agent = MCTSAgent(iterations=200, max_nodes=max_nodes)
+        seed_everything()
+        tracemalloc.start()
+        agent.act(board)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        metrics[f"{label}_peak_nodes"] = Metric(agent.get_search_stats()["peak_nodes"], "nodes", higher_is_better=False)
+        metrics[f"{label}_peak_kb"] = Metric(peak / 1024, "KB", higher_is_better=False)
+    return metrics
@@ -0,0 +1,42 @@
+"""ConnectState throughput"""
+
+import random
+
+from connect4.connect_state import ConnectState
+
+from .harness import Metric, benchmark, rate
+
+
+def random_positions(count: int, min_moves: int = 4, max_moves: int = 30) -> list[ConnectState]:
+    """Non-final positions reached by random play (seed the RNG before calling)."""
+    positions = []
+    while len(positions) < count:
+        state = ConnectState()
+        for _ in range(random.randint(min_moves, max_moves)):
+            if state.is_final():
+                break
+            state = state.transition(random.choice(state.get_free_cols()))
+        if not state.is_final():
+            positions.append(state)
+    return positions
+
+
+@benchmark("connect_state")
+def bench_connect_state() -> dict[str, Metric]:
+    random.seed(0)
+    positions = random_positions(200)
+    moves = [random.choice(p.get_free_cols()) for p in positions]
+
+    def transitions():
+        for state, col in zip(positions, moves):
+            state.transition(col)
+
+    def winners():
+        for state in positions:
+            state.get_winner()
+
+    # A few milliseconds per repeat: scheduler noise alone moves these by 40%
+    return {
+        "transition_per_s": Metric(rate(len(positions), transitions), "ops/s", tolerance=0.5),
+        "get_winner_per_s": Metric(rate(len(positions), winners), "ops/s", tolerance=0.5),
+    }
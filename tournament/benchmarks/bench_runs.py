@@ -0,0 +1,107 @@
+"""End-to-end training and knockout tournament throughput, and bracket simulation"""
+
+import contextlib
+import io
+import os
+import tempfile
+import time
+from functools import partial
+
+import numpy as np
+
+from bracket_odds import simulate_brackets
+from connect4.policy import MCTSAgent
+from learning.opponent_cache import CachedOpponent
+from tournament import play, run_tournament
+from train_agent import TrainingEnvironment
+
+from .harness import Metric, benchmark, seed_everything
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """Run inside a temporary working directory with quiet stdout (runs write models/ and versus/)."""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "versus"))
+        os.chdir(tmp)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                yield tmp
+        finally:
+            os.chdir(cwd)
+
+
+@benchmark("training")
+def bench_training() -> dict[str, Metric]:
+    episodes = 200
+    seed_everything()
+    with scratch_dir():
+        start = time.perf_counter()
+        TrainingEnvironment().train_q_learning(episodes=episodes, save_freq=episodes + 1, opponents=["random"])
+        elapsed = time.perf_counter() - start
+    return {"episodes_per_s": Metric(episodes / elapsed, "episodes/s")}
+
+
+@benchmark("training_mcts_opponent")
+def bench_training_mcts() -> dict[str, Metric]:
+    """
+    Training episodes against the MCTS opponent with and without the memoized opponent cache.
+
+    Measured at steady state: the Q agent is first trained against the random
+    opponent down to its minimum epsilon, and the cache is warmed up with
+    `warmup` episodes before its `episodes` timed ones (early episodes at
+    epsilon near 1 are almost all cache misses and say little about a real run).
+    """
+    episodes, warmup = 20, 30
+    env = TrainingEnvironment()
+    seed_everything()
+    with scratch_dir():
+        q_agent, _ = env.train_q_learning(episodes=500, save_freq=501, opponents=["random"])
+
+    def episodes_per_s(opponent, n: int) -> float:
+        start = time.perf_counter()
+        for episode in range(n):
+            if episode % 2:
+                env.play_game(q_agent, opponent)
+            else:
+                env.play_game(opponent, q_agent)
+        return n / (time.perf_counter() - start)
+
+    seed_everything()
+    uncached = episodes_per_s(MCTSAgent(iterations=25), episodes)
+    seed_everything()
+    memo = CachedOpponent(MCTSAgent(iterations=25))
+    episodes_per_s(memo, warmup)
+    memo.hits = memo.misses = memo.refreshes = 0
+    cached = episodes_per_s(memo, episodes)
+    return {
+        "uncached_episodes_per_s": Metric(uncached, "episodes/s"),
+        "cached_episodes_per_s": Metric(cached, "episodes/s"),
+        "speedup": Metric(cached / uncached, "x"),
+        "hit_rate": Metric(memo.hit_rate, "hits/lookup"),
+    }
+
+
+@benchmark("knockout_tournament")
+def bench_knockout() -> dict[str, Metric]:
+    players = [(f"MCTS-{n}", partial(MCTSAgent, iterations=n)) for n in (5, 10, 15, 20, 25)]
+    seed_everything()
+    with scratch_dir():
+        start = time.perf_counter()
+        run_tournament(players, play, best_of=3, shuffle=True)
+        elapsed = time.perf_counter() - start
+    return {"wall_time_s": Metric(elapsed, "s", higher_is_better=False)}
+
+
+@benchmark("bracket_simulation")
+def bench_bracket_simulation() -> dict[str, Metric]:
+    """Monte Carlo knockout brackets for 13 (BYEs) and 64 players."""
+    simulations = 1_000_000
+    metrics = {}
+    for n in (13, 64):
+        matrix = np.random.default_rng(0).random((n, n))
+        start = time.perf_counter()
+        simulate_brackets(matrix, simulations, seed=0)
+        metrics[f"brackets_per_s_{n}"] = Metric(simulations / (time.perf_counter() - start), "brackets/s")
+    return metrics
@@ -0,0 +1,36 @@
+"""NegamaxAgent search speed on fixed test positions"""
+
+import time
+
+from connect4 import bitboard as bb
+from connect4.solver import NegamaxAgent
+
+from .harness import Metric, benchmark
+
+# Move strings (1-based columns) covering opening, middlegame and tactical positions
+TEST_POSITIONS = {
+    "opening": "4453",
+    "stacked_center": "44444",
+    "open_three": "4433",
+    "middlegame": "4455321676",
+    "crowded": "22171272272443677337",
+    "late": "243134223143755157741335",
+}
+DEPTH = 7
+
+
+@benchmark("negamax")
+def bench_negamax() -> dict[str, Metric]:
+    nodes = 0
+    elapsed = 0.0
+    for moves in TEST_POSITIONS.values():
+        agent = NegamaxAgent()
+        position, mask, _ = bb.from_moves(moves)
+        start = time.perf_counter()
+        agent.search(position, mask, DEPTH)
+        elapsed += time.perf_counter() - start
+        nodes += agent.nodes
+    return {
+        "nodes_per_s": Metric(nodes / elapsed, "nodes/s", tolerance=0.4),  # one timed search, ±20% between runs
+        "nodes": Metric(nodes, "nodes", higher_is_better=False),
+    }
@@ -0,0 +1,48 @@
+"""Import time of the headless entry points, measured with `python -X importtime`"""
+
+import os
+import subprocess
+import sys
+
+from .harness import Metric, benchmark
+
+TOURNAMENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules every worker process and headless run imports, and their import budget (ms)
+TARGETS = {
+    "connect_state": ("connect4.connect_state", 250.0),
+    "tournament": ("tournament", 300.0),
+    "formats": ("formats", 300.0),
+}
+# Plotting and validation libraries must only load on first use (`show()`, `Match.model_dump*`)
+HEAVY = ("matplotlib", "pydantic")
+
+
+def import_times(module: str) -> dict[str, float]:
+    """Cumulative import time in ms of every module loaded by a fresh `import module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=TOURNAMENT_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e3
+    return times
+
+
+@benchmark("import_time")
+def bench_import_time() -> dict[str, Metric]:
+    metrics = {}
+    heavy = set()
+    for name, (module, budget) in TARGETS.items():
+        runs = [import_times(module) for _ in range(3)]
+        # The budget is the real limit: a ~100 ms subprocess varies by 30% from one run to the next
+        metrics[f"{name}_ms"] = Metric(min(run[module] for run in runs), "ms", higher_is_better=False, budget=budget,
+                                       tolerance=0.5)
+        heavy |= {m for m in runs[0] if m.split(".")[0] in HEAVY}
+    metrics["heavy_modules"] = Metric(len(heavy), "modules", higher_is_better=False, budget=0)
+    return metrics
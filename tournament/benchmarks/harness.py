@@ -0,0 +1,158 @@
+"""Benchmark registry, timing helpers and baseline comparison"""
+
+import json
+import os
+import platform
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+SEED = 911
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+@dataclass
+class Metric:
+    value: float
+    unit: str
+    higher_is_better: bool = True
+    budget: float | None = None  # absolute limit, checked even without a baseline
+    tolerance: float | None = None  # allowed relative worsening, instead of the runner's default
+
+
+BENCHMARKS: dict[str, Callable[[], dict[str, Metric]]] = {}
+SINGLE_RUN: set[str] = set()
+
+
+def benchmark(name: str, repeat: bool = True):
+    """
+    Register a function returning a dict of metric name -> `Metric`.
+
+    With `repeat=False` the benchmark runs in the first pass only: for
+    results that do not depend on timing (fixed seeds and iteration
+    budgets), further runs would reproduce the same values.
+    """
+
+    def decorator(fn):
+        BENCHMARKS[name] = fn
+        if not repeat:
+            SINGLE_RUN.add(name)
+        return fn
+
+    return decorator
+
+
+def seed_everything(seed: int = SEED) -> None:
+    random.seed(seed)
+    np.random.seed(seed)
+
+
+def best_of(fn: Callable[[], float], repeats: int = 3) -> float:
+    """Smallest elapsed time of `repeats` runs of `fn` (which returns its own elapsed time)."""
+    return min(fn() for _ in range(repeats))
+
+
+def rate(count: int, fn: Callable[[], None], repeats: int = 3) -> float:
+    """Operations per second of `fn`, which performs `count` operations, over the best repeat."""
+
+    def timed():
+        seed_everything()
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    elapsed = best_of(timed, repeats)
+    return count / elapsed if elapsed > 0 else float("inf")
+
+
+def run(names: list[str] | None = None, runs: int = 3) -> dict:
+    """
+    Run the registered benchmarks (or only `names`) `runs` times each.
+
+    Runs are interleaved (every benchmark once per pass), so a transient
+    slowdown of the machine spoils one sample of a few benchmarks rather
+    than every sample of one. Interference only ever makes a run slower, so
+    every metric reports its best run, along with the `samples` of all runs
+    and their `spread` (range relative to the best).
+    """
+    selected = {name: fn for name, fn in BENCHMARKS.items() if not names or name in names}
+    samples: dict[str, list[Metric]] = {}
+    for run_index in range(runs):
+        for name, fn in selected.items():
+            if run_index and name in SINGLE_RUN:
+                continue
+            print(f"▶ {name} ({run_index + 1}/{runs})")
+            seed_everything()
+            for metric, m in fn().items():
+                samples.setdefault(f"{name}.{metric}", []).append(m)
+
+    results = {}
+    print()
+    for key, ms in samples.items():
+        m = ms[0]
+        values = [x.value for x in ms]
+        value = max(values) if m.higher_is_better else min(values)
+        spread = (max(values) - min(values)) / abs(value) if value else 0.0
+        results[key] = {"value": value, "unit": m.unit, "higher_is_better": m.higher_is_better, "spread": spread,
+                        "samples": values}
+        if m.budget is not None:
+            results[key]["budget"] = m.budget
+        if m.tolerance is not None:
+            results[key]["tolerance"] = m.tolerance
+        print(f"   {key:<48} {value:>14.3f} {m.unit}  (±{spread / 2:.0%})")
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": SEED,
+        "runs": runs,
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    Compare results against a baseline.
+
+    A metric regresses when it is worse than its baseline value by more than
+    its own tolerance, if it declares one, or else `tolerance` (a fraction,
+    e.g. 0.25 = 25%), or when it is on the wrong side of its budget. Metrics
+    missing from the baseline are only checked against their budget.
+
+    Returns
+    -------
+    list[str]
+        Human readable description of every regression found.
+    """
+    regressions = []
+    for key, cur in current["results"].items():
+        budget = cur.get("budget")
+        if budget is not None and (cur["value"] < budget if cur["higher_is_better"] else cur["value"] > budget):
+            regressions.append(f"{key}: {cur['value']:.3f} {cur['unit']} exceeds budget {budget:.3f}")
+        base = baseline.get("results", {}).get(key)
+        if base is None or base["value"] == 0:
+            continue
+        change = (cur["value"] - base["value"]) / base["value"]
+        worse = -change if cur["higher_is_better"] else change
+        if worse > cur.get("tolerance", tolerance):
+            regressions.append(
+                f"{key}: {cur['value']:.3f} {cur['unit']} vs baseline {base['value']:.3f} ({change:+.1%})"
+            )
+    return regressions
+
+
+def load_json(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_json(path: str, data: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
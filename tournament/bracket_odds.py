@@ -0,0 +1,240 @@
+"""
+Championship probabilities of a knockout tournament, by Monte Carlo.
+
+A single `run_tournament` call crowns one champion out of many likely
+ones: the shuffle seed decides the bracket and every match is a noisy
+best-of-N. Instead of replaying the knockout, this module
+
+1. estimates the per-game win / draw / loss rates of every pairing from
+   the stored matches (`versus/*.json`, then the match cache), playing
+   only the pairings that have no result yet;
+2. turns them into the probability that the first-listed player wins a
+   best-of-N match under the rules of `play_match` (first to
+   `best_of // 2 + 1` wins, stop after `games_to_win + 5` draws, ties go
+   to the second-listed player);
+3. simulates millions of brackets at once with NumPy: seedings are
+   random permutations placed in the slots of `make_initial_matches`
+   (same BYE positions), and each round draws every match of every
+   bracket with one comparison against the probability matrix.
+
+Stored matches are used as they are: after changing an agent, remove its
+matches (or pass `archive=None` and rely on the match cache, whose keys
+include the code).
+"""
+
+import functools
+import glob
+import json
+import os
+import time
+
+import numpy as np
+
+from connect4.dtos import Participant
+from connect4.match_cache import MatchCache
+from formats import play_pairings
+from tournament import make_initial_matches
+
+# Pseudo-games added to every pairing: one win and one loss, so a pairing
+# with few games is pulled towards an even match
+PRIOR_GAMES = 2
+
+
+def archived_results(names: list[str], archive: str = "versus") -> np.ndarray:
+    """
+    Per-game (wins, draws, losses) of row vs column from the match files in `archive`.
+
+    Only matches between two of `names` are counted; both orders of a
+    pairing add to the same cells.
+    """
+    index = {name: i for i, name in enumerate(names)}
+    counts = np.zeros((len(names), len(names), 3), dtype=np.int64)
+    for path in sorted(glob.glob(os.path.join(archive, "*.json"))):
+        try:
+            with open(path) as f:
+                match = json.load(f)
+            a, b = index.get(match["player_a"]), index.get(match["player_b"])
+            record = match["player_a_wins"], match["draws"], match["player_b_wins"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            continue
+        if a is None or b is None or a == b:
+            continue
+        add_record(counts, a, b, record)
+    return counts
+
+
+def add_record(counts: np.ndarray, a: int, b: int, record: tuple[int, int, int]) -> None:
+    """Add the (wins, draws, losses) of `a` in a match against `b` to `counts`."""
+    wins, draws, losses = record
+    counts[a, b] += (wins, draws, losses)
+    counts[b, a] += (losses, draws, wins)
+
+
+def game_probabilities(counts: np.ndarray, prior_games: float = PRIOR_GAMES) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Smoothed per-game win, draw and loss probabilities of row vs column."""
+    wins, draws, losses = (counts[..., k].astype(float) for k in range(3))
+    total = wins + draws + losses + prior_games
+    return (wins + prior_games / 2) / total, draws / total, (losses + prior_games / 2) / total
+
+
+def match_win_probability(win: np.ndarray, draw: np.ndarray, loss: np.ndarray, best_of: int) -> np.ndarray:
+    """
+    Probability that the first-listed player wins a best-of-N match, elementwise.
+
+    Exact for the stopping and tie-breaking rules of `play_match`, given
+    independent games with the given outcome probabilities.
+    """
+    games_to_win = best_of // 2 + 1
+    max_draws = games_to_win + 5
+
+    @functools.lru_cache(maxsize=None)
+    def value(a_wins: int, b_wins: int, draws: int):
+        if a_wins == games_to_win:
+            return 1.0
+        if b_wins == games_to_win:
+            return 0.0
+        if draws >= max_draws:
+            if a_wins == b_wins == 0:
+                return 0.5  # coin flip
+            return 1.0 if a_wins > b_wins else 0.0
+        return (win * value(a_wins + 1, b_wins, draws)
+                + draw * value(a_wins, b_wins, draws + 1)
+                + loss * value(a_wins, b_wins + 1, draws))
+
+    return np.broadcast_to(value(0, 0, 0), np.shape(win)).astype(float)
+
+
+def estimate_win_matrix(
+    players: list[Participant],
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+    archive: str | None = "versus",
+    cache: MatchCache | None = None,
+    play_missing: bool = True,
+    workers: int = 1,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Match win probabilities between all players, and the game counts behind them.
+
+    `matrix[i, j]` is the probability that player i beats player j when
+    listed first. Pairings without a stored result are played once with
+    `play_pairings` (through `cache`, so the next estimate reuses them);
+    with `play_missing=False` they are left as even matches.
+    """
+    names = [name for name, _ in players]
+    counts = archived_results(names, archive) if archive else np.zeros((len(names), len(names), 3), dtype=np.int64)
+    missing = [(i, j) for i in range(len(players)) for j in range(i + 1, len(players)) if not counts[i, j].any()]
+    if missing and play_missing:
+        print(f"Jugando {len(missing)} de {len(players) * (len(players) - 1) // 2} enfrentamientos sin resultados")
+        pool = None
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pairings = [(players[i], players[j]) for i, j in missing]
+            for (i, j), match in zip(missing, play_pairings(pairings, best_of, first_player_distribution, seed, pool,
+                                                            cache=cache)):
+                add_record(counts, i, j, (match.player_a_wins, match.draws, match.player_b_wins))
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+    matrix = match_win_probability(*game_probabilities(counts), best_of)
+    np.fill_diagonal(matrix, 0.5)
+    return matrix, counts
+
+
+def bracket_template(n_players: int) -> np.ndarray:
+    """First-round slots of `make_initial_matches` for seeds 0..n-1 (-1 is a BYE)."""
+    versus = make_initial_matches(list(range(n_players)), shuffle=False, seed=0)
+    return np.array([-1 if p is None else p for pair in versus for p in pair], dtype=np.int32)
+
+
+def simulate_brackets(
+    matrix: np.ndarray,
+    simulations: int = 1_000_000,
+    shuffle: bool = True,
+    seed: int = 911,
+    chunk_elements: int = 1 << 22,
+) -> np.ndarray:
+    """
+    Championship count of every player over `simulations` knockout brackets.
+
+    Each bracket seeds the players with a fresh random permutation (or in
+    list order with `shuffle=False`) and draws the winner of every match
+    from `matrix`. BYEs only occur in the first round, where their pairs
+    advance without a draw. Brackets are simulated in chunks of about
+    `chunk_elements` slots to bound memory.
+    """
+    n = matrix.shape[0]
+    champions = np.zeros(n, dtype=np.int64)
+    if n == 1:
+        champions[0] = simulations
+        return champions
+    rng = np.random.default_rng(seed)
+    template = bracket_template(n)
+    first, second = template[0::2], template[1::2]
+    played = (first >= 0) & (second >= 0)
+    walkover = np.where(first >= 0, first, second)[~played]  # pairs with a BYE: the player advances
+    probability = matrix.astype(np.float32).ravel()
+    rows = max(1, chunk_elements // template.size)
+
+    def winners(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        a_wins = rng.random(a.shape, dtype=np.float32) < probability[a * n + b]
+        return np.where(a_wins, a, b)
+
+    for start in range(0, simulations, rows):
+        m = min(rows, simulations - start)
+        if shuffle:
+            order = np.argsort(rng.random((m, n), dtype=np.float32), axis=1).astype(np.int32)
+        else:
+            order = np.broadcast_to(np.arange(n, dtype=np.int32), (m, n))
+        slots = np.empty((m, played.size), dtype=np.int32)
+        slots[:, ~played] = order[:, walkover]
+        slots[:, played] = winners(order[:, first[played]], order[:, second[played]])
+        while slots.shape[1] > 1:
+            slots = winners(slots[:, 0::2], slots[:, 1::2])
+        champions += np.bincount(slots[:, 0], minlength=n)
+    return champions
+
+
+def championship_odds(
+    players: list[Participant],
+    simulations: int = 1_000_000,
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+    shuffle: bool = True,
+    archive: str | None = "versus",
+    cache: MatchCache | None = None,
+    play_missing: bool = True,
+    workers: int = 1,
+) -> list[dict]:
+    """
+    Estimate the win matrix, simulate the brackets and return one row per player.
+
+    Rows hold the championship probability and its standard error, the
+    games behind the player's estimates, and are sorted by probability.
+    """
+    matrix, counts = estimate_win_matrix(players, best_of, first_player_distribution, seed, archive, cache,
+                                         play_missing, workers)
+    start = time.perf_counter()
+    champions = simulate_brackets(matrix, simulations, shuffle, seed)
+    elapsed = time.perf_counter() - start
+    print(f"{simulations} torneos simulados en {elapsed:.2f}s ({simulations / elapsed:.0f} torneos/s)")
+
+    probability = champions / simulations
+    rows = [{
+        "name": name,
+        "probability": float(probability[i]),
+        "stderr": float(np.sqrt(probability[i] * (1 - probability[i]) / simulations)),
+        "games": int(counts[i].sum()),
+    } for i, (name, _) in enumerate(players)]
+    return sorted(rows, key=lambda r: (-r["probability"], r["name"]))
+
+
+def print_odds(rows: list[dict]) -> None:
+    print(f"{'#':>3}  {'Agente':<24} {'P(campeón)':>11} {'±':>7} {'partidas':>9}")
+    for rank, row in enumerate(rows, 1):
+        print(f"{rank:>3}  {row['name']:<24} {row['probability']:>10.2%} {row['stderr']:>7.2%} {row['games']:>9}")
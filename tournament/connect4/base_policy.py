@@ -1,5 +1,7 @@
 """Base Policy class for Connect 4 agents"""
 
+import numpy as np
+
 class Policy:
     """Base class for Connect 4 policies/agents"""
     
@@ -9,4 +11,16 @@ class Policy:
     
     def act(self, state):
         """Choose an action given a state"""
-        raise NotImplementedError("Subclasses must implement act method")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement act method")
+
+    def close(self):
+        """Release resources once the game is over (e.g. stop background search); the default does nothing"""
+        pass
+
+    def act_batch(self, boards: np.ndarray) -> np.ndarray:
+        """Choose an action for each board of a (N, 6, 7) stack; the default calls `act` on each one"""
+        return np.array([self.act(board) for board in boards], dtype=int)
+
+    def get_search_stats(self):
+        """Counters of the last `act` call (e.g. iterations, nodes), or None if not tracked"""
+        return None
\ No newline at end of file
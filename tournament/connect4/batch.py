@@ -0,0 +1,102 @@
+"""
+Many games at once, one `act_batch` call per agent and ply.
+
+All games of a batch advance in lockstep: at every ply the boards where
+the first agent is to move are stacked and sent to it as a single
+`act_batch` call, and likewise for the second agent. Moves are applied
+and wins detected with array operations over the whole stack, so agents
+with a vectorized `act_batch` (such as `QLearningAgent`)
+play thousands of games for the Python overhead of a few hundred calls.
+"""
+
+import time
+
+import numpy as np
+
+from connect4.base_policy import Policy
+
+ROWS, COLS = 6, 7
+P1, P2 = -1, 1
+
+
+def winners(boards: np.ndarray) -> np.ndarray:
+    """Winner (-1, 1 or 0) of every board of a (N, 6, 7) stack."""
+    result = np.zeros(boards.shape[0], dtype=int)
+    for player in (P1, P2):
+        m = boards == player
+        four = (
+            (m[:, :, :-3] & m[:, :, 1:-2] & m[:, :, 2:-1] & m[:, :, 3:]).any(axis=(1, 2))               # horizontal
+            | (m[:, :-3, :] & m[:, 1:-2, :] & m[:, 2:-1, :] & m[:, 3:, :]).any(axis=(1, 2))           # vertical
+            | (m[:, :-3, :-3] & m[:, 1:-2, 1:-2] & m[:, 2:-1, 2:-1] & m[:, 3:, 3:]).any(axis=(1, 2))   # diagonal \
+            | (m[:, 3:, :-3] & m[:, 2:-1, 1:-2] & m[:, 1:-2, 2:-1] & m[:, :-3, 3:]).any(axis=(1, 2))   # diagonal /
+        )
+        result[four] = player
+    return result
+
+
+def play_batch(
+    a: Policy,
+    b: Policy,
+    games: int,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+) -> dict:
+    """
+    Play `games` games between `a` and `b` and return the results.
+
+    Each agent is a single (mounted) policy instance shared by all games.
+    An illegal column loses the game for the agent that played it.
+
+    Returns
+    -------
+    dict
+        `results` (per game: 1 if `a` won, -1 if `b` won, 0 for a draw),
+        `a_wins`, `b_wins`, `draws`, `moves`, `elapsed` (seconds) and
+        `games_per_second`.
+    """
+    rng = np.random.default_rng(seed)
+    a_first = rng.random(games) < first_player_distribution
+    boards = np.zeros((games, ROWS, COLS), dtype=int)
+    outcome = np.zeros(games, dtype=int)  # winner colour, -1 / 1 / 0
+    active = np.ones(games, dtype=bool)
+    moves = 0
+    start = time.perf_counter()
+
+    for ply in range(ROWS * COLS):
+        colour = P1 if ply % 2 == 0 else P2
+        a_to_move = a_first if colour == P1 else ~a_first
+        for policy, turn in ((a, a_to_move), (b, ~a_to_move)):
+            idx = np.flatnonzero(active & turn)
+            if idx.size == 0:
+                continue
+            actions = np.asarray(policy.act_batch(boards[idx]), dtype=int)
+            moves += idx.size
+
+            legal = (actions >= 0) & (actions < COLS)
+            legal[legal] = boards[idx[legal], 0, actions[legal]] == 0
+            outcome[idx[~legal]] = -colour
+            active[idx[~legal]] = False
+
+            idx, actions = idx[legal], actions[legal]
+            # Lowest empty row of each chosen column
+            rows = (boards[idx, :, actions] == 0).sum(axis=1) - 1
+            boards[idx, rows, actions] = colour
+
+        done = active & (winners(boards) != 0)
+        outcome[done] = colour
+        active &= ~done
+        active &= (boards[:, 0, :] == 0).any(axis=1)
+        if not active.any():
+            break
+
+    elapsed = time.perf_counter() - start
+    results = np.where(outcome == 0, 0, np.where((outcome == P1) == a_first, 1, -1))
+    return {
+        "results": results,
+        "a_wins": int((results == 1).sum()),
+        "b_wins": int((results == -1).sum()),
+        "draws": int((results == 0).sum()),
+        "moves": moves,
+        "elapsed": elapsed,
+        "games_per_second": games / elapsed if elapsed > 0 else float("inf"),
+    }
@@ -0,0 +1,142 @@
+"""
+Bitboard representation of a Connect 4 position.
+
+Each column uses 7 bits (6 cells plus a sentinel bit on top), bit
+`col * 7 + row` with row 0 at the bottom. A position is described by two
+integers: `position`, the stones of the player to move, and `mask`, every
+stone on the board. `position + mask` is a unique key for the position.
+"""
+
+import numpy as np
+
+ROWS, COLS = 6, 7
+H1 = ROWS + 1
+EMPTY, P1, P2 = 0, -1, 1
+
+BOTTOM = sum(1 << (c * H1) for c in range(COLS))
+BOARD_MASK = BOTTOM * ((1 << ROWS) - 1)
+CENTER_ORDER = [3, 2, 4, 1, 5, 0, 6]
+
+
+def top_mask(col: int) -> int:
+    return 1 << (ROWS - 1 + col * H1)
+
+
+def bottom_mask(col: int) -> int:
+    return 1 << (col * H1)
+
+
+def column_mask(col: int) -> int:
+    return ((1 << ROWS) - 1) << (col * H1)
+
+
+def player_to_move(board: np.ndarray) -> int:
+    """P1 (-1) moves when both players have the same number of stones."""
+    return P1 if np.count_nonzero(board == P1) == np.count_nonzero(board == P2) else P2
+
+
+def from_array(board: np.ndarray, player: int | None = None) -> tuple[int, int]:
+    """(position, mask) of a (6, 7) board array with row 0 at the top."""
+    if player is None:
+        player = player_to_move(board)
+    position = 0
+    mask = 0
+    for c in range(COLS):
+        for r in range(ROWS):
+            cell = board[ROWS - 1 - r, c]
+            if cell != EMPTY:
+                bit = 1 << (c * H1 + r)
+                mask |= bit
+                if cell == player:
+                    position |= bit
+    return position, mask
+
+
+def from_moves(moves: str) -> tuple[int, int, int]:
+    """(position, mask, number of moves) from a string of 1-based columns, e.g. "4453"."""
+    position, mask = 0, 0
+    for n, ch in enumerate(moves):
+        col = int(ch) - 1
+        if not can_play(mask, col) or is_winning_move(position, mask, col):
+            raise ValueError(f"Invalid or final move {ch} at ply {n} of {moves}")
+        position, mask = play(position, mask, col)
+    return position, mask, len(moves)
+
+
+def to_array(position: int, mask: int, player: int) -> np.ndarray:
+    """Inverse of `from_array`: `player` is the colour of the stones in `position`."""
+    board = np.zeros((ROWS, COLS), dtype=int)
+    for c in range(COLS):
+        for r in range(ROWS):
+            bit = 1 << (c * H1 + r)
+            if mask & bit:
+                board[ROWS - 1 - r, c] = player if position & bit else -player
+    return board
+
+
+def key(position: int, mask: int) -> int:
+    return position + mask
+
+
+def can_play(mask: int, col: int) -> bool:
+    return (mask & top_mask(col)) == 0
+
+
+def play(position: int, mask: int, col: int) -> tuple[int, int]:
+    """Drop a stone for the player to move; returns the position from the opponent's point of view."""
+    return position ^ mask, mask | (mask + bottom_mask(col))
+
+
+def alignment(pos: int) -> bool:
+    """True if `pos` contains four in a row."""
+    # Horizontal
+    m = pos & (pos >> H1)
+    if m & (m >> (2 * H1)):
+        return True
+    # Diagonal 1
+    m = pos & (pos >> ROWS)
+    if m & (m >> (2 * ROWS)):
+        return True
+    # Diagonal 2
+    m = pos & (pos >> (H1 + 1))
+    if m & (m >> (2 * (H1 + 1))):
+        return True
+    # Vertical
+    m = pos & (pos >> 1)
+    if m & (m >> 2):
+        return True
+    return False
+
+
+def is_winning_move(position: int, mask: int, col: int) -> bool:
+    pos = position | ((mask + bottom_mask(col)) & column_mask(col))
+    return alignment(pos)
+
+
+def winning_positions(position: int, mask: int) -> int:
+    """Empty cells (free or not yet reachable) that would complete four in a row for `position`."""
+    # Vertical
+    r = (position << 1) & (position << 2) & (position << 3)
+
+    for shift in (H1, ROWS, H1 + 1):
+        # Both directions along each line
+        p = (position << shift) & (position << 2 * shift)
+        r |= p & (position << 3 * shift)
+        r |= p & (position >> shift)
+        p = (position >> shift) & (position >> 2 * shift)
+        r |= p & (position << shift)
+        r |= p & (position >> 3 * shift)
+
+    return r & (BOARD_MASK ^ mask)
+
+
+def popcount(x: int) -> int:
+    return bin(x).count("1")
+
+
+def mirror(bits: int) -> int:
+    """Reflect a bitboard left-right."""
+    out = 0
+    for c in range(COLS):
+        out |= ((bits >> (c * H1)) & ((1 << H1) - 1)) << ((COLS - 1 - c) * H1)
+    return out
@@ -2,24 +2,40 @@
 from connect4.environment_state import EnvironmentState
 
 # Types
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 # Libraries
 import numpy as np
-import matplotlib.pyplot as plt
+
+from connect4 import bitboard as bb
+from connect4.state_view import StateView
+
+if TYPE_CHECKING:
+    import matplotlib.pyplot as plt
 
 
 class ConnectState(EnvironmentState):
     ROWS = 6
     COLS = 7
 
-    def __init__(self, board: np.ndarray | None = None, player: int = -1):
+    def __init__(self, board: np.ndarray | None = None, player: int = -1, _derived: tuple | None = None):
         if board is None:
             self.board = np.zeros((self.ROWS, self.COLS), dtype=int)
         else:
             self.board = board.copy()
         self.player = player  # -1 = Red, 1 = Yellow type: ignore
 
+        # Kept up to date by `transition`: heights, last move, move number and
+        # the bitboards of red's stones and of every stone
+        if _derived is None and board is None:
+            _derived = ((0,) * self.COLS, None, 0, 0, 0)
+        elif _derived is None:
+            heights = tuple(int(n) for n in np.count_nonzero(self.board, axis=0))
+            red, mask = bb.from_array(self.board, -1)
+            _derived = (heights, None, int(sum(heights)), red, mask)
+        self.heights, self.last_move, self.move_number, self._red, self._mask = _derived
+        self._view = None
+
     def is_final(self) -> bool:
         return self.get_winner() != 0 or not any(self.board[0] == 0)
 
@@ -67,22 +83,13 @@ class ConnectState(EnvironmentState):
         return 0
 
     def is_col_free(self, col: int) -> bool:
-        return self.board[0, col] == 0
+        return self.heights[col] < self.ROWS
 
     def get_heights(self) -> list[int]:
-        heights = []
-        for c in range(self.COLS):
-            col = self.board[:, c]
-            for r in range(self.ROWS):
-                if col[r] != 0:
-                    heights.append(self.ROWS - r)
-                    break
-            else:
-                heights.append(0)
-        return heights
+        return list(self.heights)
 
     def get_free_cols(self) -> list[int]:
-        return [c for c in range(self.COLS) if self.is_col_free(c)]
+        return [c for c in range(self.COLS) if self.heights[c] < self.ROWS]
     
     def valid_actions(self) -> list[int]:
         """Alias for get_free_cols for compatibility with policy interface"""
@@ -93,14 +100,27 @@ class ConnectState(EnvironmentState):
             raise ValueError(f"Move not allowed in column {col}.")
 
         new_board = self.board.copy()
-        for r in reversed(range(self.ROWS)):
-            if new_board[r, col] == 0:
-                new_board[r, col] = self.player
-                break
-
-        return ConnectState(new_board, -self.player)
+        height = self.heights[col]
+        new_board[self.ROWS - 1 - height, col] = self.player
+
+        bit = 1 << (col * bb.H1 + height)
+        heights = self.heights[:col] + (height + 1,) + self.heights[col + 1:]
+        red = self._red | bit if self.player == -1 else self._red
+        derived = (heights, col, self.move_number + 1, red, self._mask | bit)
+        return ConnectState(new_board, -self.player, derived)
+
+    def view(self) -> StateView:
+        """Read-only board with the player to move, heights, last move and position hash"""
+        if self._view is None:
+            position = self._red if self.player == -1 else self._red ^ self._mask
+            self._view = StateView(self.board, self.player, self.heights, self.last_move,
+                                   self.move_number, position, self._mask)
+        return self._view
+
+    def show(self, size: int = 1500, ax: "plt.Axes | None" = None) -> None:
+        # matplotlib is only loaded when a board is drawn (headless runs never pay for it)
+        import matplotlib.pyplot as plt
 
-    def show(self, size: int = 1500, ax: plt.Axes | None = None) -> None:
         if ax is None:
             fig, ax = plt.subplots()
         else:
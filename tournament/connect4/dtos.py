@@ -1,5 +1,5 @@
-from pydantic import BaseModel, ConfigDict, Field
-from connect4.policy import Policy
+from dataclasses import dataclass, field, fields
+from connect4.base_policy import Policy
 import numpy as np
 
 State = np.ndarray
@@ -9,20 +9,55 @@ Versus = list[tuple[Participant | None, Participant | None]]
 
 
 class Game(list[tuple[State, Action]]):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-
-
-class Match(BaseModel):
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-
-    player_a: str = Field(description="First Player")
-    player_b: str = Field(description="Second Player")
-
-    player_a_wins: int = Field(default=0, description="Games won by First Player.")
-    player_b_wins: int = Field(default=0, description="Games won by Second Player.")
-    draws: int = Field(default=0, description="Games ended in draw.")
-
-    games: list[Game] = Field(
-        default=[],
-        description="List of the history of each game, a state-action pair list produced by the alternating sequence of player actions.",
-    )
+    pass
+
+
+@dataclass
+class Match:
+    """
+    Result of a match between two players; see `connect4.match_schema` for the field descriptions.
+
+    A plain dataclass, so creating matches does not import pydantic. The
+    pydantic schema validates the fields and serializes them the first time
+    `model_dump` or `model_dump_json` is called.
+
+    `move_times` holds every per-move timing of the match. It is only kept
+    in memory, for the performance summary of the run: dumps leave it out
+    (the `latency` summary is what gets archived) unless
+    `include_move_times` is passed.
+    """
+
+    player_a: str
+    player_b: str
+
+    player_a_wins: int = 0
+    player_b_wins: int = 0
+    draws: int = 0
+
+    games: list[Game] = field(default_factory=list)
+    results: list[int] = field(default_factory=list)
+    winner: str = ""
+    confidence: float = 0.5
+    sprt_llr: float | None = None
+    sprt_decision: str | None = None
+
+    move_times: dict[str, list[float]] = field(default_factory=dict)
+    latency: dict[str, dict] = field(default_factory=dict)
+    search_stats: dict[str, dict[str, float]] = field(default_factory=dict)
+    book_hit_rate: dict[str, float] = field(default_factory=dict)
+    memory: dict[str, dict] = field(default_factory=dict)
+    memory_forfeits: dict[str, int] = field(default_factory=dict)
+    wall_time: float = 0.0
+    moves_per_second: float = 0.0
+    games_per_second: float = 0.0
+
+    def _model(self):
+        from connect4.match_schema import MatchModel
+
+        return MatchModel(**{f.name: getattr(self, f.name) for f in fields(self)})
+
+    def model_dump(self, mode: str = "python", include_move_times: bool = False) -> dict:
+        return self._model().model_dump(mode=mode, exclude=None if include_move_times else {"move_times"})
+
+    def model_dump_json(self, indent: int | None = None, include_move_times: bool = False) -> str:
+        return self._model().model_dump_json(indent=indent, exclude=None if include_move_times else {"move_times"})
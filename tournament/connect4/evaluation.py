@@ -0,0 +1,308 @@
+"""
+Strength evaluation of a candidate agent against a fixed gauntlet.
+
+Every opponent of the gauntlet is played over a set of random openings
+(a few random legal moves). Each opening is played twice, once with the
+candidate as red and once as yellow, so a lopsided opening favours both
+sides equally. The two games of an opening form a pair, and the pair
+scores (0, 1/4, 1/2, 3/4 or 1, the pentanomial model) give the confidence
+interval: they are independent even when single games are not.
+
+Games are played in chunks of pairs on a process pool. Players are given
+as specs so that every worker can build its own instances:
+
+    random        uniform random legal moves
+    mcts:N        MCTSAgent with N iterations
+    rave:N[:K]    MCTSAgent with N iterations in RAVE mode (rave_k = K)
+    negamax:T     NegamaxAgent with T seconds per move
+    q:PATH        QLearningAgent (no exploration) loaded from a pickled Q-table
+    module:Class  any importable policy
+    NAME          a participant discovered in groups/
+
+Usage (from the `tournament` directory):
+
+    python -m connect4.evaluation q:models/q_agent_final.pkl --pairs 500 --workers 8
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from connect4.base_policy import Policy
+from connect4.connect_state import ConnectState
+from connect4.ratings import elo_from_score
+from connect4.utils import load_policy
+
+DEFAULT_GAUNTLET = ["random", "mcts:25", "mcts:100", "mcts:400"]
+DEFAULT_Q_AGENT = os.path.join("models", "q_agent_final.pkl")
+Z_95 = 1.959964
+
+
+class RandomPolicy(Policy):
+    """Uniform random legal moves."""
+
+    def mount(self, timeout=None):
+        pass
+
+    def act(self, s):
+        return int(random.choice([c for c in range(s.shape[1]) if s[0, c] == 0]))
+
+
+@functools.lru_cache(maxsize=None)
+def _load_q_table(path: str) -> dict:
+    import pickle
+
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def make_factory(spec: str):
+    """A callable that builds a fresh policy instance for a player spec (see the module docstring)."""
+    kind, _, arg = spec.partition(":")
+    if spec == "random":
+        return RandomPolicy
+    if kind == "mcts":
+        from connect4.policy import MCTSAgent
+
+        return functools.partial(MCTSAgent, iterations=int(arg))
+    if kind == "rave":
+        from connect4.policy import MCTSAgent
+
+        iterations, _, k = arg.partition(":")
+        return functools.partial(MCTSAgent, iterations=int(iterations), rave=True, **({"rave_k": float(k)} if k else {}))
+    if kind == "negamax":
+        from connect4.solver import NegamaxAgent
+
+        return functools.partial(NegamaxAgent, time_limit=float(arg))
+    if kind == "q":
+        from learning.q_learning_agent import QLearningAgent
+
+        def q_agent():
+            agent = QLearningAgent(train_mode=False)
+            agent.q_table = _load_q_table(arg)  # shared by the games of a worker, never updated
+            return agent
+
+        return q_agent
+    return load_policy(spec)
+
+
+def make_policy(spec: str) -> Policy:
+    """A fresh policy instance for a player spec (see the module docstring)."""
+    return make_factory(spec)()
+
+
+def random_openings(n: int, plies: int, seed: int) -> list[tuple[int, ...]]:
+    """`n` random move sequences of `plies` moves that do not end the game."""
+    rng = np.random.default_rng(seed)
+    openings = []
+    while len(openings) < n:
+        state = ConnectState()
+        moves = []
+        for _ in range(plies):
+            col = int(rng.choice(state.get_free_cols()))
+            state = state.transition(col)
+            moves.append(col)
+        if not state.is_final():
+            openings.append(tuple(moves))
+    return openings
+
+
+def play_game(red: Policy, yellow: Policy, opening: tuple[int, ...]) -> tuple[int, int]:
+    """
+    Play one game from `opening` and return (winner colour, moves played).
+
+    An illegal move loses the game for the player that made it.
+    """
+    red.mount()
+    yellow.mount()
+    state = ConnectState()
+    for col in opening:
+        state = state.transition(col)
+    moves = 0
+    while not state.is_final():
+        policy = red if state.player == -1 else yellow
+        action = policy.act(state.view())
+        moves += 1
+        if not state.is_applicable(int(action)):
+            break
+        state = state.transition(int(action))
+    red.close()
+    yellow.close()
+    if not state.is_final():  # stopped on an illegal move
+        return -state.player, moves
+    return int(state.get_winner()), moves
+
+
+def _play_pairs(job) -> dict:
+    """Worker: play the openings of a chunk twice, colours swapped; one score per pair."""
+    candidate_spec, opponent_spec, openings, seed = job
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    # Fresh instances for every game, as in `play_match`: no tree, table or
+    # cache carries over from one game to the next
+    candidate, opponent = make_factory(candidate_spec), make_factory(opponent_spec)
+
+    pair_scores, results, moves = [], [], 0
+    start = time.perf_counter()
+    for opening in openings:
+        pair = 0.0
+        for candidate_colour in (-1, 1):
+            red, yellow = (candidate, opponent) if candidate_colour == -1 else (opponent, candidate)
+            winner, n = play_game(red(), yellow(), opening)
+            moves += n
+            result = 0 if winner == 0 else (1 if winner == candidate_colour else -1)
+            results.append(result)
+            pair += (result + 1) / 2
+        pair_scores.append(pair / 2)
+    return {"pair_scores": pair_scores, "results": results, "moves": moves,
+            "worker_seconds": time.perf_counter() - start}
+
+
+def _elo(score: float) -> float:
+    """`elo_from_score`, but infinite for a perfect or null score instead of clamped."""
+    if score <= 0.0 or score >= 1.0:
+        return math.copysign(math.inf, score - 0.5)
+    return elo_from_score(score)
+
+
+def summarize(pair_scores: list[float], results: list[int]) -> dict:
+    """
+    Win/draw/loss rates, score and Elo difference with a 95% confidence interval.
+
+    The interval is the normal approximation on the mean pair score,
+    mapped to Elo through `elo_from_score`. A perfect (null) score has an
+    infinite Elo difference.
+    """
+    n = len(pair_scores)
+    games = len(results)
+    scores = np.asarray(pair_scores, dtype=float)
+    mean = float(scores.mean()) if n else 0.5
+    se = float(scores.std(ddof=1) / math.sqrt(n)) if n > 1 else 0.0
+    low, high = max(mean - Z_95 * se, 0.0), min(mean + Z_95 * se, 1.0)
+    wins, losses = results.count(1), results.count(-1)
+    return {
+        "games": games,
+        "pairs": n,
+        "wins": wins,
+        "draws": games - wins - losses,
+        "losses": losses,
+        "win_rate": wins / games if games else 0.0,
+        "draw_rate": (games - wins - losses) / games if games else 0.0,
+        "loss_rate": losses / games if games else 0.0,
+        # Pairs scoring 0, 1/4, 1/2, 3/4 and 1
+        "pentanomial": [int(np.sum(np.isclose(scores, k / 4))) for k in range(5)],
+        "score": mean,
+        "score_ci": (low, high),
+        "elo": _elo(mean),
+        "elo_ci": (_elo(low), _elo(high)),
+    }
+
+
+def evaluate(
+    candidate: str,
+    gauntlet: list[str],
+    pairs: int = 200,
+    plies: int = 4,
+    workers: int = os.cpu_count() or 1,
+    chunk_size: int = 10,
+    seed: int = 911,
+) -> dict:
+    """
+    Play `pairs` opening pairs of `candidate` against every opponent of `gauntlet`.
+
+    All opponents share the same openings. Returns a dict with one summary
+    (see `summarize`) per opponent under `opponents` and the pooled one
+    under `overall`, plus `elapsed` seconds and `games_per_second`.
+    """
+    openings = random_openings(pairs, plies, seed)
+    jobs, owners = [], []
+    for o, opponent in enumerate(gauntlet):
+        for start in range(0, pairs, chunk_size):
+            jobs.append((candidate, opponent, openings[start:start + chunk_size], seed + o * pairs + start))
+            owners.append(opponent)
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            outputs = list(pool.map(_play_pairs, jobs))
+    else:
+        outputs = list(map(_play_pairs, jobs))
+    elapsed = time.perf_counter() - start
+
+    collected = {opponent: {"pair_scores": [], "results": [], "moves": 0, "worker_seconds": 0.0} for opponent in gauntlet}
+    for opponent, output in zip(owners, outputs):
+        acc = collected[opponent]
+        acc["pair_scores"] += output["pair_scores"]
+        acc["results"] += output["results"]
+        acc["moves"] += output["moves"]
+        acc["worker_seconds"] += output["worker_seconds"]
+
+    opponents = {}
+    for opponent, acc in collected.items():
+        summary = summarize(acc["pair_scores"], acc["results"])
+        summary["moves"] = acc["moves"]
+        summary["worker_seconds"] = acc["worker_seconds"]
+        opponents[opponent] = summary
+
+    all_pairs = [s for acc in collected.values() for s in acc["pair_scores"]]
+    all_results = [r for acc in collected.values() for r in acc["results"]]
+    overall = summarize(all_pairs, all_results)
+    return {
+        "candidate": candidate,
+        "pairs": pairs,
+        "plies": plies,
+        "seed": seed,
+        "opponents": opponents,
+        "overall": overall,
+        "elapsed": elapsed,
+        "games_per_second": overall["games"] / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\nEvaluación de {report['candidate']} "
+          f"({report['pairs']} pares de aperturas de {report['plies']} jugadas por rival)")
+    print(f"{'Rival':<28}{'Partidas':>9}{'V':>6}{'E':>6}{'D':>6}{'Score':>8}{'Elo':>9}   IC 95%")
+    rows = list(report["opponents"].items()) + [("total", report["overall"])]
+    for name, s in rows:
+        low, high = s["elo_ci"]
+        print(f"{name:<28}{s['games']:>9}{s['win_rate']:>6.0%}{s['draw_rate']:>6.0%}{s['loss_rate']:>6.0%}"
+              f"{s['score']:>8.3f}{s['elo']:>+9.0f}   [{low:+.0f}, {high:+.0f}]")
+    print(f"{report['overall']['games']} partidas en {report['elapsed']:.1f}s "
+          f"({report['games_per_second']:.1f} partidas/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluar un agente contra un gauntlet fijo")
+    parser.add_argument("candidate", help="random, mcts:N, rave:N[:K], negamax:T, q:RUTA, module:Clase o nombre de un participante")
+    parser.add_argument("--gauntlet", nargs="+", default=None,
+                        help=f"Rivales (por defecto {' '.join(DEFAULT_GAUNTLET)} y {DEFAULT_Q_AGENT} si existe)")
+    parser.add_argument("--pairs", type=int, default=200, help="Pares de aperturas por rival (2 partidas cada uno)")
+    parser.add_argument("--plies", type=int, default=4, help="Jugadas aleatorias de cada apertura")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=10, help="Pares por tarea del pool")
+    parser.add_argument("--seed", type=int, default=911)
+    parser.add_argument("--json", default=None, help="Guardar el reporte en este archivo")
+    args = parser.parse_args()
+
+    gauntlet = args.gauntlet
+    if gauntlet is None:
+        gauntlet = DEFAULT_GAUNTLET + ([f"q:{DEFAULT_Q_AGENT}"] if os.path.exists(DEFAULT_Q_AGENT) else [])
+
+    report = evaluate(args.candidate, gauntlet, args.pairs, args.plies, args.workers, args.chunk_size, args.seed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Reporte guardado en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
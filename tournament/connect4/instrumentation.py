@@ -0,0 +1,228 @@
+"""Lightweight per-move timing and search counters for matches and training games"""
+
+import time
+import tracemalloc
+from collections import defaultdict
+
+import numpy as np
+
+# Upper bounds (in milliseconds) of the latency histogram buckets
+LATENCY_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+
+class MoveTimer:
+    """
+    Wraps `act` calls with a monotonic clock and accumulates per-agent samples.
+
+    Agents that expose `get_search_stats()` (e.g. `MCTSAgent`) have their
+    counters (iterations, nodes, ...) collected after every move as well.
+
+    With `track_memory`, the memory of every move is recorded too: the
+    `tracemalloc` peak of the allocations made during the move, measured
+    here or, for agents running in their own process, by that process
+    (`memory_usage()`, see `connect4.isolation`).
+    """
+
+    def __init__(self, track_memory: bool = False):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.search: dict[str, dict[str, list[float]]] = defaultdict(lambda: defaultdict(list))
+        self.games = 0
+        self.started = time.perf_counter()
+        self.track_memory = track_memory
+        self.memory: dict[str, list[int]] = defaultdict(list)         # bytes per move
+        self.memory_game_peaks: dict[str, list[int]] = defaultdict(list)
+        self._game_memory: dict[str, int] = {}
+        self._tracing = False
+
+    def time_act(self, name: str, policy, state) -> int:
+        """Call `policy.act(state)` and record how long it took."""
+        usage = getattr(policy, "memory_usage", None)
+        traced = self.track_memory and usage is None
+        if traced:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._tracing = True
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        action = policy.act(state)
+        self.latencies[name].append(time.perf_counter() - start)
+
+        if self.track_memory:
+            used = usage() if usage is not None else tracemalloc.get_traced_memory()[1] - base
+            self.memory[name].append(used)
+            self._game_memory[name] = max(self._game_memory.get(name, 0), used)
+
+        get_stats = getattr(policy, "get_search_stats", None)
+        stats = get_stats() if get_stats is not None else None
+        if stats:
+            for key, value in stats.items():
+                self.search[name][key].append(float(value))
+        return action
+
+    def end_game(self) -> None:
+        self.games += 1
+        for name, peak in self._game_memory.items():
+            self.memory_game_peaks[name].append(peak)
+        self._game_memory = {}
+
+    def stop_memory_tracking(self) -> None:
+        """Stop `tracemalloc` if this timer started it (it slows every allocation down)."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def memory_summary(self) -> dict[str, dict]:
+        """Per-agent peak and mean memory per move, and the peak of every game, in MB."""
+        return {
+            name: {
+                "move_peak_mb": max(samples) / 2**20,
+                "move_mean_mb": float(np.mean(samples)) / 2**20,
+                "game_peaks_mb": [peak / 2**20 for peak in self.memory_game_peaks.get(name, [])],
+            }
+            for name, samples in self.memory.items()
+        }
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def moves(self) -> int:
+        return sum(len(samples) for samples in self.latencies.values())
+
+    def moves_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.moves / elapsed if elapsed > 0 else 0.0
+
+    def games_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.games / elapsed if elapsed > 0 else 0.0
+
+    def latency_summary(self) -> dict[str, dict]:
+        """Per-agent latency percentiles (in seconds) and histogram bucket counts."""
+        return {name: summarize_latencies(samples) for name, samples in self.latencies.items()}
+
+    def search_summary(self) -> dict[str, dict[str, float]]:
+        """Per-agent mean of every search counter, per move."""
+        return {
+            name: {key: float(np.mean(values)) for key, values in counters.items()}
+            for name, counters in self.search.items()
+        }
+
+    def book_hit_rates(self) -> dict[str, float]:
+        """Opening-book hits / probes, for agents reporting `book_probes`."""
+        rates = {}
+        for name, counters in self.search.items():
+            probes = sum(counters.get("book_probes", []))
+            if probes:
+                rates[name] = sum(counters.get("book_hits", [])) / probes
+        return rates
+
+
+def summarize_latencies(samples: list[float]) -> dict:
+    if not samples:
+        return {"count": 0, "total": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "histogram": {}}
+
+    arr = np.asarray(samples)
+    p50, p95, p99 = np.percentile(arr, [50, 95, 99])
+
+    histogram = {}
+    counts = np.searchsorted(np.asarray(LATENCY_BUCKETS_MS) / 1000.0, arr, side="left")
+    for idx in range(len(LATENCY_BUCKETS_MS) + 1):
+        label = f"<={LATENCY_BUCKETS_MS[idx]}ms" if idx < len(LATENCY_BUCKETS_MS) else f">{LATENCY_BUCKETS_MS[-1]}ms"
+        histogram[label] = int(np.count_nonzero(counts == idx))
+
+    return {
+        "count": int(arr.size),
+        "total": float(arr.sum()),
+        "mean": float(arr.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(arr.max()),
+        "histogram": histogram,
+    }
+
+
+def merge_latency_summaries(summaries: list[dict]) -> dict:
+    """
+    Combine latency summaries of several matches.
+
+    Counts, totals, maxima and histograms are exact; percentiles are the
+    count-weighted mean of the per-match percentiles.
+    """
+    summaries = [s for s in summaries if s.get("count")]
+    if not summaries:
+        return summarize_latencies([])
+    count = sum(s["count"] for s in summaries)
+    total = sum(s["total"] for s in summaries)
+    histogram: dict[str, int] = defaultdict(int)
+    for s in summaries:
+        for label, n in s["histogram"].items():
+            histogram[label] += n
+    merged = {key: sum(s[key] * s["count"] for s in summaries) / count for key in ("p50", "p95", "p99")}
+    return {"count": count, "total": total, "mean": total / count, **merged,
+            "max": max(s["max"] for s in summaries), "histogram": dict(histogram)}
+
+
+def print_performance_summary(matches: list) -> None:
+    """
+    Print per-agent latency and throughput aggregated over a list of `Match`.
+
+    Percentiles are exact over the raw `move_times` of the matches played
+    in this run; matches loaded from disk (resumed or cached) only carry
+    their `latency` summary, which is merged in with `merge_latency_summaries`.
+    """
+    if not matches:
+        return
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    loaded: dict[str, list[dict]] = defaultdict(list)
+    search: dict[str, list[dict[str, float]]] = defaultdict(list)
+    book: dict[str, list[float]] = defaultdict(list)
+    memory: dict[str, float] = defaultdict(float)
+    forfeits: dict[str, int] = defaultdict(int)
+    moves = 0
+    games = 0
+    wall_time = 0.0
+    for match in matches:
+        for name, samples in match.move_times.items():
+            latencies[name].extend(samples)
+        for name, summary in match.latency.items():
+            if name not in match.move_times:
+                loaded[name].append(summary)
+        for name, counters in match.search_stats.items():
+            search[name].append(counters)
+        for name, rate in match.book_hit_rate.items():
+            book[name].append(rate)
+        for name, summary in match.memory.items():
+            memory[name] = max(memory[name], summary["move_peak_mb"])
+        for name, count in match.memory_forfeits.items():
+            forfeits[name] += count
+        moves += sum(summary.get("count", 0) for summary in match.latency.values())
+        games += len(match.games)
+        wall_time += match.wall_time
+
+    print("\nResumen de rendimiento")
+    print("-" * 60)
+    print(f"{'Agente':<20}{'moves':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for name in sorted(latencies.keys() | loaded.keys()):
+        s = summarize_latencies(latencies.get(name, []))
+        if loaded.get(name):
+            s = merge_latency_summaries([s, *loaded[name]])
+        print(
+            f"{name:<20}{s['count']:>7}{s['p50'] * 1e3:>9.2f}{s['p95'] * 1e3:>9.2f}"
+            f"{s['p99'] * 1e3:>9.2f}{s['max'] * 1e3:>9.2f}"
+        )
+    for name, counters in sorted(search.items()):
+        keys = sorted({key for c in counters for key in c})
+        means = ", ".join(f"{key}/move={np.mean([c[key] for c in counters if key in c]):.1f}" for key in keys)
+        print(f"   {name}: {means}")
+    for name, rates in sorted(book.items()):
+        print(f"   {name}: libro de aperturas {np.mean(rates):.0%} de aciertos por match")
+    for name, peak in sorted(memory.items()):
+        lost = f", {forfeits[name]} partidas perdidas por exceder la memoria" if forfeits.get(name) else ""
+        print(f"   {name}: pico de memoria {peak:.1f} MB por jugada{lost}")
+    if wall_time > 0:
+        print(f"Throughput: {moves / wall_time:.1f} moves/s, {games / wall_time:.3f} games/s ({games} games, {wall_time:.1f}s)")
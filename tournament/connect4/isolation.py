@@ -0,0 +1,172 @@
+"""
+Per-agent memory accounting and hard memory caps.
+
+`MemoryLimit` configures a match. Without a cap, agents run in the match
+process and `MoveTimer` measures the peak of the allocations made by each
+move with `tracemalloc`. With `cap_mb`, every agent runs in its own worker
+process (one per game) whose address space is limited with `RLIMIT_AS` to
+its footprint at start plus the cap. Workers are started from a clean
+`forkserver` process, not forked from the match process, so the cap does
+not depend on how much memory the tournament has used (and freed) so far.
+An allocation beyond the cap fails inside the agent, the worker reports
+it, and `play_match` forfeits the game for that agent; a worker that dies
+is treated the same way. With `track`, the worker measures every move
+with `tracemalloc` as well, so isolated and in-process agents report the
+same figure: the peak of the allocations made during the move.
+
+Caps need a POSIX system (the `resource` module and the `forkserver`
+start method), and policies that can be pickled to the worker.
+"""
+
+import os
+import tracemalloc
+from dataclasses import dataclass
+
+import numpy as np
+
+from connect4.base_policy import Policy
+from connect4.state_view import StateView
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class MemoryLimitExceeded(Exception):
+    """An agent went over its memory cap (or its worker process died) during a move."""
+
+
+@dataclass
+class MemoryLimit:
+    """
+    Memory accounting for the participants of a match.
+
+    `cap_mb` is the hard cap per agent in MB (None: no cap, agents run in
+    process); `track` records per-move and per-game peaks.
+    """
+
+    cap_mb: float | None = None
+    track: bool = True
+
+
+def _address_space() -> int:
+    """Virtual memory of this process in bytes (what RLIMIT_AS limits)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _worker(conn, factory, cap_bytes: int, track: bool) -> None:
+    limit = _address_space() + cap_bytes
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if track:
+        tracemalloc.start()
+    policy = None
+    try:
+        policy = factory()
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            kind, payload = message
+            if kind == "close":
+                policy.close()
+                return
+            try:
+                if kind == "mount":
+                    policy.mount(payload)
+                    conn.send(("ok", None, 0, None))
+                else:
+                    state = StateView(*payload) if isinstance(payload, tuple) else payload
+                    used = 0
+                    if track:
+                        tracemalloc.reset_peak()
+                        base = tracemalloc.get_traced_memory()[0]
+                    action = policy.act(state)
+                    if track:
+                        used = tracemalloc.get_traced_memory()[1] - base
+                    get_stats = getattr(policy, "get_search_stats", None)
+                    conn.send(("ok", int(action), used, get_stats() if get_stats is not None else None))
+            except MemoryError:
+                raise
+            except Exception as e:
+                conn.send(("error", repr(e), 0, None))
+    except MemoryError:
+        policy = None  # drop the agent's memory so the report can be sent
+        conn.send(("memory", None, 0, None))
+
+
+class IsolatedPolicy(Policy):
+    """
+    Runs a policy in a worker process with a hard memory cap.
+
+    `factory` is called in the worker (the policy class, or any picklable
+    callable returning a policy). The worker starts on `mount` and exits on
+    `close`. `act` raises `MemoryLimitExceeded` when the agent runs out of
+    memory. With `track`, `memory_usage` reports the peak of each move.
+    """
+
+    def __init__(self, factory, cap_mb: float, track: bool = True):
+        if resource is None:
+            raise RuntimeError("memory caps need the POSIX resource module")
+        self.factory = factory
+        self.cap_mb = cap_mb
+        self.track = track
+        self._conn = None
+        self._process = None
+        self._stats = None
+        self._move_memory = 0
+
+    def mount(self, timeout=None):
+        import multiprocessing
+
+        if self._process is None:
+            parent, child = multiprocessing.Pipe()
+            self._process = multiprocessing.get_context("forkserver").Process(
+                target=_worker, args=(child, self.factory, int(self.cap_mb * 2**20), self.track), daemon=True)
+            self._process.start()
+            child.close()
+            self._conn = parent
+        self._call("mount", timeout)
+
+    def act(self, state):
+        if isinstance(state, StateView):
+            state = (state.view(np.ndarray), state.player, state.heights, state.last_move,
+                     state.move_number, state.position, state.mask)
+        return self._call("act", state)
+
+    def get_search_stats(self):
+        return self._stats
+
+    def memory_usage(self) -> int:
+        """Peak of the allocations made by the worker during the last move, in bytes."""
+        return self._move_memory
+
+    def close(self):
+        if self._process is None:
+            return
+        try:
+            self._conn.send(("close", None))
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(timeout=1.0)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._conn.close()
+        self._conn = self._process = None
+
+    def _call(self, kind: str, payload):
+        try:
+            self._conn.send((kind, payload))
+            status, value, self._move_memory, self._stats = self._conn.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+            self.close()
+            raise MemoryLimitExceeded(f"worker exited during {kind}") from e
+        if status == "memory":
+            self.close()
+            raise MemoryLimitExceeded(f"over the {self.cap_mb:g} MB cap during {kind}")
+        if status == "error":
+            raise RuntimeError(f"agent failed during {kind}: {value}")
+        return value
@@ -0,0 +1,133 @@
+"""
+Cache of match results across tournament runs.
+
+A match is identified by what can change its result: the code of both
+participants, their parameters, `best_of`, `first_player_distribution`,
+the seed, the SPRT and memory settings, and the code that plays every
+match (`ENGINE_SOURCES`: game rules, memory caps and the match loop with
+its forfeit handling). The code of a participant is the content of every
+`.py` file in the folder of its source file: its group folder for
+submissions, the `connect4` package for the built-in agents. Only
+pairings involving a changed submission miss the cache; a change to the
+engine sources misses all of them.
+Data files an agent loads (Q tables, opening books) are not hashed: after
+retraining one, remove its entries with `invalidate([name])`.
+
+Entries are JSON files in `.cache/matches/`, one per match:
+
+    {"key": ..., "player_a": ..., "player_b": ..., "match": {...}}
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pathlib
+
+from connect4.dtos import Match, Participant
+from connect4.run_state import match_from_dict, match_to_dict, write_json_atomic
+from connect4.utils import LazyPolicy
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "matches")
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Sources whose changes can alter any match result: the rules, the board the
+# agents see, memory caps and `tournament.play_match`
+ENGINE_SOURCES = (
+    os.path.join(_PACKAGE_DIR, "connect_state.py"),
+    os.path.join(_PACKAGE_DIR, "state_view.py"),
+    os.path.join(_PACKAGE_DIR, "isolation.py"),
+    os.path.join(os.path.dirname(_PACKAGE_DIR), "tournament.py"),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _folder_hash(folder: str) -> str:
+    digest = hashlib.sha256()
+    for path in sorted(pathlib.Path(folder).rglob("*.py")):
+        digest.update(str(path.relative_to(folder)).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def engine_hash() -> str:
+    """Hash of `ENGINE_SOURCES`."""
+    digest = hashlib.sha256()
+    for path in ENGINE_SOURCES:
+        digest.update(os.path.basename(path).encode())
+        digest.update(pathlib.Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def fingerprint(policy) -> str:
+    """Hash of a participant's source folder and parameters (a class, `LazyPolicy` or `functools.partial`)."""
+    if isinstance(policy, functools.partial):
+        params = json.dumps([repr(policy.args), sorted((k, repr(v)) for k, v in policy.keywords.items())])
+        return hashlib.sha256(f"{fingerprint(policy.func)}:{params}".encode()).hexdigest()
+    if isinstance(policy, LazyPolicy):  # no need to import the module
+        path, cls_name = policy.path, policy.class_name
+    else:
+        path, cls_name = inspect.getsourcefile(policy), policy.__qualname__
+    return hashlib.sha256(f"{_folder_hash(os.path.dirname(os.path.abspath(path)))}:{cls_name}".encode()).hexdigest()
+
+
+class MatchCache:
+    """
+    Match results on disk, keyed by `key`.
+
+    `hits` and `misses` count the lookups of this instance.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, a: Participant, b: Participant, best_of: int, first_player_distribution: float,
+            seed: int, sprt=None, memory=None) -> str:
+        payload = json.dumps([engine_hash(), a[0], fingerprint(a[1]), b[0], fingerprint(b[1]), best_of,
+                              first_player_distribution, seed, repr(sprt), repr(memory)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Match | None:
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return match_from_dict(entry["match"])
+
+    def put(self, key: str, match: Match) -> None:
+        write_json_atomic(self._path(key), {
+            "key": key,
+            "player_a": match.player_a,
+            "player_b": match.player_b,
+            "match": match_to_dict(match),
+        })
+
+    def invalidate(self, names: list[str] | None = None) -> int:
+        """Remove every entry, or those of matches played by any of `names`; returns how many."""
+        removed = 0
+        for entry_path in pathlib.Path(self.directory).glob("*.json"):
+            if names is not None:
+                try:
+                    entry = json.loads(entry_path.read_text())
+                except json.JSONDecodeError:
+                    entry = {}
+                if entry.get("player_a") not in names and entry.get("player_b") not in names:
+                    continue
+            entry_path.unlink()
+            removed += 1
+        return removed
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        return f"{self.hits} de {total} matches servidos desde la caché ({self.misses} jugados)"
@@ -0,0 +1,68 @@
+"""
+Pydantic schema of `Match`, used to validate and serialize it.
+
+Importing pydantic is slow, so `connect4.dtos` keeps `Match` a plain
+dataclass and only loads this module the first time a match is dumped.
+"""
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from connect4.dtos import Game
+
+
+class MatchModel(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    player_a: str = Field(description="First Player")
+    player_b: str = Field(description="Second Player")
+
+    player_a_wins: int = Field(default=0, description="Games won by First Player.")
+    player_b_wins: int = Field(default=0, description="Games won by Second Player.")
+    draws: int = Field(default=0, description="Games ended in draw.")
+
+    games: list[Game] = Field(
+        default=[],
+        description="List of the history of each game, a state-action pair list produced by the alternating sequence of player actions.",
+    )
+    results: list[int] = Field(
+        default=[],
+        description="Outcome of each game in order: 1 if First Player won, -1 if Second Player won, 0 for a draw.",
+    )
+    winner: str = Field(default="", description="Name of the player that won the match.")
+    confidence: float = Field(
+        default=0.5,
+        description="Likelihood of superiority of the winner over the loser, from the decisive games.",
+    )
+    sprt_llr: float | None = Field(default=None, description="Final log-likelihood ratio when played with SPRT.")
+    sprt_decision: str | None = Field(
+        default=None,
+        description="SPRT outcome: 'H1' (First Player stronger), 'H0' (First Player not stronger by elo1; the winner is decided on games won) or 'cap' (game limit reached).",
+    )
+
+    move_times: dict[str, list[float]] = Field(
+        default={},
+        description="Wall-clock seconds spent in each `act` call, per player. Not dumped unless requested.",
+    )
+    latency: dict[str, dict] = Field(
+        default={},
+        description="Per-player latency summary: count, mean, p50, p95, p99, max and histogram buckets.",
+    )
+    search_stats: dict[str, dict[str, float]] = Field(
+        default={},
+        description="Per-player mean of the search counters (iterations, nodes, ...) reported per move.",
+    )
+    book_hit_rate: dict[str, float] = Field(
+        default={},
+        description="Per-player fraction of opening-book probes that found the position.",
+    )
+    memory: dict[str, dict] = Field(
+        default={},
+        description="Per-player memory per move (peak and mean, MB) and peak of every game, when tracked.",
+    )
+    memory_forfeits: dict[str, int] = Field(
+        default={},
+        description="Games each player lost by exceeding its memory cap.",
+    )
+    wall_time: float = Field(default=0.0, description="Total seconds spent playing the match.")
+    moves_per_second: float = Field(default=0.0, description="Moves played per second.")
+    games_per_second: float = Field(default=0.0, description="Games played per second.")
@@ -0,0 +1,198 @@
+"""
+Opening book: best moves for every position up to N plies.
+
+The book is an open-addressing hash table stored as a flat binary file:
+
+    header  : magic b"C4BK", version, capacity, plies, entries (5 x uint32)
+    records : capacity x (key: uint64, move: int8), little endian, packed
+
+`key` is `position + mask + 1` of the canonical orientation (the smaller
+key of the position and its mirror image; 0 marks an empty slot). The file
+is memory-mapped, so a probe reads one or a few records and costs O(1).
+
+Build a book from the `tournament` directory with:
+
+    python -m connect4.opening_book --plies 4 --depth 8
+"""
+
+import argparse
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from . import bitboard as bb
+
+MAGIC = b"C4BK"
+VERSION = 1
+HEADER = np.dtype([("magic", "S4"), ("version", "<u4"), ("capacity", "<u4"), ("plies", "<u4"), ("entries", "<u4")])
+RECORD = np.dtype([("key", "<u8"), ("move", "i1")])
+DEFAULT_BOOK = os.path.join(os.path.dirname(__file__), "opening_book.bin")
+
+_HASH_MULT = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def canonical(position: int, mask: int) -> tuple[int, bool]:
+    """(stored key, mirrored) of a position; moves of mirrored positions are flipped."""
+    direct = bb.key(position, mask)
+    mirrored = bb.key(bb.mirror(position), bb.mirror(mask))
+    if mirrored < direct:
+        return mirrored + 1, True
+    return direct + 1, False
+
+
+def _slot(key: int, bits: int) -> int:
+    return ((key * _HASH_MULT) & _MASK64) >> (64 - bits)
+
+
+class OpeningBook:
+    """Read-only, memory-mapped opening book with probe/hit counters."""
+
+    def __init__(self, path: str):
+        header = np.fromfile(path, dtype=HEADER, count=1)[0]
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"{path} is not an opening book")
+        self.path = path
+        self.capacity = int(header["capacity"])
+        self.plies = int(header["plies"])
+        self.entries = int(header["entries"])
+        self.bits = self.capacity.bit_length() - 1
+        self.records = np.memmap(path, dtype=RECORD, mode="r", offset=HEADER.itemsize, shape=(self.capacity,))
+        self.probes = 0
+        self.hits = 0
+
+    def probe(self, position: int, mask: int) -> int | None:
+        """Best column for the player to move, or None if the position is not in the book."""
+        if bb.popcount(mask) > self.plies:
+            return None
+        self.probes += 1
+        key, mirrored = canonical(position, mask)
+        i = _slot(key, self.bits)
+        while True:
+            record = self.records[i]
+            stored = int(record["key"])
+            if stored == 0:
+                return None
+            if stored == key:
+                self.hits += 1
+                move = int(record["move"])
+                return bb.COLS - 1 - move if mirrored else move
+            i = (i + 1) & (self.capacity - 1)
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
+
+
+_open_books: dict[str, OpeningBook] = {}
+
+
+def open_book(path: str) -> OpeningBook:
+    """Shared `OpeningBook` for `path`, so every agent instance maps the file only once per process."""
+    path = os.path.abspath(path)
+    if path not in _open_books:
+        _open_books[path] = OpeningBook(path)
+    return _open_books[path]
+
+
+def write_book(path: str, moves: dict[int, int], plies: int) -> None:
+    """Write {stored key: move} as a hash table with a load factor of at most 1/2."""
+    capacity = 1 << max(4, (2 * len(moves)).bit_length())
+    bits = capacity.bit_length() - 1
+    records = np.zeros(capacity, dtype=RECORD)
+    for key, move in moves.items():
+        i = _slot(key, bits)
+        while records[i]["key"] != 0:
+            i = (i + 1) & (capacity - 1)
+        records[i] = (key, move)
+
+    header = np.array([(MAGIC, VERSION, capacity, plies, len(moves))], dtype=HEADER)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(header.tobytes())
+        f.write(records.tobytes())
+    os.replace(tmp, path)
+
+
+def build_book(path: str, plies: int, depth: int, verify_depth: int | None = None) -> dict:
+    """
+    Search every position reachable in at most `plies` moves and write the book.
+
+    Positions are deduplicated up to mirror symmetry; each one is searched
+    by `NegamaxAgent` to `depth` plies (a win found within the horizon is
+    exact, otherwise the move follows the solver's heuristic evaluation).
+
+    With `verify_depth`, every move is checked by a second search to that
+    depth and kept only if it scores as well as the deeper search's best
+    move. Positions where the two disagree are left out of the book, so
+    `MCTSAgent` searches them itself instead of trusting a horizon artefact.
+
+    Returns
+    -------
+    dict
+        `searched` positions, `stored` entries and, when verifying,
+        `disagreements` (positions left out).
+    """
+    from .solver import WIN, NegamaxAgent
+
+    solver = NegamaxAgent(tt_size=1 << 20)
+    moves: dict[int, int] = {}
+    searched, disagreements = set(), 0
+    queue = deque([(0, 0, 0)])
+    start = time.perf_counter()
+    while queue:
+        position, mask, n = queue.popleft()
+        key, mirrored = canonical(position, mask)
+        if key in searched:
+            continue
+        searched.add(key)
+        score, best = solver.search(position, mask, depth)
+        if verify_depth is not None and abs(score) <= WIN - 100 and not _confirmed(solver, position, mask, best, verify_depth):
+            disagreements += 1
+        else:
+            moves[key] = bb.COLS - 1 - best if mirrored else best
+        if len(searched) % 100 == 0:
+            print(f"   {len(searched)} posiciones, {disagreements} descartadas ({time.perf_counter() - start:.0f}s)")
+
+        if n < plies:
+            for col in range(bb.COLS):
+                if bb.can_play(mask, col) and not bb.is_winning_move(position, mask, col):
+                    queue.append((*bb.play(position, mask, col), n + 1))
+
+    write_book(path, moves, plies)
+    stats = {"searched": len(searched), "stored": len(moves)}
+    if verify_depth is not None:
+        stats["disagreements"] = disagreements
+    return stats
+
+
+def _confirmed(solver, position: int, mask: int, move: int, depth: int) -> bool:
+    """Whether `move` scores as well as the best move of a `depth`-ply search."""
+    score, best = solver.search(position, mask, depth)
+    if best == move:
+        return True
+    return -solver.search(*bb.play(position, mask, move), depth - 1)[0] >= score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Construir el libro de aperturas")
+    parser.add_argument("--plies", type=int, default=4, help="Profundidad máxima (en jugadas) de las posiciones")
+    parser.add_argument("--depth", type=int, default=8, help="Profundidad de búsqueda del solver por posición")
+    parser.add_argument("--verify-depth", type=int, default=None,
+                        help="Comprobar cada jugada con una búsqueda más profunda y descartar las que no confirma")
+    parser.add_argument("--output", default=DEFAULT_BOOK, help="Archivo de salida")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    stats = build_book(args.output, args.plies, args.depth, args.verify_depth)
+    size = os.path.getsize(args.output)
+    print(f"Libro guardado en {args.output}: {stats['stored']} de {stats['searched']} posiciones, "
+          f"{size} bytes, {time.perf_counter() - start:.1f}s")
+    if args.verify_depth is not None:
+        print(f"   {stats['disagreements']} jugadas descartadas por la búsqueda a profundidad {args.verify_depth}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,21 @@
 import numpy as np
 import math
 import random
+import sys
+import threading
+import time
+from . import bitboard as bb
 from .base_policy import Policy
+from .opening_book import open_book
+from .position_cache import UNKNOWN, config_key, open_cache
 
 ROWS, COLS = 6, 7
 EMPTY, P1, P2 = 0, -1, 1
 
 class Node:
+    __slots__ = ("board", "player", "parent", "move", "children", "visits", "total_reward", "proven",
+                 "amaf_visits", "amaf_reward", "stamp")
+
     def __init__(self, board, player, parent=None, move=None):
         self.board = board
         self.player = player    # jugador que tiene el turno en este nodo
@@ -15,6 +24,10 @@ class Node:
         self.children = {}      # col -> Node
         self.visits = 0
         self.total_reward = 0.0
+        self.proven = None      # valor exacto para el jugador raíz (1.0 gana, 0.0 pierde, 0.5 empate)
+        self.amaf_visits = {}   # col -> visitas all-moves-as-first (RAVE) de quien mueve en este nodo
+        self.amaf_reward = {}   # col -> recompensa acumulada AMAF
+        self.stamp = 0          # última iteración que pasó por el nodo (para podar lo más viejo)
 
     def is_fully_expanded(self):
         return len(self.children) == len(self._valid_cols())
@@ -22,32 +35,128 @@ class Node:
     def _valid_cols(self):
         return [c for c in range(COLS) if self.board[0, c] == EMPTY]
 
+# Bytes aproximados de un nodo: el objeto, su tablero y sus tres diccionarios
+_NODE_BYTES = (sys.getsizeof(Node(np.zeros((ROWS, COLS), dtype=int), P1))
+               + sys.getsizeof(np.zeros((ROWS, COLS), dtype=int)) + 3 * sys.getsizeof({}))
+
 class MCTSAgent(Policy):
     """
     MCTS simple y compatible con autograder.
     - mount(timeout=None) acepta el parámetro del autograder.
-    - act(s) usa s.board o array y s.valid_actions() si existe.
+    - act(s) usa s.board o array y s.valid_actions() si existe; con un
+      StateView toma además el turno y los bitboards de la vista.
+    - MCTS-Solver: los nodos terminales y los subárboles resueltos se marcan
+      como victoria/derrota/empate probados, esos valores se propagan en
+      estilo minimax, la selección salta los hijos perdedores probados y la
+      búsqueda termina en cuanto la raíz queda resuelta.
+    - rave=True activa RAVE: cada nodo guarda estadísticas all-moves-as-first
+      de las jugadas que aparecen después de él (árbol + rollout) y UCT las
+      mezcla con beta = sqrt(rave_k / (3 n + rave_k)), que decae con las
+      visitas n del hijo.
+    - opening_book: ruta a un libro de aperturas (ver connect4/opening_book.py)
+      que se mapea en memoria en mount y se consulta antes de buscar.
+    - position_cache: ruta a un PositionCache compartido entre procesos y
+      ejecuciones. Si una posición ya se buscó con al menos `iterations`
+      simulaciones (o está resuelta) se reutiliza su distribución de visitas;
+      si no, se busca y se guarda el resultado. Las entradas llevan la clave
+      de c, rollout_limit, rave y rave_k: solo se reutilizan búsquedas hechas
+      con la misma configuración.
+    - ponder=True: después de devolver una jugada el agente sigue buscando la
+      posición resultante en un hilo mientras piensa el rival. En el siguiente
+      act adopta el subárbol de la respuesta jugada (completando hasta
+      `iterations` visitas en la raíz) o descarta el trabajo si la posición no
+      coincide. El hilo se cancela al empezar cada act, en mount y en close;
+      usa como mucho `ponder_budget` de un núcleo (duerme el resto del tiempo,
+      soltando el GIL) y se detiene tras `ponder_max_iterations` iteraciones
+      (por defecto iterations * 7, una búsqueda completa por respuesta).
+    - max_nodes: tope de nodos del árbol. Al alcanzarlo se podan los
+      subárboles resueltos y luego los menos visitados (y, a igualdad, los
+      recorridos hace más tiempo) hasta bajar al 75% del tope; los nodos
+      podados quedan como hojas con sus estadísticas, sus descendientes se
+      reciclan en una lista libre y la raíz y sus hijos nunca se pierden.
+      get_search_stats informa el pico de nodos y de memoria de cada jugada.
     """
 
-    def __init__(self, iterations: int = 400, c: float = 1.4, rollout_limit: int = 100):
+    def __init__(self, iterations: int = 400, c: float = 1.4, rollout_limit: int = 100,
+                 rave: bool = False, rave_k: float = 50.0, opening_book: str | None = None,
+                 position_cache: str | None = None, ponder: bool = False, ponder_budget: float = 0.5,
+                 ponder_max_iterations: int | None = None, max_nodes: int | None = None):
         self.iterations = iterations
         self.c = c
         self.rollout_limit = rollout_limit
+        self.rave = rave
+        self.rave_k = rave_k
+        self.opening_book = opening_book
+        self._book = None
+        self.position_cache = position_cache
+        self._cache = None
+        self._cache_config = 0
+        self._last_stats = {"iterations": 0, "nodes": 0}
+        self._last_visits = None
+        self.ponder = ponder
+        self.ponder_budget = ponder_budget
+        self.ponder_max_iterations = ponder_max_iterations
+        self._last_root = None        # raíz de la última búsqueda
+        self._last_position = None    # (tablero, jugador) del último act
+        self._ponder_thread = None
+        self._ponder_stop = None
+        self._ponder_root = None
+        self._ponder_iterations = 0
+        self._ponder_rng = random.Random()
+        self.max_nodes = max_nodes
+        self._free = []               # nodos podados listos para reutilizar
+        self._live = 0                # nodos del árbol actual
+        self._peak = 0
+        self._clock = 0               # iteraciones hechas (sello de los nodos recorridos)
+        self._pruned = 0
 
     # Acepta el timeout que el autograder le pasa
     def mount(self, timeout=None):
         # no usamos timeout, pero lo aceptamos para compatibilidad
-        pass
+        self._stop_ponder()  # una partida nueva: la búsqueda pendiente ya no sirve
+        if self.opening_book is not None and self._book is None:
+            self._book = open_book(self.opening_book)
+        if self.position_cache is not None and self._cache is None:
+            self._cache = open_cache(self.position_cache)
+            self._cache_config = config_key("mcts", self.c, self.rollout_limit, self.rave, self.rave_k)
+
+    def close(self):
+        self._stop_ponder()
 
     def act(self, s):
+        pondered = self._stop_ponder()
+        move = self._choose(s, pondered)
+        if self.ponder:
+            self._start_ponder(move)
+        return move
+
+    def _choose(self, s, pondered=None):
         board = s.board if hasattr(s, "board") else np.array(s)
         valid = s.valid_actions() if hasattr(s, "valid_actions") else [c for c in range(COLS) if board[0, c] == EMPTY]
+        self._last_stats = {"iterations": 0, "nodes": 0}
+        self._last_visits = None
+        self._last_root = None
         if not valid:
             return 0
 
-        # Determinar quién tiene el turno (mismo criterio que usabas)
-        p_turn = P1 if np.count_nonzero(board == P1) == np.count_nonzero(board == P2) else P2
+        # Determinar quién tiene el turno: un StateView ya lo sabe (y mantiene
+        # los bitboards de la posición); si no, contar fichas
+        if hasattr(s, "mask"):
+            p_turn, bitboards = s.player, (s.position, s.mask)
+        else:
+            p_turn = P1 if np.count_nonzero(board == P1) == np.count_nonzero(board == P2) else P2
+            bitboards = None
         opp = -p_turn
+        self._last_position = (board, p_turn)
+
+        # Libro de aperturas
+        if self._book is not None:
+            probes, hits = self._book.probes, self._book.hits
+            move = self._book.probe(*(bitboards or bb.from_array(board, p_turn)))
+            self._last_stats = {"iterations": 0, "nodes": 0,
+                                "book_probes": self._book.probes - probes, "book_hits": self._book.hits - hits}
+            if move is not None and move in valid:
+                return move
 
         # 0) Si hay victoria inmediata para mí -> jugarla
         for c in valid:
@@ -59,55 +168,264 @@ class MCTSAgent(Policy):
             if self._is_winning_move(board, c, opp):
                 return c
 
-        # 2) MCTS estándar
-        root = Node(board.copy(), p_turn)
+        # 2) Resultado de una búsqueda anterior de esta posición (caché compartida)
+        if self._cache is not None:
+            position, mask = bitboards or bb.from_array(board, p_turn)
+            cached = self._cache.get(position, mask, self._cache_config)
+            self._last_stats = {**self._last_stats, "cache_hits": int(cached is not None),
+                                "cache_misses": int(cached is None)}
+            if cached is not None:
+                visits, value = cached
+                if value != UNKNOWN or visits.sum() >= self.iterations:
+                    self._last_visits = [int(visits[c]) if c in valid else 0 for c in range(COLS)]
+                    return self._most_visited({c: int(visits[c]) for c in valid})
+
+        # 3) MCTS estándar, partiendo del subárbol pensado durante el turno rival si coincide
+        root = self._adopt(pondered, board)
+        reused = 0 if root is None else root.visits
+        if root is None:
+            root = Node(board.copy(), p_turn)
+            self._live = 1
+        else:  # the adopted subtree, not the whole pondered tree
+            self._live = self._count(root)
+        self._peak, self._pruned = self._live, 0
+        self._root_player = p_turn
+        self._last_root = root if self.ponder else None
+
+        iterations, nodes = self._search(root, p_turn, self.iterations - reused)
+        nodes += 1
+        if self.ponder:
+            self._last_stats = {**self._last_stats, "ponder_hits": int(pondered is not None and reused > 0),
+                                "reused_visits": reused, "ponder_iterations": self._ponder_iterations}
+
+        self._last_stats = {**self._last_stats, "iterations": iterations, "nodes": nodes,
+                            "peak_nodes": self._peak, "peak_mb": self._peak * _NODE_BYTES / 2**20}
+        if self.max_nodes is not None:
+            self._last_stats["pruned_nodes"] = self._pruned
+
+        # Distribución de visitas de la raíz (las derrotas probadas no cuentan como candidatas)
+        visits = [0] * COLS
+        for col, child in root.children.items():
+            visits[col] = 0 if child.proven == 0.0 else child.visits
+        self._last_visits = visits
 
-        for _ in range(self.iterations):
+        # Si hay una jugada ganadora probada -> jugarla
+        for col, child in root.children.items():
+            if child.proven == 1.0:
+                self._last_visits = [int(c == col) for c in range(COLS)]
+                return col
+
+        if self._cache is not None and root.children:
+            value = UNKNOWN if root.proven is None else int(root.proven * 2)
+            self._cache.put(position, mask, visits, value, self._cache_config)
+
+        # Elegir hijo con más visitas (desempata hacia el centro), evitando derrotas probadas
+        if not root.children:
+            return random.choice(valid)
+        candidates = {col: child for col, child in root.children.items() if child.proven != 0.0} or root.children
+        return self._most_visited({col: child.visits for col, child in candidates.items()})
+
+    # Itera MCTS sobre root (valores desde el punto de vista de p_turn); se
+    # detiene al resolver la raíz o cuando se activa `stop`
+    def _search(self, root, p_turn, iterations, stop=None, rng=random):
+        done = 0
+        nodes = 0
+        for _ in range(iterations):
+            if stop is not None and stop.is_set():
+                break
+            if self.max_nodes is not None and self._live >= self.max_nodes:
+                self._prune(root)
+            done += 1
+            self._clock += 1
             node = root
+            moves = [] if self.rave else None   # (col, jugador) desde la raíz, para AMAF
             # Selection
-            while node.children and node.is_fully_expanded():
+            while node.proven is None and node.children and node.is_fully_expanded():
                 node = self._uct_select(node)
+                if moves is not None:
+                    moves.append((node.move, node.parent.player))
 
             # Expansion
-            valid_cols = [c for c in range(COLS) if node.board[0, c] == EMPTY]
-            untried = [c for c in valid_cols if c not in node.children]
-            if untried:
-                col = random.choice(untried)
-                nb = self._drop(node.board, col, node.player)
-                child = Node(nb, -node.player, parent=node, move=col)
-                node.children[col] = child
-                node = child
-
-            # Simulation
-            reward = self._rollout(node.board, node.player, p_turn)
+            if node.proven is None:
+                valid_cols = [c for c in range(COLS) if node.board[0, c] == EMPTY]
+                untried = [c for c in valid_cols if c not in node.children]
+                if untried:
+                    col = rng.choice(untried)
+                    nb = self._drop(node.board, col, node.player)
+                    child = self._new_node(nb, -node.player, node, col)
+                    if self._has_four(nb, node.player):
+                        child.proven = 1.0 if node.player == p_turn else 0.0
+                    elif not any(nb[0] == EMPTY):
+                        child.proven = 0.5
+                    node.children[col] = child
+                    node = child
+                    nodes += 1
+                    if moves is not None:
+                        moves.append((col, node.parent.player))
+
+            # Simulation (un nodo probado ya tiene su valor exacto)
+            if node.proven is not None:
+                reward = node.proven
+            else:
+                reward = self._rollout(node.board, node.player, p_turn, moves, rng)
 
             # Backpropagation
-            self._backpropagate(node, reward)
+            self._backpropagate(node, reward, self._clock)
+            if moves is not None:
+                self._backpropagate_amaf(node, reward, moves)
+            self._propagate_proof(node)
+            if root.proven is not None:
+                break
+        return done, nodes
 
-        # Elegir hijo con más visitas (desempata hacia el centro)
-        if not root.children:
-            return random.choice(valid)
+    # Ponder: buscar la posición tras nuestra jugada mientras piensa el rival
+    def _start_ponder(self, move):
+        board, p_turn = self._last_position
+        child = self._last_root.children.get(move) if self._last_root is not None else None
+        if child is None:
+            nb = self._drop(board, move, p_turn)
+            if self._has_four(nb, p_turn) or not any(nb[0] == EMPTY):
+                return
+            child = Node(nb, -p_turn, move=move)
+            self._live = 1
+        elif child.proven is not None:
+            return
+        else:  # the reused subtree, not the whole previous tree
+            self._live = self._count(child)
+        child.parent = None
+        self._last_root = None
+        self._ponder_root = child
+        self._ponder_iterations = 0
+        self._ponder_stop = threading.Event()
+        self._ponder_thread = threading.Thread(target=self._ponder, args=(child, p_turn, self._ponder_stop),
+                                               name="mcts-ponder", daemon=True)
+        self._ponder_thread.start()
+
+    def _ponder(self, root, p_turn, stop):
+        limit = self.ponder_max_iterations or self.iterations * COLS
+        while not stop.is_set() and root.proven is None and self._ponder_iterations < limit:
+            cpu = time.thread_time()
+            done, _ = self._search(root, p_turn, min(16, limit - self._ponder_iterations), stop, self._ponder_rng)
+            self._ponder_iterations += done
+            # Presupuesto de CPU: dormir (sin el GIL) en proporción al tiempo buscado
+            if self.ponder_budget < 1.0:
+                stop.wait((time.thread_time() - cpu) * (1.0 - self.ponder_budget) / self.ponder_budget)
+
+    # Cancela la búsqueda en segundo plano y devuelve su raíz, o None si no había
+    def _stop_ponder(self):
+        if self._ponder_thread is None:
+            return None
+        self._ponder_stop.set()
+        self._ponder_thread.join()
+        root = self._ponder_root
+        self._ponder_thread = self._ponder_stop = self._ponder_root = None
+        return root
+
+    # Subárbol de la respuesta que lleva a board, o None si el rival jugó otra posición
+    def _adopt(self, pondered, board):
+        if pondered is None:
+            return None
+        for child in pondered.children.values():
+            if np.array_equal(child.board, board):
+                child.parent = None
+                return child
+        return None
+
+    # Presupuesto de nodos: un nodo nuevo sale de la lista libre si hay alguno
+    def _new_node(self, board, player, parent, move):
+        self._live += 1
+        self._peak = max(self._peak, self._live)
+        if not self._free:
+            return Node(board, player, parent, move)
+        node = self._free.pop()
+        node.board, node.player, node.parent, node.move = board, player, parent, move
+        node.visits, node.total_reward, node.proven, node.stamp = 0, 0.0, None, 0
+        return node
+
+    def _count(self, root):
+        count, stack = 0, [root]
+        while stack:
+            node = stack.pop()
+            count += 1
+            stack.extend(node.children.values())
+        return count
+
+    # Convierte en hojas los subárboles resueltos y luego los menos visitados /
+    # más viejos hasta bajar al 75% del tope; la raíz y sus hijos se conservan
+    def _prune(self, root):
+        internal, stack = [], list(root.children.values())
+        while stack:
+            node = stack.pop()
+            if node.children:
+                internal.append(node)
+                stack.extend(node.children.values())
+        internal.sort(key=lambda n: (n.proven is None, n.visits, n.stamp))
+        target = int(self.max_nodes * 0.75)
+        for node in internal:
+            if self._live <= target:
+                break
+            if node.board is None or not node.children:  # ya reciclado con un ancestro
+                continue
+            self._release(node)
+
+    # Recicla todos los descendientes de node (node conserva sus estadísticas)
+    def _release(self, node):
+        stack = list(node.children.values())
+        node.children = {}
+        while stack:
+            n = stack.pop()
+            stack.extend(n.children.values())
+            n.board = n.parent = None
+            n.children = {}
+            n.amaf_visits, n.amaf_reward = {}, {}
+            self._live -= 1
+            self._pruned += 1
+            if len(self._free) < self.max_nodes:
+                self._free.append(n)
+
+    # Columna con más visitas, desempatando hacia el centro
+    def _most_visited(self, visits):
         best_col = None
         best_visits = -1
-        for col, child in root.children.items():
-            if child.visits > best_visits:
-                best_visits = child.visits
+        for col, n in visits.items():
+            if n > best_visits:
+                best_visits = n
                 best_col = col
-            elif child.visits == best_visits:
+            elif n == best_visits:
                 center = COLS // 2
                 if abs(col - center) < abs(best_col - center):
                     best_col = col
         return best_col
 
-    # UCT selection
+    def get_search_stats(self):
+        return dict(self._last_stats)
+
+    def get_visit_distribution(self):
+        """Visitas por columna en la raíz del último `act`, o None si la jugada no salió de una búsqueda"""
+        return None if self._last_visits is None else list(self._last_visits)
+
+    # Valor de un resultado (para el jugador raíz) desde el punto de vista de quien mueve en node
+    def _for_mover(self, node, value):
+        return value if node.player == self._root_player else 1.0 - value
+
+    # UCT selection (cada jugador maximiza su propio valor; se evitan las derrotas probadas)
     def _uct_select(self, node):
         best_score = -float('inf')
         best_child = None
         for col, child in node.children.items():
-            if child.visits == 0:
+            if child.proven is not None:
+                # Victoria probada ya habría resuelto el nodo; empate con su valor exacto
+                value = self._for_mover(node, child.proven)
+                score = -float('inf') if value == 0.0 else value
+            elif child.visits == 0:
                 score = float('inf')
             else:
-                exploitation = child.total_reward / child.visits
+                value = child.total_reward / child.visits
+                amaf_visits = node.amaf_visits.get(col, 0)
+                if self.rave and amaf_visits:
+                    beta = math.sqrt(self.rave_k / (3 * child.visits + self.rave_k))
+                    value = (1 - beta) * value + beta * node.amaf_reward[col] / amaf_visits
+                exploitation = self._for_mover(node, value)
                 exploration = self.c * math.sqrt(math.log(node.visits + 1) / child.visits)
                 score = exploitation + exploration
             if score > best_score:
@@ -116,7 +434,8 @@ class MCTSAgent(Policy):
         return best_child
 
     # Rollout: juego aleatorio con tope de pasos
-    def _rollout(self, board, player, root_player):
+    # Si se pasa `moves`, se le agregan las jugadas (col, jugador) del rollout
+    def _rollout(self, board, player, root_player, moves=None, rng=random):
         b = board.copy()
         current = player
         steps = 0
@@ -128,17 +447,52 @@ class MCTSAgent(Policy):
             valid = [c for c in range(COLS) if b[0, c] == EMPTY]
             if not valid or steps >= self.rollout_limit:
                 return 0.5
-            col = random.choice(valid)
+            col = rng.choice(valid)
             b = self._drop(b, col, current)
+            if moves is not None:
+                moves.append((col, current))
             current = -current
             steps += 1
 
-    def _backpropagate(self, node, reward):
+    def _backpropagate(self, node, reward, stamp=0):
         while node is not None:
             node.visits += 1
             node.total_reward += reward
+            node.stamp = stamp
             node = node.parent
 
+    # RAVE: cada nodo del camino acumula la recompensa en las columnas que
+    # quien mueve en él jugó más adelante en la simulación (solo la primera vez)
+    def _backpropagate_amaf(self, node, reward, moves):
+        depth = 0
+        n = node
+        while n.parent is not None:
+            depth += 1
+            n = n.parent
+        while node is not None:
+            seen = set()
+            for col, mover in moves[depth:]:
+                if mover == node.player and col not in seen:
+                    seen.add(col)
+                    node.amaf_visits[col] = node.amaf_visits.get(col, 0) + 1
+                    node.amaf_reward[col] = node.amaf_reward.get(col, 0.0) + reward
+            node = node.parent
+            depth -= 1
+
+    # Propaga valores probados hacia la raíz: quien mueve elige su mejor hijo (minimax)
+    def _propagate_proof(self, node):
+        while node.proven is not None and node.parent is not None:
+            parent = node.parent
+            best_possible = 1.0 if parent.player == self._root_player else 0.0
+            if node.proven == best_possible:
+                parent.proven = best_possible
+            elif parent.is_fully_expanded() and all(c.proven is not None for c in parent.children.values()):
+                values = [c.proven for c in parent.children.values()]
+                parent.proven = max(values) if best_possible == 1.0 else min(values)
+            else:
+                return
+            node = parent
+
     # Simula dejar caer una ficha
     def _drop(self, b, col, player):
         nb = b.copy()
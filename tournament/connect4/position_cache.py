@@ -0,0 +1,191 @@
+"""
+Persistent position-evaluation cache shared between processes.
+
+Entries live in a memory-mapped file, so every worker of a tournament or
+training run that opens the same path reads and writes the same table,
+and the contents survive between runs. The table is set-associative:
+a position hashes to one bucket of `ways` slots, and when the bucket is
+full the clock algorithm evicts a slot that has not been read since the
+hand last passed it. Lookups update reference bits and counters, so every
+access holds an exclusive `flock` on the file for its (short) duration.
+
+Each entry stores, for the player to move in the position, the visit
+count of every column from a previous search and the solved value
+(win/draw/loss) when the search proved it. Visit counts depend on the
+search settings, so callers pass a `config` key (see `config_key`) that
+is mixed into the position key: agents with different settings sharing a
+file never read each other's entries.
+"""
+
+import fcntl
+import hashlib
+import os
+
+import numpy as np
+
+from . import bitboard as bb
+
+MAGIC = b"C4PC"
+VERSION = 1
+HEADER = np.dtype([
+    ("magic", "S4"), ("version", "<u4"), ("buckets", "<u4"), ("ways", "<u4"),
+    ("hits", "<u8"), ("misses", "<u8"), ("evictions", "<u8"),
+])
+ENTRY = np.dtype([
+    ("key", "<u8"),             # position key ^ config key, + 1 (0 = empty slot)
+    ("visits", "<u4", (bb.COLS,)),
+    ("value", "i1"),            # -1 unknown, else 0 loss / 1 draw / 2 win for the player to move
+    ("ref", "u1"),              # clock reference bit
+])
+UNKNOWN = -1
+
+_HASH_MULT = 0x9E3779B97F4A7C15
+_MASK64 = (1 << 64) - 1
+
+
+def config_key(*settings) -> int:
+    """64-bit key of a search configuration, for the `config` argument of `get`/`put`."""
+    return int.from_bytes(hashlib.blake2b(repr(settings).encode(), digest_size=8).digest(), "little")
+
+
+def _entry_key(position: int, mask: int, config: int) -> int:
+    return (bb.key(position, mask) ^ config) % _MASK64 + 1  # 0 marks an empty slot
+
+
+class PositionCache:
+    """
+    Bounded, process-shared cache of search results keyed by position.
+
+    Parameters
+    ----------
+    path : str
+        Backing file; created (zero-filled) if it does not exist.
+    buckets : int, optional
+        Number of buckets when creating the file (default is 65536).
+    ways : int, optional
+        Slots per bucket when creating the file (default is 4).
+    """
+
+    def __init__(self, path: str, buckets: int = 1 << 16, ways: int = 4):
+        self.path = path
+        if not os.path.exists(path):
+            self._create(path, buckets, ways)
+
+        self._fd = os.open(path, os.O_RDWR)
+        header = np.memmap(path, dtype=HEADER, mode="r+", shape=(1,))
+        if header[0]["magic"] != MAGIC or header[0]["version"] != VERSION:
+            raise ValueError(f"{path} is not a position cache")
+        self.buckets = int(header[0]["buckets"])
+        self.ways = int(header[0]["ways"])
+        self._header = header
+        self._entries = np.memmap(path, dtype=ENTRY, mode="r+", offset=HEADER.itemsize,
+                                  shape=(self.buckets, self.ways))
+        self._hands = np.memmap(path, dtype="u1", mode="r+",
+                                offset=HEADER.itemsize + ENTRY.itemsize * self.buckets * self.ways,
+                                shape=(self.buckets,))
+        # Counters of this process (the header keeps the totals of every process and run)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _create(path: str, buckets: int, ways: int) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = np.zeros(1, dtype=HEADER)
+        header[0]["magic"], header[0]["version"] = MAGIC, VERSION
+        header[0]["buckets"], header[0]["ways"] = buckets, ways
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(header.tobytes())
+            f.truncate(HEADER.itemsize + ENTRY.itemsize * buckets * ways + buckets)
+        try:
+            os.link(tmp, path)  # another process may have created it meanwhile
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+    def _bucket(self, key: int) -> int:
+        return (((key * _HASH_MULT) & _MASK64) >> 32) % self.buckets
+
+    def get(self, position: int, mask: int, config: int = 0) -> tuple[np.ndarray, int] | None:
+        """(visits per column, value) for the position under `config`, or None on a miss."""
+        key = _entry_key(position, mask, config)
+        bucket = self._bucket(key)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            row = self._entries[bucket]
+            for way in range(self.ways):
+                if row[way]["key"] == key:
+                    row[way]["ref"] = 1
+                    self.hits += 1
+                    self._header[0]["hits"] += 1
+                    return np.array(row[way]["visits"]), int(row[way]["value"])
+            self.misses += 1
+            self._header[0]["misses"] += 1
+            return None
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def put(self, position: int, mask: int, visits, value: int = UNKNOWN, config: int = 0) -> None:
+        """Store the visit distribution (and solved value) of a search from this position under `config`."""
+        key = _entry_key(position, mask, config)
+        bucket = self._bucket(key)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            row = self._entries[bucket]
+            slot = next((w for w in range(self.ways) if row[w]["key"] == key), None)
+            if slot is None:
+                slot = next((w for w in range(self.ways) if row[w]["key"] == 0), None)
+            if slot is None:
+                # Clock: clear reference bits until an unreferenced slot comes up
+                hand = int(self._hands[bucket])
+                while row[hand]["ref"]:
+                    row[hand]["ref"] = 0
+                    hand = (hand + 1) % self.ways
+                slot = hand
+                self._hands[bucket] = (hand + 1) % self.ways
+                self._header[0]["evictions"] += 1
+            row[slot]["key"] = key
+            row[slot]["visits"] = visits
+            row[slot]["value"] = value
+            row[slot]["ref"] = 1
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def stats(self) -> dict:
+        header = self._header[0]
+        used = int(np.count_nonzero(self._entries["key"]))
+        return {
+            "entries": used,
+            "capacity": self.buckets * self.ways,
+            "hits": int(header["hits"]),
+            "misses": int(header["misses"]),
+            "evictions": int(header["evictions"]),
+        }
+
+    def flush(self) -> None:
+        self._header.flush()
+        self._entries.flush()
+        self._hands.flush()
+
+    def close(self) -> None:
+        self.flush()
+        os.close(self._fd)
+
+
+_open_caches: dict[tuple[int, str], PositionCache] = {}
+
+
+def open_cache(path: str) -> PositionCache:
+    """
+    Shared `PositionCache` for `path` within this process.
+
+    Keyed by pid as well: a forked worker must open its own file
+    description, otherwise its `flock` would not exclude the parent's.
+    """
+    key = (os.getpid(), os.path.abspath(path))
+    if key not in _open_caches:
+        _open_caches[key] = PositionCache(key[1])
+    return _open_caches[key]
@@ -0,0 +1,166 @@
+"""Profiling helpers for the tournament and training entry points"""
+
+import cProfile
+import inspect
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable
+
+
+class StackSampler:
+    """
+    Samples the call stack of one thread at a fixed interval.
+
+    The result is written in the "collapsed stack" format (one
+    `frame;frame;frame count` line per unique stack), which flame graph tools
+    such as `flamegraph.pl` or speedscope read directly.
+    """
+
+    def __init__(self, interval: float = 0.005, thread_id: int | None = None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[self._collapse(frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def write(self, path: str) -> None:
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+def _act_key(participant: Any) -> tuple[str, int, str] | None:
+    """pstats key (file, line, function) of the `act` method of a participant's policy class."""
+    cls = getattr(participant, "func", participant)  # functools.partial
+    act = getattr(cls, "act", None)
+    if act is None:
+        return None
+    try:
+        return (inspect.getsourcefile(act), act.__code__.co_firstlineno, "act")
+    except (TypeError, AttributeError):
+        return None
+
+
+def act_time_by_participant(stats: pstats.Stats, participants: list[tuple[str, Any]] | None = None) -> dict[str, tuple[int, float]]:
+    """
+    Cumulative time spent inside every `act` method found in the profile.
+
+    Participants sharing the same policy class share the same entry. `act`
+    methods that cannot be matched with a participant are reported by location.
+
+    Returns
+    -------
+    dict[str, tuple[int, float]]
+        Label -> (number of calls, cumulative seconds).
+    """
+    labels: dict[tuple[str, int, str], list[str]] = {}
+    for name, policy in participants or []:
+        key = _act_key(policy)
+        if key is not None:
+            labels.setdefault(key, []).append(name)
+
+    result = {}
+    for key, (_, ncalls, _, cumtime, _) in stats.stats.items():
+        if key[2] != "act":
+            continue
+        label = " / ".join(labels[key]) if key in labels else f"{os.path.basename(key[0])}:{key[1]}"
+        result[label] = (ncalls, cumtime)
+    return result
+
+
+def profile_run(
+    fn: Callable[[], Any],
+    output_prefix: str,
+    participants: list[tuple[str, Any]] | None = None,
+    top_n: int = 25,
+    sample_interval: float = 0.005,
+) -> Any:
+    """
+    Run `fn` under cProfile and a stack sampler and write the reports.
+
+    Files written:
+
+    - ``<output_prefix>.pstats``: raw cProfile statistics (``python -m pstats``, snakeviz).
+    - ``<output_prefix>.collapsed``: sampled collapsed stacks for flame graphs.
+    - ``<output_prefix>_top.txt``: top-N functions by own time and per-participant `act` time.
+
+    Parameters
+    ----------
+    fn : Callable[[], Any]
+        Workload to profile.
+    output_prefix : str
+        Path prefix of the output files; parent directories are created.
+    participants : list[tuple[str, Any]], optional
+        (name, policy class) pairs used to label `act` time.
+    top_n : int, optional
+        Number of hot functions to report (default is 25).
+    sample_interval : float, optional
+        Seconds between stack samples (default is 0.005).
+
+    Returns
+    -------
+    Any
+        Whatever `fn` returns.
+    """
+    directory = os.path.dirname(output_prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval=sample_interval)
+    sampler.start()
+    profiler.enable()
+    try:
+        result = fn()
+    finally:
+        profiler.disable()
+        sampler.stop()
+
+        profiler.dump_stats(f"{output_prefix}.pstats")
+        sampler.write(f"{output_prefix}.collapsed")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+
+        stream.write("Time in act() per participant\n")
+        by_participant = act_time_by_participant(stats, participants)
+        for label, (calls, cumtime) in sorted(by_participant.items(), key=lambda item: -item[1][1]):
+            per_call = cumtime / calls * 1e3 if calls else 0.0
+            stream.write(f"   {label:<30} {calls:>8} calls {cumtime:>10.3f}s {per_call:>10.3f}ms/call\n")
+
+        report = stream.getvalue()
+        with open(f"{output_prefix}_top.txt", "w") as f:
+            f.write(report)
+        print(report)
+        print(f"Perfil guardado en {output_prefix}.pstats, {output_prefix}.collapsed y {output_prefix}_top.txt")
+
+    return result
@@ -0,0 +1,69 @@
+"""Incremental Elo ratings"""
+
+import math
+
+
+def expected_score(rating_a: float, rating_b: float) -> float:
+    """Expected score of A against B under the logistic Elo model."""
+    return 1.0 / (1.0 + 10 ** ((rating_b - rating_a) / 400.0))
+
+
+def elo_from_score(score: float) -> float:
+    """Elo difference implied by an expected score in (0, 1)."""
+    score = min(max(score, 1e-9), 1 - 1e-9)
+    return -400.0 * math.log10(1.0 / score - 1.0)
+
+
+class EloRating:
+    """
+    Elo rating table updated one game at a time.
+
+    New players start at `initial`. The K-factor is `provisional_k` for a
+    player's first `provisional_games` games, so newcomers converge quickly,
+    and `k` afterwards.
+    """
+
+    def __init__(self, initial: float = 1500.0, k: float = 16.0, provisional_k: float = 32.0, provisional_games: int = 20):
+        self.initial = initial
+        self.k = k
+        self.provisional_k = provisional_k
+        self.provisional_games = provisional_games
+        self.ratings: dict[str, float] = {}
+        self.games: dict[str, int] = {}
+
+    def add(self, name: str) -> None:
+        self.ratings.setdefault(name, self.initial)
+        self.games.setdefault(name, 0)
+
+    def rating(self, name: str) -> float:
+        return self.ratings.get(name, self.initial)
+
+    def _k(self, name: str) -> float:
+        return self.provisional_k if self.games.get(name, 0) < self.provisional_games else self.k
+
+    def update(self, a: str, b: str, score_a: float) -> None:
+        """Apply one game result; `score_a` is 1 (A won), 0.5 (draw) or 0 (B won)."""
+        self.add(a)
+        self.add(b)
+        expected_a = expected_score(self.ratings[a], self.ratings[b])
+        delta = score_a - expected_a
+        k_a, k_b = self._k(a), self._k(b)
+        self.ratings[a] += k_a * delta
+        self.ratings[b] -= k_b * delta
+        self.games[a] += 1
+        self.games[b] += 1
+
+    def update_match(self, match) -> None:
+        """Apply every game of a `Match`, in the order they were played."""
+        for result in match.results:
+            self.update(match.player_a, match.player_b, (result + 1) / 2)
+
+    def to_dict(self) -> dict:
+        return {"ratings": dict(self.ratings), "games": dict(self.games)}
+
+    @classmethod
+    def from_dict(cls, data: dict, **kwargs) -> "EloRating":
+        elo = cls(**kwargs)
+        elo.ratings = dict(data.get("ratings", {}))
+        elo.games = dict(data.get("games", {}))
+        return elo
@@ -0,0 +1,397 @@
+"""
+Remote agents over local sockets.
+
+An agent runs as a long-lived service (`serve_policy`) that wraps any
+`Policy` class, and the match runner (`RemoteAgent`, `play_remote_match`)
+connects to it over a Unix socket (`unix:/path/to/socket`) or TCP
+(`host:port`). Both sides speak line-delimited JSON, one object per line:
+
+    runner -> agent                         agent -> runner
+    {"type": "hello"}                       {"type": "hello", "policy": "Aha"}
+    {"type": "new_game", "timeout": 1.0}    {"type": "ready"}
+    {"type": "act", "id": 3, "board": B}    {"type": "action", "id": 3, "action": 4}
+    {"type": "end", "winner": -1}           (no reply)
+
+`B` is the 6x7 board as nested lists (row 0 at the top), exactly what
+`play` passes to `act`. Every game gets a fresh policy instance, as in
+`play`. A failed `act` is answered with {"type": "error", "message": ...}.
+
+The runner keeps a pool of open connections per agent, so many games (or
+matches) can run concurrently against the same service, and enforces a
+deadline on every move: an agent that answers late, answers with an
+illegal column or fails loses the game, and its connection is discarded.
+
+Serve a policy and play a match from the `tournament` directory:
+
+    python -m connect4.remote serve "Group A" --listen unix:/tmp/group_a.sock
+    python -m connect4.remote serve connect4.policy:MCTSAgent --listen 127.0.0.1:7001
+    python -m connect4.remote match unix:/tmp/group_a.sock 127.0.0.1:7001 --best-of 7
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import time
+
+import numpy as np
+
+from connect4.connect_state import ConnectState
+from connect4.dtos import Game, Match
+from connect4.instrumentation import MoveTimer
+from connect4.sprt import likelihood_of_superiority
+from connect4.utils import load_policy
+
+DEFAULT_MOVE_DEADLINE = 1.0
+
+
+class RemoteAgentError(Exception):
+    """The agent failed, broke the protocol or missed its move deadline."""
+
+
+async def open_address(address: str):
+    """(reader, writer) connected to `unix:/path` or `host:port`."""
+    if address.startswith("unix:"):
+        return await asyncio.open_unix_connection(address[len("unix:"):])
+    host, port = address.rsplit(":", 1)
+    return await asyncio.open_connection(host, int(port))
+
+
+async def start_server(handler, address: str):
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return await asyncio.start_unix_server(handler, path)
+    host, port = address.rsplit(":", 1)
+    return await asyncio.start_server(handler, host, int(port))
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+    writer.write(json.dumps(message).encode() + b"\n")
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader) -> dict | None:
+    line = await reader.readline()
+    return json.loads(line) if line else None
+
+
+def _policy_name(policy_factory) -> str:
+    # Classes, `LazyPolicy` stand-ins and partials
+    for attr in ("__name__", "class_name", "func"):
+        value = getattr(policy_factory, attr, None)
+        if isinstance(value, str):
+            return value
+        if value is not None:
+            return _policy_name(value)
+    return type(policy_factory).__name__
+
+
+# --------------------------------------------------------------------------
+# Agent side
+# --------------------------------------------------------------------------
+
+async def serve_policy(policy_factory, address: str) -> None:
+    """
+    Serve `policy_factory` (a `Policy` class or any callable returning a policy) forever.
+
+    Each connection is handled concurrently; `act` runs in a worker thread
+    so a slow move never blocks the other connections of the service.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        policy = None
+        try:
+            while (message := await _receive(reader)) is not None:
+                kind = message.get("type")
+                if kind == "hello":
+                    await _send(writer, {"type": "hello", "policy": _policy_name(policy_factory)})
+                elif kind == "new_game":
+                    if policy is not None:
+                        policy.close()
+                    policy = policy_factory()
+                    policy.mount(message.get("timeout"))
+                    await _send(writer, {"type": "ready"})
+                elif kind == "act":
+                    board = np.array(message["board"], dtype=int)
+                    try:
+                        action = await asyncio.to_thread(policy.act, board)
+                        await _send(writer, {"type": "action", "id": message["id"], "action": int(action)})
+                    except Exception as e:
+                        await _send(writer, {"type": "error", "id": message["id"], "message": repr(e)})
+                elif kind == "end" and policy is not None:
+                    policy.close()
+                    policy = None
+        except (ConnectionError, json.JSONDecodeError, asyncio.CancelledError):
+            pass  # client gone, garbage on the wire, or the service is shutting down
+        finally:
+            if policy is not None:
+                policy.close()
+            writer.close()
+
+    server = await start_server(handle, address)
+    async with server:
+        print(f"Sirviendo {_policy_name(policy_factory)} en {address}")
+        await server.serve_forever()
+
+
+# --------------------------------------------------------------------------
+# Runner side
+# --------------------------------------------------------------------------
+
+class RemoteAgent:
+    """
+    Connection pool to one agent service.
+
+    Parameters
+    ----------
+    address : str
+        `unix:/path` or `host:port` of the service.
+    max_connections : int, optional
+        Games played at the same time against this agent (default is 8).
+    move_deadline : float, optional
+        Seconds the agent has to answer each move (default is 1.0).
+    """
+
+    def __init__(self, address: str, max_connections: int = 8, move_deadline: float = DEFAULT_MOVE_DEADLINE):
+        self.address = address
+        self.move_deadline = move_deadline
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+        self.connections_opened = 0
+
+    @contextlib.asynccontextmanager
+    async def game(self):
+        """A `RemoteGame` on a pooled connection; the connection is reused unless the game broke it."""
+        async with self._slots:
+            if self._idle:
+                reader, writer = self._idle.pop()
+            else:
+                reader, writer = await open_address(self.address)
+                self.connections_opened += 1
+            game = RemoteGame(reader, writer, self.move_deadline)
+            try:
+                await game.start()
+                yield game
+            finally:
+                if game.healthy:
+                    try:
+                        await game.end()
+                    except ConnectionError:
+                        game.healthy = False
+                if game.healthy:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+
+    async def close(self) -> None:
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+class RemoteGame:
+    """One game on one connection: `act` enforces the move deadline."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, move_deadline: float):
+        self.reader = reader
+        self.writer = writer
+        self.move_deadline = move_deadline
+        self.healthy = True
+        self.winner = 0
+        self._next_id = 0
+
+    async def _request(self, message: dict, timeout: float) -> dict:
+        try:
+            await _send(self.writer, message)
+            reply = await asyncio.wait_for(_receive(self.reader), timeout)
+        except asyncio.TimeoutError:
+            self.healthy = False  # a late reply would be read as the answer to the next request
+            raise RemoteAgentError(f"no answer within {timeout:.3f}s") from None
+        except (ConnectionError, json.JSONDecodeError) as e:
+            self.healthy = False
+            raise RemoteAgentError(repr(e)) from e
+        if reply is None:
+            self.healthy = False
+            raise RemoteAgentError("connection closed")
+        return reply
+
+    async def start(self) -> None:
+        reply = await self._request({"type": "new_game", "timeout": self.move_deadline}, timeout=max(self.move_deadline, 5.0))
+        if reply.get("type") != "ready":
+            self.healthy = False
+            raise RemoteAgentError(f"unexpected reply {reply}")
+
+    async def act(self, board: np.ndarray) -> int:
+        self._next_id += 1
+        reply = await self._request({"type": "act", "id": self._next_id, "board": board.tolist()}, self.move_deadline)
+        if reply.get("type") == "error":
+            raise RemoteAgentError(reply.get("message", "error"))
+        if reply.get("type") != "action" or reply.get("id") != self._next_id:
+            self.healthy = False
+            raise RemoteAgentError(f"unexpected reply {reply}")
+        return int(reply["action"])
+
+    async def end(self) -> None:
+        await _send(self.writer, {"type": "end", "winner": self.winner})
+
+
+async def play_remote_game(first: RemoteAgent, second: RemoteAgent, timer: MoveTimer | None = None,
+                           names: tuple[str, str] = ("first", "second")) -> tuple[int, Game]:
+    """
+    Play one game; returns (winner, history) with winner -1 (first), 1 (second) or 0 (draw).
+
+    A player that misses a deadline, fails or plays an illegal column loses.
+    """
+    history = Game()
+    winner = 0
+    async with contextlib.AsyncExitStack() as stack:
+        # Connections are taken in a fixed order so that concurrent games
+        # between the same two agents cannot deadlock on their pools
+        games: dict[int, RemoteGame] = {}
+        for player, agent in sorted(((-1, first), (1, second)), key=lambda item: id(item[1])):
+            try:
+                games[player] = await stack.enter_async_context(agent.game())
+            except (RemoteAgentError, OSError) as e:
+                print(f"   {names[player == 1]} pierde la partida: {e}")
+                winner = -player
+                break
+
+        state = ConnectState()
+        while winner == 0 and not state.is_final():
+            name = names[state.player == 1]
+            start = time.perf_counter()
+            try:
+                action = await games[state.player].act(state.board)
+                if not state.is_applicable(action):
+                    raise RemoteAgentError(f"illegal column {action}")
+            except RemoteAgentError as e:
+                print(f"   {name} pierde la partida: {e}")
+                winner = -state.player
+                break
+            if timer is not None:
+                timer.latencies[name].append(time.perf_counter() - start)
+            history.append((state.board.copy().tolist(), action))
+            state = state.transition(action)
+            winner = int(state.get_winner())
+        for game in games.values():
+            game.winner = winner
+    if timer is not None:
+        timer.end_game()
+    return winner, history
+
+
+async def play_remote_match(
+    a: tuple[str, RemoteAgent],
+    b: tuple[str, RemoteAgent],
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+) -> Match:
+    """Best-of-N match between two remote agents, with the same rules and `Match` record as `play_match`."""
+    (a_name, a_agent), (b_name, b_agent) = a, b
+    rng = np.random.default_rng(seed)
+    games_to_win = best_of // 2 + 1
+    a_wins = b_wins = draws = 0
+    games: list[Game] = []
+    results: list[int] = []
+    timer = MoveTimer()
+
+    while a_wins < games_to_win and b_wins < games_to_win:
+        a_first = rng.random() < first_player_distribution
+        order = (a_agent, b_agent) if a_first else (b_agent, a_agent)
+        names = (a_name, b_name) if a_first else (b_name, a_name)
+        winner, history = await play_remote_game(*order, timer=timer, names=names)
+        games.append(history)
+        a_won = winner == (-1 if a_first else 1)
+        if winner == 0:
+            draws += 1
+            results.append(0)
+        elif a_won:
+            a_wins += 1
+            results.append(1)
+        else:
+            b_wins += 1
+            results.append(-1)
+        if draws >= games_to_win + 5:
+            break
+
+    if a_wins > 0 or b_wins > 0:
+        winner_name = a_name if a_wins > b_wins else b_name
+    else:
+        winner_name = a_name if rng.random() < 0.5 else b_name
+
+    return Match(
+        player_a=a_name,
+        player_b=b_name,
+        player_a_wins=a_wins,
+        player_b_wins=b_wins,
+        draws=draws,
+        games=games,
+        results=results,
+        winner=winner_name,
+        confidence=likelihood_of_superiority(a_wins, b_wins) if winner_name == a_name
+        else likelihood_of_superiority(b_wins, a_wins),
+        move_times=dict(timer.latencies),
+        latency=timer.latency_summary(),
+        wall_time=timer.elapsed,
+        moves_per_second=timer.moves_per_second(),
+        games_per_second=timer.games_per_second(),
+    )
+
+
+async def play_remote_pairings(
+    pairings: list[tuple[tuple[str, RemoteAgent], tuple[str, RemoteAgent]]],
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+) -> list[Match]:
+    """Play every pairing concurrently (bounded by each agent's connection pool), in pairing order."""
+    return await asyncio.gather(*(
+        play_remote_match(a, b, best_of, first_player_distribution, seed + i)
+        for i, (a, b) in enumerate(pairings)
+    ))
+
+
+# --------------------------------------------------------------------------
+# Command line
+# --------------------------------------------------------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Agentes remotos por sockets locales")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="Servir una política")
+    serve.add_argument("policy", help="module:Clase o nombre de un participante de groups/")
+    serve.add_argument("--listen", required=True, help="unix:/ruta/al/socket o host:puerto")
+
+    match = sub.add_parser("match", help="Jugar un match entre dos agentes remotos")
+    match.add_argument("a", help="Dirección del agente A")
+    match.add_argument("b", help="Dirección del agente B")
+    match.add_argument("--best-of", type=int, default=7)
+    match.add_argument("--seed", type=int, default=911)
+    match.add_argument("--deadline", type=float, default=DEFAULT_MOVE_DEADLINE, help="Segundos por jugada")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve_policy(load_policy(args.policy), args.listen))
+        return
+
+    async def run():
+        a = RemoteAgent(args.a, move_deadline=args.deadline)
+        b = RemoteAgent(args.b, move_deadline=args.deadline)
+        try:
+            return await play_remote_match((args.a, a), (args.b, b), args.best_of, seed=args.seed)
+        finally:
+            await a.close()
+            await b.close()
+
+    result = asyncio.run(run())
+    print(f"{result.player_a} {result.player_a_wins} - {result.player_b_wins} {result.player_b} "
+          f"({result.draws} empates), ganador: {result.winner}")
+
+
+if __name__ == "__main__":
+    main()
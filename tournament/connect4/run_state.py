@@ -0,0 +1,61 @@
+"""
+Durable run state for resuming interrupted tournaments.
+
+State files are JSON written to a temporary name and renamed into place,
+so an interruption leaves either the previous state or the new one. Agents
+draw from the global `random` and `numpy.random` generators, so the state
+also records both generators; restoring them makes a resumed run play
+exactly the games the uninterrupted run would have played.
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+
+from connect4.dtos import Game, Match
+
+
+def write_json_atomic(path: str, data: dict) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def read_json(path: str) -> dict | None:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def rng_state() -> dict:
+    """JSON-serializable state of the global `random` and `numpy.random` generators."""
+    version, internal, gauss = random.getstate()
+    name, keys, pos, has_gauss, cached = np.random.get_state()
+    return {
+        "random": [version, list(internal), gauss],
+        "numpy": [name, keys.tolist(), int(pos), int(has_gauss), float(cached)],
+    }
+
+
+def restore_rng(state: dict) -> None:
+    version, internal, gauss = state["random"]
+    random.setstate((version, tuple(internal), gauss))
+    name, keys, pos, has_gauss, cached = state["numpy"]
+    np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached))
+
+
+def match_to_dict(match: Match) -> dict:
+    return match.model_dump(mode="json")
+
+
+def match_from_dict(data: dict) -> Match:
+    return Match(**{**data, "games": [Game(tuple(move) for move in game) for game in data.get("games", [])]})
@@ -0,0 +1,213 @@
+"""
+Alpha-beta negamax solver on bitboards.
+
+`NegamaxAgent` deepens its search one ply at a time until the move's time
+budget runs out or the result is proven. Scores are from the point of
+view of the player to move: `WIN - n` for a win on ply `n` (so faster
+wins score higher), its negation for a loss, 0 for a draw, and a small
+heuristic value (open threes and center control) at the horizon.
+Positions use the representation of `connect4.bitboard`.
+"""
+
+import time
+
+import numpy as np
+
+from . import bitboard as bb
+from .base_policy import Policy
+
+WIN = 1000  # a win in n plies scores WIN - n, so faster wins score higher
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class _Timeout(Exception):
+    pass
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table indexed by `key % size`.
+
+    Replacement is depth-preferred: an entry is only overwritten by a
+    search of the same or greater depth, or by the same position.
+    """
+
+    def __init__(self, size: int = 1 << 18):
+        self.size = size
+        self.keys = [0] * size
+        self.depths = [-1] * size
+        self.values = [0] * size
+        self.flags = [EXACT] * size
+        self.moves = [-1] * size
+
+    def probe(self, key: int):
+        """(depth, value, flag, move) stored for `key`, or None."""
+        i = key % self.size
+        if self.keys[i] != key:
+            return None
+        return self.depths[i], self.values[i], self.flags[i], self.moves[i]
+
+    def store(self, key: int, depth: int, value: int, flag: int, move: int) -> None:
+        i = key % self.size
+        if self.keys[i] != key and self.depths[i] > depth:
+            return
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.values[i] = value
+        self.flags[i] = flag
+        self.moves[i] = move
+
+    def clear(self) -> None:
+        self.__init__(self.size)
+
+
+class NegamaxAgent(Policy):
+    """
+    Iterative-deepening negamax with alpha-beta pruning on bitboards.
+
+    - Moves are searched center-first, after the best move stored in the
+      transposition table for the position.
+    - Positions beyond the search horizon are scored by the difference in
+      open three-in-a-rows plus center control.
+    - Each move stops deepening once `time_limit` seconds (or the timeout
+      passed to `mount`) are nearly spent, or once the position is solved.
+    """
+
+    def __init__(self, time_limit: float = 1.0, max_depth: int = 42, tt_size: int = 1 << 18, safety: float = 0.9):
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.safety = safety
+        self.tt = TranspositionTable(tt_size)
+        self.nodes = 0
+        self._deadline = float("inf")
+        self._last_stats = {"nodes": 0, "depth": 0, "nodes_per_s": 0.0}
+
+    def mount(self, timeout=None):
+        if timeout is not None:
+            self.time_limit = timeout
+
+    def act(self, s):
+        if hasattr(s, "mask"):  # StateView: bitboards maintained by the engine
+            position, mask = s.position, s.mask
+        else:
+            board = s.board if hasattr(s, "board") else np.array(s)
+            position, mask = bb.from_array(board)
+        valid = [c for c in bb.CENTER_ORDER if bb.can_play(mask, c)]
+        if not valid:
+            return 0
+
+        for col in valid:
+            if bb.is_winning_move(position, mask, col):
+                self._last_stats = {"nodes": 0, "depth": 1, "nodes_per_s": 0.0}
+                return col
+
+        start = time.perf_counter()
+        self._deadline = start + self.time_limit * self.safety
+        self.nodes = 0
+        best_move, depth_reached = valid[0], 0
+        remaining = bb.ROWS * bb.COLS - bb.popcount(mask)
+        for depth in range(1, min(self.max_depth, remaining) + 1):
+            try:
+                score, move = self._root(position, mask, depth)
+            except _Timeout:
+                break
+            best_move, depth_reached = move, depth
+            if abs(score) > WIN - 100:  # forced result found
+                break
+
+        elapsed = time.perf_counter() - start
+        self._last_stats = {
+            "nodes": self.nodes,
+            "depth": depth_reached,
+            "nodes_per_s": self.nodes / elapsed if elapsed > 0 else 0.0,
+        }
+        return best_move
+
+    def get_search_stats(self):
+        return dict(self._last_stats)
+
+    def search(self, position: int, mask: int, depth: int) -> tuple[int, int]:
+        """Fixed-depth search without time limit; returns (score, best column)."""
+        self._deadline = float("inf")
+        return self._root(position, mask, depth)
+
+    def _ordered_moves(self, mask: int, first: int) -> list[int]:
+        order = [c for c in bb.CENTER_ORDER if bb.can_play(mask, c)]
+        if first in order:
+            order.remove(first)
+            order.insert(0, first)
+        return order
+
+    def _root(self, position: int, mask: int, depth: int) -> tuple[int, int]:
+        entry = self.tt.probe(bb.key(position, mask))
+        moves = self._ordered_moves(mask, entry[3] if entry else -1)
+        alpha, beta = -WIN - 1, WIN + 1
+        best_move = moves[0]
+        n = bb.popcount(mask)
+        for col in moves:
+            if bb.is_winning_move(position, mask, col):
+                return WIN - n, col
+            new_position, new_mask = bb.play(position, mask, col)
+            score = -self._negamax(new_position, new_mask, depth - 1, -beta, -alpha, n + 1)
+            if score > alpha:
+                alpha, best_move = score, col
+        self.tt.store(bb.key(position, mask), depth, alpha, EXACT, best_move)
+        return alpha, best_move
+
+    def _negamax(self, position: int, mask: int, depth: int, alpha: int, beta: int, n: int) -> int:
+        self.nodes += 1
+        if not self.nodes & 1023 and time.perf_counter() > self._deadline:
+            raise _Timeout()
+
+        if n == bb.ROWS * bb.COLS:
+            return 0
+
+        for col in bb.CENTER_ORDER:
+            if bb.can_play(mask, col) and bb.is_winning_move(position, mask, col):
+                return WIN - n
+
+        if depth == 0:
+            return self._evaluate(position, mask)
+
+        key = bb.key(position, mask)
+        entry = self.tt.probe(key)
+        tt_move = -1
+        if entry is not None:
+            e_depth, e_value, e_flag, tt_move = entry
+            if e_depth >= depth:
+                if e_flag == EXACT:
+                    return e_value
+                if e_flag == LOWER:
+                    alpha = max(alpha, e_value)
+                elif e_flag == UPPER:
+                    beta = min(beta, e_value)
+                if alpha >= beta:
+                    return e_value
+
+        original_alpha = alpha
+        best, best_move = -WIN - 1, -1
+        for col in self._ordered_moves(mask, tt_move):
+            new_position, new_mask = bb.play(position, mask, col)
+            score = -self._negamax(new_position, new_mask, depth - 1, -beta, -alpha, n + 1)
+            if score > best:
+                best, best_move = score, col
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt.store(key, depth, best, flag, best_move)
+        return best
+
+    @staticmethod
+    def _evaluate(position: int, mask: int) -> int:
+        opponent = position ^ mask
+        threats = bb.popcount(bb.winning_positions(position, mask)) - bb.popcount(bb.winning_positions(opponent, mask))
+        center = bb.popcount(position & bb.column_mask(3)) - bb.popcount(opponent & bb.column_mask(3))
+        return 4 * threats + center
@@ -0,0 +1,65 @@
+"""Sequential probability ratio test (SPRT) on game results"""
+
+import math
+from dataclasses import dataclass
+
+from connect4.ratings import expected_score
+
+
+@dataclass
+class SPRT:
+    """
+    SPRT configuration for a match between A and B.
+
+    H0: A is `elo0` points stronger than B; H1: A is `elo1` points stronger.
+    Accepting H1 means "A is the stronger player". Accepting H0 only rejects
+    H1 (A is not `elo1` points stronger), so `play_match` then decides the
+    match on the games played, as without SPRT.
+    `alpha` and `beta` are the false positive / false negative rates, and
+    `max_games` caps the match when the test stays undecided.
+    """
+
+    elo0: float = -100.0
+    elo1: float = 100.0
+    alpha: float = 0.05
+    beta: float = 0.05
+    max_games: int = 40
+
+    @property
+    def lower_bound(self) -> float:
+        return math.log(self.beta / (1 - self.alpha))
+
+    @property
+    def upper_bound(self) -> float:
+        return math.log((1 - self.beta) / self.alpha)
+
+    def llr(self, wins: int, draws: int, losses: int) -> float:
+        """
+        Log-likelihood ratio of H1 against H0 given A's game record.
+
+        Uses the normal (GSPRT) approximation of the trinomial model. Half a
+        game of each outcome is added as a prior so that the variance is
+        defined for one-sided records such as 3-0-0.
+        """
+        w, d, l = wins + 0.5, draws + 0.5, losses + 0.5
+        n = w + d + l
+        mean = (w + 0.5 * d) / n
+        variance = (w + 0.25 * d) / n - mean ** 2
+        s0, s1 = expected_score(self.elo0, 0.0), expected_score(self.elo1, 0.0)
+        return n * (s1 - s0) * (2 * mean - s0 - s1) / (2 * variance)
+
+    def decide(self, wins: int, draws: int, losses: int) -> str | None:
+        """'H1', 'H0', or None while the test is undecided."""
+        llr = self.llr(wins, draws, losses)
+        if llr >= self.upper_bound:
+            return "H1"
+        if llr <= self.lower_bound:
+            return "H0"
+        return None
+
+
+def likelihood_of_superiority(wins: int, losses: int) -> float:
+    """Probability that A is stronger than B given its wins and losses (draws carry no information)."""
+    if wins + losses == 0:
+        return 0.5
+    return 0.5 * (1 + math.erf((wins - losses) / math.sqrt(2 * (wins + losses))))
@@ -0,0 +1,75 @@
+"""Read-only view of a game state, handed to policies instead of a raw board"""
+
+import numpy as np
+
+
+class StateView(np.ndarray):
+    """
+    The (6, 7) board of a `ConnectState`, plus what the engine already knows about it.
+
+    It is an ndarray, so policies written for raw boards (`board[0, c]`,
+    `np.count_nonzero(board == -1)`, `s.board if hasattr(s, "board") ...`)
+    keep working unchanged. It is read-only, and arithmetic, comparisons,
+    copies and slices of it are plain ndarrays. The extra attributes are
+    maintained incrementally by `ConnectState.transition`:
+
+    player       colour to move (-1 red, 1 yellow)
+    heights      stones per column, bottom to top (tuple of 7 ints)
+    free_mask    bool array, True for the columns that can be played
+    last_move    column of the previous move, or None
+    move_number  number of stones on the board
+    position     bitboard of the stones of the player to move (see `bitboard`)
+    mask         bitboard of every stone
+    hash         `position + mask`, the key used by the opening book and caches
+    """
+
+    player: int
+    heights: tuple[int, ...]
+    last_move: int | None
+    move_number: int
+    position: int
+    mask: int
+
+    def __new__(cls, board: np.ndarray, player: int, heights, last_move: int | None, move_number: int,
+                position: int, mask: int) -> "StateView":
+        view = np.asarray(board).view(cls)
+        view.flags.writeable = False
+        view.player = player
+        view.heights = tuple(heights)
+        view.last_move = last_move
+        view.move_number = move_number
+        view.position = position
+        view.mask = mask
+        return view
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # Results of operations are plain arrays, not views with stale attributes
+        inputs = tuple(x.view(np.ndarray) if isinstance(x, StateView) else x for x in inputs)
+        if "out" in kwargs:
+            kwargs["out"] = tuple(x.view(np.ndarray) if isinstance(x, StateView) else x for x in kwargs["out"])
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+    def __getitem__(self, key):
+        return self.view(np.ndarray)[key]
+
+    def copy(self, order="C") -> np.ndarray:
+        return np.array(self.view(np.ndarray), order=order)
+
+    def __reduce__(self):
+        # Pickles (e.g. to worker processes) as a plain board
+        return self.view(np.ndarray).__reduce__()
+
+    @property
+    def board(self) -> "StateView":
+        return self
+
+    @property
+    def free_mask(self) -> np.ndarray:
+        return np.array([height < self.shape[0] for height in self.heights])
+
+    @property
+    def hash(self) -> int:
+        return self.position + self.mask
+
+    def valid_actions(self) -> list[int]:
+        return [c for c, height in enumerate(self.heights) if height < self.shape[0]]
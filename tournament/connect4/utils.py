@@ -1,39 +1,248 @@
+import ast
 import sys
+import json
+import time
+import hashlib
 import pathlib
 import inspect
 import importlib
 import importlib.util
 from typing import Type
 
+DISCOVERY_CACHE = pathlib.Path(".cache") / "policy_discovery.json"
 
-def find_importable_classes(folder_route: str, base_class: Type) -> dict[str, Type]:
+
+class LazyPolicy:
+    """
+    Stand-in for a policy class discovered on disk but not imported yet.
+
+    Calling it (as `play` does to instantiate a policy) imports the module on
+    first use and forwards to the real class. Attribute access is forwarded
+    too, so it can be used wherever the class was used before. Instances
+    pickle as (path, class name), so they can be sent to worker processes.
+    """
+
+    def __init__(self, name: str, path: str, class_name: str, source_hash: str, base_class: Type | None = None):
+        self.name = name
+        self.path = path
+        self.class_name = class_name
+        self.source_hash = source_hash
+        self.base_class = base_class
+        self.load_time = 0.0
+        self._cls = None
+
+    def load(self) -> Type:
+        if self._cls is None:
+            start = time.perf_counter()
+            py_file = pathlib.Path(self.path)
+            module = _import_file(py_file)
+
+            cls = getattr(module, self.class_name, None)
+            if not inspect.isclass(cls) or (self.base_class is not None and not issubclass(cls, self.base_class)):
+                raise ImportError(f"{self.class_name} en {py_file} no es una Policy")
+            self._cls = cls
+            self.load_time = time.perf_counter() - start
+        return self._cls
+
+    @property
+    def loaded(self) -> bool:
+        return self._cls is not None
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") or attr == "_cls":
+            raise AttributeError(attr)
+        return getattr(self.load(), attr)
+
+    def __reduce__(self):
+        return (LazyPolicy, (self.name, self.path, self.class_name, self.source_hash, self.base_class))
+
+    def __repr__(self) -> str:
+        return f"<LazyPolicy {self.class_name} from {self.path}>"
+
+
+def _import_file(py_file: pathlib.Path):
+    # Load module using spec for files with spaces in path
+    spec = importlib.util.spec_from_file_location(
+        f"policy_{py_file.parent.name.replace(' ', '_')}", py_file
+    )
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No se puede cargar {py_file}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # so inspect and pickle can find the module of its classes
+    spec.loader.exec_module(module)
+    return module
+
+
+def _import_policy_class(py_file: pathlib.Path, base_class: Type) -> Type | None:
+    """Import `py_file` and return its last (alphabetically) `base_class` subclass, if any."""
+    module = _import_file(py_file)
+    found = None
+    for name, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, base_class) and obj is not base_class and obj.__module__ == module.__name__:
+            found = obj
+    return found
+
+
+def _file_hash(path: pathlib.Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _scan_policy_classes(path: pathlib.Path, base_name: str) -> tuple[list[str], list[str]]:
+    """
+    Classes defined in `path` that derive from `base_name`, as far as the file itself tells.
+
+    Returns the names of the classes that (transitively, within the file)
+    derive from `base_name`, and those that may: they derive from a class
+    imported from another module (or from such a class defined in the
+    file), so only importing the file can tell.
+    """
+    tree = ast.parse(path.read_bytes(), filename=str(path))
+    classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+
+    def base_names(node: ast.ClassDef) -> set[str]:
+        names = set()
+        for base in node.bases:
+            if isinstance(base, ast.Name):
+                names.add(base.id)
+            elif isinstance(base, ast.Attribute):
+                names.add(base.attr)
+        return names
+
+    found: list[str] = []
+    known = {base_name}
+    changed = True
+    while changed:
+        changed = False
+        for node in classes:
+            if node.name not in known and base_names(node) & known:
+                known.add(node.name)
+                found.append(node.name)
+                changed = True
+
+    local = {node.name for node in classes}
+    unresolved = {node.name for node in classes
+                  if node.name not in known and base_names(node) - local - {"object"}}
+    changed = True
+    while changed:
+        changed = False
+        for node in classes:
+            if node.name not in known | unresolved and base_names(node) & unresolved:
+                unresolved.add(node.name)
+                changed = True
+    return sorted(found), sorted(unresolved)
+
+
+def _load_manifest(cache_path: pathlib.Path) -> dict:
+    try:
+        with open(cache_path) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_manifest(cache_path: pathlib.Path, manifest: dict) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    tmp.replace(cache_path)
+
+
+def find_importable_classes(
+    folder_route: str,
+    base_class: Type,
+    lazy: bool = True,
+    cache_path: str | pathlib.Path | None = DISCOVERY_CACHE,
+    verbose: bool = False,
+) -> dict[str, Type]:
+    """
+    Discover the `base_class` subclasses under `folder_route`, one per folder.
+
+    Files are scanned statically (no code is executed) and the result is kept
+    in a manifest keyed by path, mtime and content hash, so only new or
+    changed files are re-scanned on later runs. With `lazy=True` the returned
+    values are `LazyPolicy` objects that import their module the first time
+    the participant is instantiated; with `lazy=False` every module is
+    imported right away and the real classes are returned.
+
+    Files with a class that cannot be traced to `base_class` within the
+    file (e.g. a policy deriving from one imported from elsewhere) are
+    imported and their classes checked with `issubclass`; the real class
+    is returned for them.
+    With `verbose`, the number of files scanned and the time taken are printed.
+    """
+    start = time.perf_counter()
     candidates = {}
     folder_path = pathlib.Path(folder_route).resolve()
+    manifest_path = pathlib.Path(cache_path) if cache_path is not None else None
+    manifest = _load_manifest(manifest_path) if manifest_path is not None else {}
+    new_manifest = {}
+    scanned = 0
 
-    for py_file in folder_path.rglob("*.py"):
+    for py_file in sorted(folder_path.rglob("*.py")):
         if py_file.name == "__init__.py":
             continue
-            
+
         try:
-            # Load module using spec for files with spaces in path
-            spec = importlib.util.spec_from_file_location(
-                f"policy_{py_file.parent.name.replace(' ', '_')}", py_file
-            )
-            if spec is None or spec.loader is None:
+            key = str(py_file)
+            stat = py_file.stat()
+            entry = manifest.get(key)
+            if entry is None or entry["mtime"] != stat.st_mtime or entry["size"] != stat.st_size \
+                    or not isinstance(entry.get("unresolved"), list):  # manifests written before per-class fallback
+                digest = _file_hash(py_file)
+                if entry is None or entry["sha256"] != digest or entry.get("base") != base_class.__name__ \
+                        or not isinstance(entry.get("unresolved"), list):
+                    scanned += 1
+                    classes, unresolved = _scan_policy_classes(py_file, base_class.__name__)
+                    entry = {
+                        "sha256": digest,
+                        "base": base_class.__name__,
+                        "classes": classes,
+                        "unresolved": unresolved,
+                    }
+                entry = {**entry, "mtime": stat.st_mtime, "size": stat.st_size}
+            new_manifest[key] = entry
+
+            # Use folder name as agent name (last class in alphabetical order, as before)
+            agent_name = py_file.parent.name
+            classes, unresolved = entry["classes"], entry["unresolved"]
+            if unresolved and (not classes or unresolved[-1] > classes[-1]):
+                # A class that would win if it is a policy: only importing the file can tell
+                cls = _import_policy_class(py_file, base_class)
+                if cls is not None:
+                    candidates[agent_name] = cls
+                continue
+            if not classes:
                 continue
-                
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
-            
-            for name, obj in inspect.getmembers(module, inspect.isclass):
-                if (issubclass(obj, base_class) and 
-                    obj is not base_class and 
-                    obj.__module__ == module.__name__):
-                    # Use folder name as agent name (remove "Group " prefix if present)
-                    agent_name = py_file.parent.name
-                    candidates[agent_name] = obj
+            candidate = LazyPolicy(agent_name, key, classes[-1], entry["sha256"], base_class)
+            candidates[agent_name] = candidate if lazy else candidate.load()
         except Exception as e:
             print(f"⚠️ Error cargando {py_file}: {e}")
             continue
 
+    if manifest_path is not None and new_manifest != manifest:
+        _save_manifest(manifest_path, new_manifest)
+
+    if verbose:
+        elapsed = time.perf_counter() - start
+        print(
+            f"⏱ Descubrimiento de políticas: {len(new_manifest)} archivos, "
+            f"{scanned} re-escaneados, {elapsed * 1e3:.1f} ms"
+        )
     return candidates
+
+
+def load_policy(spec: str, folder_route: str = "groups"):
+    """A policy class from `module:Class` or from the name of a participant discovered in `folder_route`."""
+    if ":" in spec:
+        module, class_name = spec.split(":", 1)
+        return getattr(importlib.import_module(module), class_name)
+    from connect4.base_policy import Policy
+
+    participants = find_importable_classes(folder_route, Policy)
+    if spec not in participants:
+        raise SystemExit(f"No se encontró la política {spec!r}; disponibles: {sorted(participants)}")
+    return participants[spec]
@@ -0,0 +1,322 @@
+"""
+Round-robin and Swiss-system tournaments.
+
+Both formats share the same machinery: every round is a list of pairings
+that are played in batches (concurrently when `workers > 1`), Elo ratings
+are updated after every game, and ratings plus standings are checkpointed
+to JSON once the round is over. With `resume=True` a run continues after
+the last checkpointed round.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+from connect4.dtos import Match, Participant, Versus
+from connect4.instrumentation import print_performance_summary
+from connect4.isolation import MemoryLimit
+from connect4.match_cache import MatchCache
+from connect4.ratings import EloRating
+from connect4.run_state import read_json, restore_rng, rng_state, write_json_atomic
+from connect4.sprt import SPRT
+from tournament import completed_matches, play_match, save_match
+
+
+class Standings:
+    """Match points (1 per match won or BYE), game record and opponents met, per player."""
+
+    def __init__(self, names: list[str]):
+        self.rows = {
+            name: {"match_points": 0.0, "matches": 0, "wins": 0, "losses": 0, "draws": 0, "byes": 0}
+            for name in names
+        }
+        self.opponents: dict[str, set[str]] = {name: set() for name in names}
+
+    def record(self, match: Match) -> None:
+        a, b = match.player_a, match.player_b
+        for name, wins, losses in ((a, match.player_a_wins, match.player_b_wins), (b, match.player_b_wins, match.player_a_wins)):
+            row = self.rows[name]
+            row["matches"] += 1
+            row["wins"] += wins
+            row["losses"] += losses
+            row["draws"] += match.draws
+        self.rows[match.winner]["match_points"] += 1.0
+        self.opponents[a].add(b)
+        self.opponents[b].add(a)
+
+    def record_bye(self, name: str) -> None:
+        self.rows[name]["match_points"] += 1.0
+        self.rows[name]["byes"] += 1
+
+    def table(self, elo: EloRating) -> list[dict]:
+        """Rows sorted by match points, then rating."""
+        rows = [{"name": name, "rating": round(elo.rating(name), 1), **row} for name, row in self.rows.items()]
+        return sorted(rows, key=lambda r: (-r["match_points"], -r["rating"], r["name"]))
+
+    def to_dict(self) -> dict:
+        return {"rows": self.rows, "opponents": {k: sorted(v) for k, v in self.opponents.items()}}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Standings":
+        standings = cls(list(data["rows"]))
+        standings.rows = {name: dict(row) for name, row in data["rows"].items()}
+        standings.opponents = {name: set(opponents) for name, opponents in data["opponents"].items()}
+        return standings
+
+
+def _play_pairing(args) -> Match:
+    return play_match(*args)
+
+
+def play_pairings(
+    pairings: list[tuple[Participant, Participant]],
+    best_of: int,
+    first_player_distribution: float,
+    seed: int,
+    pool: ProcessPoolExecutor | None = None,
+    batch_size: int = 16,
+    sprt: SPRT | None = None,
+    memory: MemoryLimit | None = None,
+    cache: MatchCache | None = None,
+):
+    """
+    Play the given pairings and yield their `Match` results in pairing order.
+
+    Pairings are submitted to `pool` in batches of `batch_size`, so a round
+    with hundreds of agents never queues more than one batch at a time.
+    Without a pool the matches are played sequentially in this process.
+    With `cache`, only the pairings missing from it are played.
+    """
+    jobs = [(a, b, best_of, first_player_distribution, seed + i, sprt, memory) for i, (a, b) in enumerate(pairings)]
+    keys = [cache.key(*job) for job in jobs] if cache is not None else [None] * len(jobs)
+    cached = [cache.get(key) for key in keys] if cache is not None else [None] * len(jobs)
+    for start in range(0, len(jobs), batch_size):
+        batch = range(start, min(start + batch_size, len(jobs)))
+        missing = [jobs[i] for i in batch if cached[i] is None]
+        played = map(_play_pairing, missing) if pool is None else pool.map(_play_pairing, missing)
+        for i in batch:
+            match = cached[i]
+            if match is None:
+                match = next(played)
+                if cache is not None:
+                    cache.put(keys[i], match)
+            else:
+                save_match(match)
+            yield match
+
+
+def round_robin_schedule(players: list[Participant], cycles: int = 1) -> list[Versus]:
+    """Circle-method schedule: every player meets every other player once per cycle (None is a BYE)."""
+    slots: list[Participant | None] = players[:]
+    if len(slots) % 2:
+        slots.append(None)
+    n = len(slots)
+    rounds = []
+    for cycle in range(cycles):
+        for r in range(n - 1):
+            pairs = [(slots[i], slots[n - 1 - i]) for i in range(n // 2)]
+            if (r + cycle) % 2:  # alternate who is listed first
+                pairs = [(b, a) for a, b in pairs]
+            rounds.append(pairs)
+            slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def swiss_pairings(players: list[Participant], standings: Standings, elo: EloRating) -> Versus:
+    """
+    Pair players with similar match points, avoiding rematches when possible.
+
+    With an odd field the lowest-ranked player that has not had a BYE yet
+    gets one. Pairing is greedy from the top of the table, which scales to
+    hundreds of players; a rematch is only allowed when no fresh opponent is left.
+    """
+    by_name = {p[0]: p for p in players}
+    order = [row["name"] for row in standings.table(elo)]
+    pairs: Versus = []
+
+    if len(order) % 2:
+        bye = next((n for n in reversed(order) if standings.rows[n]["byes"] == 0), order[-1])
+        order.remove(bye)
+        pairs.append((by_name[bye], None))
+
+    unpaired = order
+    while unpaired:
+        top = unpaired.pop(0)
+        idx = next((i for i, n in enumerate(unpaired) if n not in standings.opponents[top]), 0)
+        opponent = unpaired.pop(idx)
+        pairs.append((by_name[top], by_name[opponent]))
+    return pairs
+
+
+def _run_rounds(
+    format_name: str,
+    players: list[Participant],
+    next_round,
+    best_of: int,
+    first_player_distribution: float,
+    seed: int,
+    workers: int,
+    batch_size: int,
+    checkpoint_path: str | None,
+    sprt: SPRT | None,
+    resume: bool = False,
+    memory: MemoryLimit | None = None,
+    cache: MatchCache | None = None,
+) -> list[dict]:
+    names = [name for name, _ in players]
+    standings = Standings(names)
+    elo = EloRating()
+    for name in names:
+        elo.add(name)
+    history = []
+    round_index = 0
+    completed_matches.clear()
+
+    checkpoint = read_json(checkpoint_path) if resume and checkpoint_path else None
+    if checkpoint is not None:
+        if (checkpoint["format"], checkpoint["seed"], checkpoint["best_of"]) != (format_name, seed, best_of) \
+                or sorted(checkpoint["standings"]["rows"]) != sorted(names):
+            raise ValueError(f"{checkpoint_path} belongs to a tournament with different players or settings")
+        standings = Standings.from_dict(checkpoint["standings"])
+        elo = EloRating.from_dict(checkpoint["elo"])
+        history = checkpoint["matches"]
+        round_index = checkpoint["round"]
+        restore_rng(checkpoint["rng"])
+        print(f"Reanudando después de la ronda {round_index}")
+
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while (versus := next_round(round_index, standings, elo)) is not None:
+            round_index += 1
+            games = [(a, b) for a, b in versus if a is not None and b is not None]
+            for a, b in versus:
+                if a is None or b is None:
+                    standings.record_bye((a or b)[0])
+
+            round_seed = seed + 1000 * round_index
+            for match in play_pairings(games, best_of, first_player_distribution, round_seed, pool, batch_size, sprt,
+                                       memory, cache):
+                elo.update_match(match)
+                standings.record(match)
+                completed_matches.append(match)
+                history.append({
+                    "round": round_index,
+                    "player_a": match.player_a,
+                    "player_b": match.player_b,
+                    "winner": match.winner,
+                    "results": match.results,
+                })
+
+            table = standings.table(elo)
+            print(f"Ronda {round_index}: líder {table[0]['name']} ({table[0]['match_points']} pts, Elo {table[0]['rating']})")
+            if checkpoint_path:
+                write_json_atomic(checkpoint_path, {
+                    "format": format_name,
+                    "round": round_index,
+                    "seed": seed,
+                    "best_of": best_of,
+                    "elo": elo.to_dict(),
+                    "standings": standings.to_dict(),
+                    "table": table,
+                    "matches": history,
+                    "rng": rng_state(),
+                })
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    print_performance_summary(completed_matches)
+    return standings.table(elo)
+
+
+def run_round_robin(
+    players: list[Participant],
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+    cycles: int = 1,
+    workers: int = 1,
+    batch_size: int = 16,
+    checkpoint_path: str | None = "standings/round_robin.json",
+    sprt: SPRT | None = None,
+    resume: bool = False,
+    memory: MemoryLimit | None = None,
+    cache: MatchCache | None = None,
+) -> list[dict]:
+    """
+    Run a round-robin tournament and return the final standings table.
+
+    Parameters
+    ----------
+    players : List[Participant]
+        List of participants (name, policy) tuples.
+    best_of : int, optional
+        Number of games per match (default is 7).
+    first_player_distribution : float, optional
+        Distribution of games as first player (default is 0.5).
+    seed : int, optional
+        Random seed for reproducibility (default is 911).
+    cycles : int, optional
+        How many times every pairing is played (default is 1).
+    workers : int, optional
+        Worker processes playing the matches of a round concurrently (default is 1).
+    batch_size : int, optional
+        Pairings submitted to the workers at a time (default is 16).
+    checkpoint_path : str, optional
+        JSON file rewritten with ratings and standings after every round.
+    sprt : SPRT, optional
+        Play every match as a sequential test instead of best-of-N.
+    resume : bool, optional
+        Continue after the last round saved in `checkpoint_path` (default is False).
+        Results match an uninterrupted run when `workers` is 1.
+    memory : MemoryLimit, optional
+        Record per-agent memory and, with `memory.cap_mb`, forfeit the games
+        of an agent that goes over the cap.
+    cache : MatchCache, optional
+        Take the matches already played with the same code and settings
+        from the cache, and store the new ones in it.
+
+    """
+    schedule = round_robin_schedule(players, cycles)
+
+    def next_round(index, standings, elo):
+        return schedule[index] if index < len(schedule) else None
+
+    return _run_rounds("round_robin", players, next_round, best_of, first_player_distribution,
+                       seed, workers, batch_size, checkpoint_path, sprt, resume, memory, cache)
+
+
+def run_swiss(
+    players: list[Participant],
+    rounds: int | None = None,
+    best_of: int = 7,
+    first_player_distribution: float = 0.5,
+    seed: int = 911,
+    workers: int = 1,
+    batch_size: int = 16,
+    checkpoint_path: str | None = "standings/swiss.json",
+    sprt: SPRT | None = None,
+    resume: bool = False,
+    memory: MemoryLimit | None = None,
+    cache: MatchCache | None = None,
+) -> list[dict]:
+    """
+    Run a Swiss-system tournament and return the final standings table.
+
+    `rounds` defaults to ceil(log2(len(players))), enough to separate a
+    single winner. The remaining parameters are those of `run_round_robin`.
+    """
+    if rounds is None:
+        rounds = max(1, math.ceil(math.log2(max(len(players), 2))))
+
+    def next_round(index, standings, elo):
+        return swiss_pairings(players, standings, elo) if index < rounds else None
+
+    return _run_rounds("swiss", players, next_round, best_of, first_player_distribution,
+                       seed, workers, batch_size, checkpoint_path, sprt, resume, memory, cache)
+
+
+def print_standings(table: list[dict]) -> None:
+    print(f"\n{'#':>3} {'Agente':<20}{'Pts':>6}{'Elo':>9}{'W':>6}{'D':>5}{'L':>6}")
+    for i, row in enumerate(table, 1):
+        print(f"{i:>3} {row['name']:<20}{row['match_points']:>6.1f}{row['rating']:>9.1f}"
+              f"{row['wins']:>6}{row['draws']:>5}{row['losses']:>6}")
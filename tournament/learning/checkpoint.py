@@ -0,0 +1,193 @@
+"""
+Background checkpointing of Q-learning training.
+
+The training thread only takes a cheap snapshot: a copy of the Q-table
+for a full checkpoint, or just the entries updated since the previous
+checkpoint for a delta. Pickling and writing happen on a writer thread,
+and every file is written to a temporary name and renamed into place, so
+a crash never leaves a truncated checkpoint behind.
+
+Files in `model_dir` (N is the episode):
+
+    q_agent_episode_N.pkl        full Q-table (loadable with QLearningAgent.load)
+    q_agent_episode_N.delta.pkl  entries changed since the previous checkpoint
+    training_state.pkl           run state of the last checkpoint (for resuming)
+
+The run state is written after the Q-table files of the same checkpoint,
+so it never refers to a Q-table that is not on disk yet. Only the last
+`keep` full checkpoints, and the deltas that follow the oldest of them,
+are kept.
+"""
+
+import json
+import os
+import pickle
+import queue
+import re
+import threading
+
+_CHECKPOINT_RE = re.compile(r"^q_agent_episode_(\d+)(\.delta)?\.pkl$")
+STATE_FILE = "training_state.pkl"
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def list_checkpoints(model_dir: str) -> list[tuple[int, bool, str]]:
+    """(episode, is_delta, path) of every checkpoint in `model_dir`, oldest first."""
+    if not os.path.isdir(model_dir):
+        return []
+    found = []
+    for name in os.listdir(model_dir):
+        match = _CHECKPOINT_RE.match(name)
+        if match:
+            found.append((int(match.group(1)), match.group(2) is not None, os.path.join(model_dir, name)))
+    return sorted(found)
+
+
+def load_latest(model_dir: str, upto: int | None = None) -> tuple[int, dict] | None:
+    """
+    Rebuild the most recent Q-table: the last full checkpoint plus the deltas after it.
+
+    With `upto`, checkpoints of later episodes are ignored.
+
+    Returns
+    -------
+    tuple[int, dict] or None
+        (episode of the last checkpoint applied, Q-table), or None if there
+        is no full checkpoint.
+    """
+    checkpoints = [c for c in list_checkpoints(model_dir) if upto is None or c[0] <= upto]
+    fulls = [c for c in checkpoints if not c[1]]
+    if not fulls:
+        return None
+    episode, _, path = fulls[-1]
+    with open(path, "rb") as f:
+        q_table = pickle.load(f)
+    for delta_episode, is_delta, delta_path in checkpoints:
+        if is_delta and delta_episode > episode:
+            with open(delta_path, "rb") as f:
+                q_table.update(pickle.load(f))
+            episode = delta_episode
+    return episode, q_table
+
+
+def load_run_state(model_dir: str) -> dict | None:
+    """Run state saved with the last checkpoint, or None."""
+    path = os.path.join(model_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def discard_after(model_dir: str, episode: int) -> None:
+    """Remove checkpoints newer than `episode` (written after the run state that is being resumed)."""
+    for checkpoint_episode, _, path in list_checkpoints(model_dir):
+        if checkpoint_episode > episode:
+            os.remove(path)
+
+
+class CheckpointWriter:
+    """
+    Writes Q-learning checkpoints on a background thread.
+
+    Parameters
+    ----------
+    model_dir, metrics_dir : str
+        Directories for the Q-table and metrics files (created if needed).
+    keep : int, optional
+        Number of full checkpoints kept on disk (default is 3).
+    full_every : int, optional
+        Every `full_every`-th checkpoint is full; the ones in between are
+        deltas (default is 5). The first checkpoint is always full.
+    """
+
+    def __init__(self, model_dir: str = "models", metrics_dir: str = "metrics", keep: int = 3, full_every: int = 5):
+        self.model_dir = model_dir
+        self.metrics_dir = metrics_dir
+        self.keep = keep
+        self.full_every = full_every
+        self.submitted = 0
+        self.written = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._error: BaseException | None = None
+        os.makedirs(model_dir, exist_ok=True)
+        os.makedirs(metrics_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, episode: int, agent, run_state: dict | None = None) -> bool:
+        """
+        Snapshot `agent` (a `QLearningAgent`) after `episode` and queue it for writing.
+
+        `run_state` (already a snapshot: the caller must not mutate it
+        afterwards) is pickled to `STATE_FILE` once the Q-table is written.
+        Returns True if the checkpoint is a full one.
+        """
+        self._raise_pending()
+        full = self.submitted % self.full_every == 0
+        entries = agent.snapshot_q_table() if full else agent.take_delta()
+        self._queue.put((episode, full, entries, agent.metrics_snapshot(), run_state))
+        self.submitted += 1
+        return full
+
+    def flush(self) -> None:
+        """Wait until every submitted checkpoint is on disk."""
+        self._queue.join()
+        self._raise_pending()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_pending()
+
+    def _raise_pending(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("checkpoint writer failed") from error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except BaseException as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write(self, episode: int, full: bool, entries: dict, metrics: dict, run_state: dict | None) -> None:
+        suffix = "" if full else ".delta"
+        path = os.path.join(self.model_dir, f"q_agent_episode_{episode}{suffix}.pkl")
+        _atomic_write(path, pickle.dumps(entries, protocol=pickle.HIGHEST_PROTOCOL))
+        metrics_path = os.path.join(self.metrics_dir, f"training_metrics_episode_{episode}.json")
+        _atomic_write(metrics_path, json.dumps(metrics, indent=2).encode())
+        if run_state is not None:
+            _atomic_write(os.path.join(self.model_dir, STATE_FILE),
+                          pickle.dumps(run_state, protocol=pickle.HIGHEST_PROTOCOL))
+        self.written += 1
+        if full:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Drop full checkpoints beyond the last `keep`, and the deltas older than the oldest one kept."""
+        checkpoints = list_checkpoints(self.model_dir)
+        fulls = [episode for episode, is_delta, _ in checkpoints if not is_delta]
+        if len(fulls) <= self.keep:
+            return
+        oldest_kept = fulls[-self.keep]
+        for episode, _, path in checkpoints:
+            if episode < oldest_kept:
+                os.remove(path)
+                metrics_path = os.path.join(self.metrics_dir, f"training_metrics_episode_{episode}.json")
+                if os.path.exists(metrics_path):
+                    os.remove(metrics_path)
@@ -0,0 +1,209 @@
+"""
+Offline Q-learning from archived tournament games.
+
+Every `versus/*.json` match file holds the full (board, action) history of
+its games. They are read incrementally: the file is scanned in chunks and
+each game of the `games` array is decoded as soon as it is complete, so a
+large archive never has to fit in memory.
+
+Both players of a game are learned from. The mover of every position is
+known from the board (red moves first), so each move becomes a transition
+for its own player: the next state is the board at that player's next
+turn, or the final board (terminal) if there is none. Rewards follow
+`train_agent.py`: +10 / -10 / 0 for the game outcome from the mover's
+point of view, minus 0.1 per move. Games that did not end in a final
+position (forfeits) are skipped.
+
+Usage (from the `tournament` directory):
+
+    python -m learning.offline versus/*.json --model models/q_agent_final.pkl --out models/q_agent_offline.pkl
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from connect4.batch import winners
+from learning.q_learning_agent import QLearningAgent
+
+ROWS, COLS = 6, 7
+P1, P2 = -1, 1
+WIN_REWARD, LOSS_REWARD, DRAW_REWARD, STEP_REWARD = 10.0, -10.0, 0.0, -0.1
+
+_decoder = json.JSONDecoder()
+
+
+def iter_games(path: str, chunk_size: int = 1 << 16) -> Iterator[list]:
+    """
+    Yield the games of a match file one at a time, as decoded JSON lists.
+
+    Only the current game and one chunk of the file are kept in memory.
+    """
+    with open(path, "r") as f:
+        buffer, eof = "", False
+
+        def more() -> bool:
+            nonlocal buffer, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
+            return not eof
+
+        # Find the opening bracket of the "games" array
+        while True:
+            key = buffer.find('"games"')
+            if key != -1:
+                bracket = buffer.find("[", key)
+                if bracket != -1:
+                    buffer = buffer[bracket + 1:]
+                    break
+            if not more():
+                return
+
+        while True:
+            pos = 0
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos == len(buffer):
+                buffer = ""
+                if not more():
+                    return
+                continue
+            if buffer[pos] == "]":
+                return
+            try:
+                game, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not more():
+                    raise
+                continue
+            buffer = buffer[end:]
+            yield game
+
+
+def final_board(board: np.ndarray, action: int, colour: int) -> np.ndarray:
+    """`board` after `colour` drops a stone in column `action`."""
+    board = board.copy()
+    row = int(np.count_nonzero(board[:, action] == 0)) - 1
+    board[row, action] = colour
+    return board
+
+
+def game_transitions(game: list) -> tuple[np.ndarray, ...] | None:
+    """
+    Transitions of both players of a game: (boards, actions, rewards, next_boards, dones).
+
+    Returns None for games that did not end in a final position.
+    """
+    if not game:
+        return None
+    boards = np.array([board for board, _ in game], dtype=int)
+    actions = np.array([action for _, action in game], dtype=int)
+    n = len(game)
+    movers = np.where(np.arange(n) % 2 == 0, P1, P2)
+
+    last = final_board(boards[-1], int(actions[-1]), int(movers[-1]))
+    winner = int(winners(last[None])[0])
+    if winner == 0 and (last[0] == 0).any():
+        return None
+
+    outcome = np.where(movers == winner, WIN_REWARD, LOSS_REWARD) if winner != 0 else np.full(n, DRAW_REWARD)
+    rewards = outcome + STEP_REWARD
+
+    # Each player's next state is its own next turn, two plies later
+    dones = np.arange(n) + 2 >= n
+    next_boards = np.empty_like(boards)
+    next_boards[:-2] = boards[2:]
+    next_boards[dones] = last
+    return boards, actions, rewards, next_boards, dones
+
+
+def transition_batches(games: Iterable[list], batch_size: int = 4096, stats: dict | None = None) -> Iterator[tuple[np.ndarray, ...]]:
+    """
+    Group the transitions of `games` into batches of about `batch_size`.
+
+    Games are never split across batches. `stats`, if given, counts the
+    games used and skipped and the transitions produced.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault("games", 0)
+    stats.setdefault("skipped", 0)
+    stats.setdefault("transitions", 0)
+    pending: list[tuple[np.ndarray, ...]] = []
+    size = 0
+    for game in games:
+        transitions = game_transitions(game)
+        if transitions is None:
+            stats["skipped"] += 1
+            continue
+        stats["games"] += 1
+        stats["transitions"] += len(transitions[0])
+        pending.append(transitions)
+        size += len(transitions[0])
+        if size >= batch_size:
+            yield tuple(np.concatenate(parts) for parts in zip(*pending))
+            pending, size = [], 0
+    if pending:
+        yield tuple(np.concatenate(parts) for parts in zip(*pending))
+
+
+def train_offline(agent: QLearningAgent, paths: list[str], epochs: int = 1, batch_size: int = 4096) -> dict:
+    """
+    Run `epochs` passes of batched Q updates over the games of `paths`.
+
+    Returns games, skipped games and transitions of the last pass, plus
+    total `updates`, `elapsed` seconds and `transitions_per_second`.
+    """
+    updates = 0
+    start = time.perf_counter()
+    stats: dict = {}
+    for _ in range(epochs):
+        stats = {}
+        games = (game for path in paths for game in iter_games(path))
+        for batch in transition_batches(games, batch_size, stats):
+            agent.update_batch(*batch)
+            updates += len(batch[0])
+    elapsed = time.perf_counter() - start
+    return {
+        **stats,
+        "updates": updates,
+        "elapsed": elapsed,
+        "transitions_per_second": updates / elapsed if elapsed > 0 else float("inf"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entrenamiento Q-Learning offline con partidas archivadas")
+    parser.add_argument("paths", nargs="*", default=None, help="Archivos de matches (por defecto versus/*.json)")
+    parser.add_argument("--model", default=None, help="Tabla Q inicial (p.ej. models/q_agent_final.pkl)")
+    parser.add_argument("--out", default=os.path.join("models", "q_agent_offline.pkl"), help="Tabla Q resultante")
+    parser.add_argument("--epochs", type=int, default=1, help="Pasadas sobre el archivo de partidas")
+    parser.add_argument("--batch-size", type=int, default=4096, help="Transiciones por actualización")
+    parser.add_argument("--alpha", type=float, default=0.1)
+    parser.add_argument("--gamma", type=float, default=0.95)
+    args = parser.parse_args()
+
+    paths = args.paths or sorted(glob.glob(os.path.join("versus", "*.json")))
+    agent = QLearningAgent(alpha=args.alpha, gamma=args.gamma, train_mode=False)
+    if args.model:
+        agent.load(args.model)
+    initial_size = len(agent.q_table)
+
+    stats = train_offline(agent, paths, args.epochs, args.batch_size)
+    print(f"{len(paths)} archivos, {stats['games']} partidas ({stats['skipped']} descartadas), "
+          f"{stats['updates']} actualizaciones en {stats['elapsed']:.2f}s "
+          f"({stats['transitions_per_second']:.0f} transiciones/s)")
+    print(f"Tabla Q: {initial_size} -> {len(agent.q_table)} entradas")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    agent.save(args.out)
+    print(f"Tabla Q guardada en {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Memoized search opponent for training.
+
+Training replays the same early positions over and over, and a search
+opponent such as `MCTSAgent` pays for a full search every time.
+`CachedOpponent` remembers the root visit distribution of each search,
+keyed by position, and answers later visits to that position by sampling
+a move in proportion to those visits instead of searching again.
+"""
+
+import random
+from collections import OrderedDict
+
+import numpy as np
+
+from connect4 import bitboard as bb
+from connect4.base_policy import Policy
+
+
+class CachedOpponent(Policy):
+    """
+    LRU cache of visit distributions in front of a search agent.
+
+    Parameters
+    ----------
+    agent : Policy
+        Searching agent; it should expose `get_visit_distribution()` (as
+        `MCTSAgent` does). Moves without a distribution (immediate wins,
+        blocks, book moves) are stored as a single certain move.
+    max_size : int, optional
+        Maximum number of positions kept; the least recently used one is
+        evicted first (default is 50000).
+    refresh : float, optional
+        Probability of searching again on a hit and replacing the stored
+        distribution, which keeps some opponent diversity (default is 0).
+    temperature : float, optional
+        Sampling weights are `visits ** (1 / temperature)`; values below 1
+        sharpen the distribution towards the most visited move (default is 1).
+    """
+
+    def __init__(self, agent: Policy, max_size: int = 50000, refresh: float = 0.0, temperature: float = 1.0):
+        self.agent = agent
+        self.max_size = max_size
+        self.refresh = refresh
+        self.temperature = temperature
+        self.entries: OrderedDict[int, list[int]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self._last_stats = {}
+
+    def mount(self, timeout=None):
+        self.agent.mount(timeout)
+
+    def act(self, s):
+        board = s.board if hasattr(s, "board") else np.array(s)
+        valid = s.valid_actions() if hasattr(s, "valid_actions") else [c for c in range(bb.COLS) if board[0, c] == bb.EMPTY]
+        key = s.hash if hasattr(s, "hash") else bb.key(*bb.from_array(board))
+
+        visits = self.entries.get(key)
+        if visits is not None and random.random() >= self.refresh:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self._last_stats = {"memo_hits": 1, "memo_misses": 0}
+            return self._sample(visits, valid)
+
+        if visits is None:
+            self.misses += 1
+        else:
+            self.refreshes += 1
+        action = self.agent.act(s)
+        get_visits = getattr(self.agent, "get_visit_distribution", None)
+        visits = get_visits() if get_visits is not None else None
+        if not visits or not any(visits[c] for c in valid):
+            visits = [int(c == action) for c in range(bb.COLS)]
+
+        self.entries[key] = visits
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+        stats = getattr(self.agent, "get_search_stats", lambda: None)() or {}
+        self._last_stats = {**stats, "memo_hits": 0, "memo_misses": 1}
+        return action
+
+    def _sample(self, visits: list[int], valid: list[int]) -> int:
+        weights = [visits[c] ** (1.0 / self.temperature) for c in valid]
+        if not any(weights):
+            return random.choice(valid)
+        return random.choices(valid, weights=weights)[0]
+
+    def get_search_stats(self):
+        return dict(self._last_stats)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses + self.refreshes
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.entries),
+            "capacity": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
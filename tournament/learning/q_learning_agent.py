@@ -14,6 +14,7 @@ EMPTY, P1, P2 = 0, -1, 1
 class QLearningAgent(Policy):
     def __init__(self, alpha=0.1, gamma=0.95, epsilon=1.0, epsilon_decay=0.995, epsilon_min=0.1, train_mode=True):
         self.q_table = {}
+        self._dirty = set()  # claves (estado, acción) modificadas desde el último checkpoint
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon = epsilon if train_mode else 0.0  # Sin exploración en modo evaluación
@@ -64,6 +65,26 @@ class QLearningAgent(Policy):
         
         return self.choose_action(board, valid_actions)
 
+    def act_batch(self, boards):
+        """Versión vectorizada de `act` para una pila (N, 6, 7) de tableros"""
+        boards = np.asarray(boards)
+        n = boards.shape[0]
+        valid = boards[:, 0, :] == EMPTY
+
+        # Valores Q de todas las columnas (las inválidas nunca ganan el argmax)
+        keys = [tuple(key) for key in boards.reshape(n, -1).tolist()]
+        q_values = np.array([[self.q_table.get((key, a), 0) for a in range(COLS)] for key in keys], dtype=float)
+        q_values[~valid] = -np.inf
+        actions = q_values.argmax(axis=1)
+
+        # Exploración epsilon-greedy: columna válida uniforme
+        explore = np.random.rand(n) < self.epsilon
+        if explore.any():
+            scores = np.random.rand(int(explore.sum()), COLS)
+            scores[~valid[explore]] = -1.0
+            actions[explore] = scores.argmax(axis=1)
+        return actions
+
     def get_state_key(self, board):
         return tuple(board.flatten())
 
@@ -88,11 +109,45 @@ class QLearningAgent(Policy):
         next_max = max([self.q_table.get((next_key, a), 0) for a in next_valid_actions], default=0)
         new_value = old_value + self.alpha * (reward + self.gamma * next_max - old_value)
         self.q_table[(state_key, action)] = new_value
+        self._dirty.add((state_key, action))
+
+    def update_batch(self, boards, actions, rewards, next_boards, dones):
+        """Versión por lotes de `update` para pilas (N, 6, 7) de tableros
+
+        Las transiciones se aplican en orden, como N llamadas a `update`, pero
+        las claves y las acciones válidas se calculan una sola vez para todo el
+        lote. Con `dones[i]` el estado siguiente es terminal (sin acciones).
+        """
+        boards = np.asarray(boards)
+        next_boards = np.asarray(next_boards)
+        n = boards.shape[0]
+        state_keys = [tuple(key) for key in boards.reshape(n, -1).tolist()]
+        next_keys = [tuple(key) for key in next_boards.reshape(n, -1).tolist()]
+        next_valid = ((next_boards[:, 0, :] == EMPTY) & ~np.asarray(dones, dtype=bool)[:, None]).tolist()
+        q_table, alpha, gamma = self.q_table, self.alpha, self.gamma
+
+        for state_key, action, reward, next_key, valid in zip(
+                state_keys, np.asarray(actions).tolist(), np.asarray(rewards, dtype=float).tolist(), next_keys, next_valid):
+            old_value = q_table.get((state_key, action), 0)
+            next_max = max([q_table.get((next_key, a), 0) for a in range(COLS) if valid[a]], default=0)
+            q_table[(state_key, action)] = old_value + alpha * (reward + gamma * next_max - old_value)
+            self._dirty.add((state_key, action))
 
     def decay_epsilon(self):
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
+    def snapshot_q_table(self):
+        """Copia de la tabla Q completa; reinicia el registro de cambios"""
+        self._dirty.clear()
+        return dict(self.q_table)
+
+    def take_delta(self):
+        """Entradas de la tabla Q modificadas desde el último snapshot o delta"""
+        delta = {key: self.q_table[key] for key in self._dirty}
+        self._dirty.clear()
+        return delta
+
     def save(self, path="q_table.pkl"):
         with open(path, "wb") as f:
             pickle.dump(self.q_table, f)
@@ -154,12 +209,18 @@ class QLearningAgent(Policy):
             'q_table_size': len(self.q_table)
         }
 
-    def save_metrics(self, filepath='training_metrics.json'):
-        """Guarda las métricas en un archivo JSON"""
-        metrics = self.get_metrics_report()
+    def metrics_snapshot(self):
+        """Copia de las métricas lista para JSON (las listas se copian, el entrenamiento puede seguir)"""
+        metrics = {key: list(value) if isinstance(value, list) else value
+                   for key, value in self.get_metrics_report().items()}
         # Convertir datetime a string para JSON
         if metrics['training_start_time']:
             metrics['training_start_time'] = metrics['training_start_time'].isoformat()
+        return metrics
+
+    def save_metrics(self, filepath='training_metrics.json'):
+        """Guarda las métricas en un archivo JSON"""
+        metrics = self.metrics_snapshot()
         
         with open(filepath, 'w') as f:
             json.dump(metrics, f, indent=2)
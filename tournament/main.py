@@ -6,57 +6,122 @@ Este es el script principal del torneo.
 Ejecuta el torneo entre todos los agentes.
 """
 
+import os
 import argparse
+from functools import partial
 from connect4.base_policy import Policy
 from connect4.utils import find_importable_classes
 from tournament import run_tournament, play
+from formats import run_round_robin, run_swiss, print_standings
 
-def run_tournament_main():
-    """Ejecuta el torneo principal"""
+def build_players(position_cache=None, ponder=False):
+    """Agentes de groups/ más los agentes propios (lista vacía si groups/ no tiene agentes)"""
+    # Read all files within subfolder of "groups"
+    participants = find_importable_classes("groups", Policy)
+
+    print(f"Agentes detectados: {list(participants.keys())}")
+
+    # Build a participant list (name, class)
+    players = list(participants.items())
+
+    if len(players) == 0:
+        print(" No se encontraron agentes en el directorio 'groups'")
+        print(" Asegúrate de que:")
+        print("   - Los archivos policy.py existan en cada subdirectorio de groups/")
+        print("   - Las clases hereden de Policy")
+        print("   - No haya errores de importación")
+        return []
+
+    print(f" Participantes del torneo: {[name for name, _ in players]}")
+
+    # Add our own implemented agents to make the tournament more interesting
+    from connect4.policy import MCTSAgent
+
+    # Add MCTS agent (with the opening book when it has been built)
+    from connect4.opening_book import DEFAULT_BOOK
+    mcts_options = {}
+    if os.path.exists(DEFAULT_BOOK):
+        mcts_options['opening_book'] = DEFAULT_BOOK
+    if position_cache:
+        mcts_options['position_cache'] = position_cache
+    if ponder:
+        mcts_options['ponder'] = True
+    players.append(("MCTS-Champion", partial(MCTSAgent, **mcts_options) if mcts_options else MCTSAgent))
+
+    # Add alpha-beta solver agent
+    from connect4.solver import NegamaxAgent
+    players.append(("Negamax-Solver", NegamaxAgent))
+
+    # Try to add Q-Learning agent if available
+    try:
+        from connect4.policy import QPolicy
+        players.append(("Q-Learning-AI", QPolicy))
+        print(" Agente Q-Learning añadido al torneo")
+    except Exception as e:
+        print(f" No se pudo cargar Q-Learning agent: {e}")
+
+    print(f" Total de participantes: {len(players)}")
+    return players
+
+def run_tournament_main(profile_output=None, profile_top=25, tournament_format='knockout', workers=1, rounds=None,
+                        sprt=None, position_cache=None, resume=False, ponder=False, memory=None,
+                        cache=None):
+    """Ejecuta el torneo principal
+
+    `tournament_format` es 'knockout' (eliminación directa), 'round-robin' o
+    'swiss'. Con `sprt` cada match se juega como test secuencial (SPRT) en
+    lugar de al mejor de N. Si `profile_output` no es None, el torneo corre
+    bajo el profiler y los reportes se escriben con ese prefijo. Con
+    `position_cache`, MCTS-Champion comparte esa caché de posiciones entre
+    procesos y ejecuciones. Con `resume` el torneo continúa desde su último
+    estado guardado en standings/. Con `ponder`, MCTS-Champion sigue buscando
+    durante el turno del rival. Con `memory` (un `MemoryLimit`) se registra la
+    memoria de cada agente y, si tiene tope, cada agente juega en un proceso
+    propio y pierde la partida al superarlo. Con `cache` (un `MatchCache`) los
+    matches ya jugados con el mismo código y configuración no se repiten.
+    """
     print(" Iniciando torneo entre agentes...")
     
     try:
-        # Read all files within subfolder of "groups"
-        participants = find_importable_classes("groups", Policy)
-        
-        print(f"Agentes detectados: {list(participants.keys())}")
-        
-        # Build a participant list (name, class)
-        players = list(participants.items())
-        
-        if len(players) == 0:
-            print(" No se encontraron agentes en el directorio 'groups'")
-            print(" Asegúrate de que:")
-            print("   - Los archivos policy.py existan en cada subdirectorio de groups/")
-            print("   - Las clases hereden de Policy")
-            print("   - No haya errores de importación")
+        players = build_players(position_cache, ponder)
+        if not players:
             return
-        
-        print(f" Participantes del torneo: {[name for name, _ in players]}")
-        
-        # Add our own implemented agents to make the tournament more interesting
-        from connect4.policy import MCTSAgent
-        
-        # Add MCTS agent
-        players.append(("MCTS-Champion", MCTSAgent))
-        
-        # Try to add Q-Learning agent if available
-        try:
-            from connect4.policy import QPolicy
-            players.append(("Q-Learning-AI", QPolicy))
-            print(" Agente Q-Learning añadido al torneo")
-        except Exception as e:
-            print(f" No se pudo cargar Q-Learning agent: {e}")
-        
-        print(f" Total de participantes: {len(players)}")
-        
+
         # Run the tournament
-        champion = run_tournament(
-            players,
-            play,  # You could also create your own play function for testing purposes
-            shuffle=True,
-        )
+        def tournament():
+            if tournament_format == 'round-robin':
+                table = run_round_robin(players, workers=workers, sprt=sprt, resume=resume, memory=memory,
+                                        cache=cache)
+            elif tournament_format == 'swiss':
+                table = run_swiss(players, rounds=rounds, workers=workers, sprt=sprt, resume=resume, memory=memory,
+                                  cache=cache)
+            else:
+                return run_tournament(
+                    players,
+                    partial(play, sprt=sprt, memory=memory, cache=cache),  # You could also create your own play function for testing purposes
+                    shuffle=True,
+                    resume=resume,
+                )
+            print_standings(table)
+            return next(p for p in players if p[0] == table[0]['name'])
+
+        if profile_output:
+            from connect4.profiling import profile_run
+            champion = profile_run(tournament, profile_output, participants=players, top_n=profile_top)
+        else:
+            champion = tournament()
         
+        for name, policy in players:
+            if getattr(policy, "loaded", False):
+                print(f"⏱ Importación de {name}: {policy.load_time * 1e3:.1f} ms")
+
+        if position_cache:
+            from connect4.position_cache import open_cache
+            print(f"⏱ Caché de posiciones: {open_cache(position_cache).stats()}")
+
+        if cache is not None:
+            print(f"⏱ Caché de matches: {cache.report()}")
+
         print(f"\n ¡Campeón del torneo: {champion[0]}!")
         return champion
         
@@ -66,6 +131,33 @@ def run_tournament_main():
         traceback.print_exc()
         return None
 
+def bracket_odds_main(simulations=1_000_000, workers=1, position_cache=None, cache=None):
+    """Probabilidad de que cada agente gane el torneo eliminatorio
+
+    Estima la matriz de probabilidades de victoria entre todos los agentes con
+    los matches guardados en versus/ y en la caché de matches (jugando solo los
+    enfrentamientos sin resultados) y simula `simulations` cuadros con sorteo
+    aleatorio, como `run_tournament`.
+    """
+    print(" Simulando el torneo eliminatorio...")
+    try:
+        players = build_players(position_cache)
+        if not players:
+            return None
+        from bracket_odds import championship_odds, print_odds
+        from connect4.match_cache import MatchCache
+
+        cache = cache if cache is not None else MatchCache()
+        rows = championship_odds(players, simulations, workers=workers, cache=cache)
+        print_odds(rows)
+        print(f"⏱ Caché de matches: {cache.report()}")
+        return rows
+    except Exception as e:
+        print(f" Error simulando el torneo: {e}")
+        import traceback
+        traceback.print_exc()
+        return None
+
 def train_q_learning():
     """Entrena el agente Q-Learning"""
     print(" Iniciando entrenamiento Q-Learning...")
@@ -83,7 +175,7 @@ def analyze_metrics():
     print(" Para analizar métricas, abre el notebook:")
     print("   jupyter notebook metrics/metrics_analisys.ipynb")
 
-def test_agents():
+def test_agents(profile_output=None, profile_top=25):
     """Prueba rápida entre dos agentes específicos"""
     print(" Prueba rápida entre agentes...")
     
@@ -97,7 +189,14 @@ def test_agents():
         ]
         
         print(" Match de prueba: MCTS-A vs MCTS-B")
-        winner = play(players[0], players[1], best_of=3, first_player_distribution=0.5)
+        def match():
+            return play(players[0], players[1], best_of=3, first_player_distribution=0.5)
+
+        if profile_output:
+            from connect4.profiling import profile_run
+            winner = profile_run(match, profile_output, participants=players, top_n=profile_top)
+        else:
+            winner = match()
         print(f" Ganador del test: {winner[0]}")
         
     except Exception as e:
@@ -105,9 +204,45 @@ def test_agents():
 
 def main():
     parser = argparse.ArgumentParser(description=" Connect 4 Tournament")
-    parser.add_argument('--mode', choices=['tournament', 'train', 'metrics', 'test'], 
+    parser.add_argument('--mode', choices=['tournament', 'odds', 'train', 'metrics', 'test'], 
                        default='tournament',
                        help='Modo de ejecución')
+    parser.add_argument('--format', choices=['knockout', 'round-robin', 'swiss'], default='knockout',
+                       help='Formato del torneo')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Procesos que juegan en paralelo los matches de una ronda (round-robin/swiss)')
+    parser.add_argument('--rounds', type=int, default=None,
+                       help='Rondas del sistema suizo (por defecto log2 del número de agentes)')
+    parser.add_argument('--sprt', action='store_true',
+                       help='Terminar cada match en cuanto un SPRT decida el resultado')
+    parser.add_argument('--sprt-elo', nargs=2, type=float, default=[-100.0, 100.0], metavar=('ELO0', 'ELO1'),
+                       help='Hipótesis H0/H1 de diferencia Elo (A menos B)')
+    parser.add_argument('--sprt-alpha', type=float, default=0.05, help='Tasa de falsos positivos del SPRT')
+    parser.add_argument('--sprt-beta', type=float, default=0.05, help='Tasa de falsos negativos del SPRT')
+    parser.add_argument('--sprt-max-games', type=int, default=40, help='Máximo de partidas por match con SPRT')
+    parser.add_argument('--position-cache', default=None, metavar='PATH',
+                       help='Caché de posiciones persistente y compartida para MCTS-Champion (p.ej. .cache/positions.bin)')
+    parser.add_argument('--ponder', action='store_true',
+                       help='MCTS-Champion sigue buscando durante el turno del rival')
+    parser.add_argument('--memory-cap', type=float, default=None, metavar='MB',
+                       help='Tope de memoria por agente: cada agente juega en su propio proceso y pierde la partida al superarlo')
+    parser.add_argument('--track-memory', action='store_true',
+                       help='Registrar el pico de memoria de cada agente por jugada y por partida')
+    parser.add_argument('--simulations', type=int, default=1_000_000,
+                       help='Cuadros eliminatorios simulados en el modo odds')
+    parser.add_argument('--cache', action='store_true',
+                       help='Reutilizar los resultados de matches ya jugados con el mismo código y configuración')
+    parser.add_argument('--clear-cache', action='store_true',
+                       help='Vaciar la caché de matches antes del torneo')
+    parser.add_argument('--invalidate', nargs='+', default=None, metavar='NAME',
+                       help='Borrar de la caché los matches de estos participantes antes del torneo')
+    parser.add_argument('--resume', action='store_true',
+                       help='Continuar el torneo interrumpido desde su estado en standings/')
+    parser.add_argument('--profile', nargs='?', const='profiles/tournament', default=None,
+                       metavar='PREFIX',
+                       help='Perfilar el torneo/test y escribir PREFIX.pstats, PREFIX.collapsed y PREFIX_top.txt')
+    parser.add_argument('--profile-top', type=int, default=25,
+                       help='Número de funciones en el reporte de hot spots')
     
     args = parser.parse_args()
     
@@ -115,14 +250,33 @@ def main():
     print(" CONNECT 4 TOURNAMENT")
     print("=" * 60)
     
+    cache = None
+    if args.cache or args.clear_cache or args.invalidate:
+        from connect4.match_cache import MatchCache
+        cache = MatchCache()
+        if args.clear_cache or args.invalidate:
+            removed = cache.invalidate(None if args.clear_cache else args.invalidate)
+            print(f" {removed} matches eliminados de la caché")
+
     if args.mode == 'tournament':
-        run_tournament_main()
+        sprt = None
+        if args.sprt:
+            from connect4.sprt import SPRT
+            sprt = SPRT(args.sprt_elo[0], args.sprt_elo[1], args.sprt_alpha, args.sprt_beta, args.sprt_max_games)
+        memory = None
+        if args.memory_cap is not None or args.track_memory:
+            from connect4.isolation import MemoryLimit
+            memory = MemoryLimit(cap_mb=args.memory_cap)
+        run_tournament_main(args.profile, args.profile_top, args.format, args.workers, args.rounds, sprt,
+                            args.position_cache, args.resume, args.ponder, memory, cache)
+    elif args.mode == 'odds':
+        bracket_odds_main(args.simulations, args.workers, args.position_cache, cache)
     elif args.mode == 'train':
         train_q_learning()
     elif args.mode == 'metrics':
         analyze_metrics()
     elif args.mode == 'test':
-        test_agents()
+        test_agents(args.profile, args.profile_top)
     
     print("\n Ejecución completada!")
 
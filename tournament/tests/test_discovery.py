@@ -0,0 +1,76 @@
+"""Policy discovery in `connect4.utils.find_importable_classes`"""
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connect4.base_policy import Policy
+from connect4.policy import MCTSAgent
+from connect4.utils import LazyPolicy, find_importable_classes
+
+DIRECT = """
+from connect4.base_policy import Policy
+
+class Direct(Policy):
+    def mount(self, timeout=None):
+        pass
+
+    def act(self, state):
+        return 0
+"""
+
+INHERITED = """
+from connect4.policy import MCTSAgent
+
+class MyAgent(MCTSAgent):
+    pass
+"""
+
+
+MIXED = """
+from connect4.base_policy import Policy
+from connect4.policy import MCTSAgent
+
+class Node:
+    pass
+
+class Baseline(Policy):
+    def mount(self, timeout=None):
+        pass
+
+    def act(self, state):
+        return 0
+
+class Tuned(MCTSAgent):
+    pass
+"""
+
+
+def write_group(root, name, source):
+    folder = root / name
+    folder.mkdir()
+    (folder / "policy.py").write_text(source)
+
+
+def test_finds_policy_subclassing_an_imported_class(tmp_path):
+    write_group(tmp_path, "Direct", DIRECT)
+    write_group(tmp_path, "Inherited", INHERITED)
+    manifest = tmp_path / "manifest.json"
+
+    for _ in range(2):  # first scan, then from the manifest
+        found = find_importable_classes(str(tmp_path), Policy, cache_path=manifest)
+        assert sorted(found) == ["Direct", "Inherited"]
+        assert isinstance(found["Direct"], LazyPolicy)
+        assert found["Inherited"].__name__ == "MyAgent"
+        assert issubclass(found["Inherited"], Policy)
+
+
+def test_falls_back_per_class_in_a_file_with_a_resolved_policy(tmp_path):
+    write_group(tmp_path, "Mixed", MIXED)
+    manifest = tmp_path / "manifest.json"
+
+    for _ in range(2):
+        found = find_importable_classes(str(tmp_path), Policy, cache_path=manifest)
+        assert found["Mixed"].__name__ == "Tuned"
+        assert issubclass(found["Mixed"], MCTSAgent)
@@ -0,0 +1,87 @@
+"""The shared, persistent position cache in `connect4.position_cache`"""
+
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connect4 import bitboard as bb
+from connect4.position_cache import UNKNOWN, PositionCache, config_key, open_cache
+
+VISITS = np.arange(bb.COLS)
+
+
+def test_clock_evicts_unreferenced_slots_first(tmp_path):
+    cache = PositionCache(str(tmp_path / "cache.bin"), buckets=1, ways=2)
+    a, b, c, d = (bb.from_moves(moves)[:2] for moves in ("4", "44", "444", "4444"))
+    cache.put(*a, VISITS)
+    cache.put(*b, VISITS)
+    cache.put(*c, VISITS)  # every slot referenced: the hand clears them and evicts the first, a
+    assert cache.get(*a) is None
+    cache.put(*d, VISITS)  # c is referenced again, b was cleared when the hand passed it
+    assert cache.get(*b) is None
+    assert cache.get(*c) is not None and cache.get(*d) is not None
+    assert cache.stats()["evictions"] == 2
+
+
+def test_entries_and_counters_survive_reopening(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    position, mask, _ = bb.from_moves("4453")
+    cache = PositionCache(path, buckets=16, ways=2)
+    cache.put(position, mask, VISITS, value=2)
+    assert cache.get(position, mask) is not None
+    cache.close()
+
+    reopened = PositionCache(path, buckets=1024, ways=8)  # the file's geometry wins
+    assert (reopened.buckets, reopened.ways) == (16, 2)
+    visits, value = reopened.get(position, mask)
+    assert visits.tolist() == VISITS.tolist() and value == 2
+    assert reopened.stats()["hits"] == 2
+    reopened.close()
+
+
+def test_configurations_do_not_share_entries(tmp_path):
+    cache = PositionCache(str(tmp_path / "cache.bin"), buckets=64, ways=4)
+    position, mask, _ = bb.from_moves("44")
+    uct, wide = config_key("mcts", 1.4, 400), config_key("mcts", 2.0, 400)
+    cache.put(position, mask, VISITS, config=uct)
+    assert cache.get(position, mask, uct) is not None
+    assert cache.get(position, mask, wide) is None
+    assert cache.get(position, mask) is None
+    cache.put(position, mask, VISITS[::-1], UNKNOWN, config=wide)
+    assert cache.get(position, mask, uct)[0].tolist() == VISITS.tolist()
+    assert cache.get(position, mask, wide)[0].tolist() == VISITS[::-1].tolist()
+
+
+def _write_and_read(path, worker, count, start):
+    cache = open_cache(path)
+    start.wait()
+    for i in range(count):
+        cache.put(worker * count + i, 0, VISITS + worker)
+        assert cache.get(worker * count + i, 0) is not None
+    cache.flush()
+
+
+def test_concurrent_writers_lose_no_update(tmp_path):
+    path = str(tmp_path / "cache.bin")
+    PositionCache(path, buckets=4096, ways=4).close()
+    workers, count = 4, 2000
+    ctx = multiprocessing.get_context("fork")
+    start = ctx.Barrier(workers)
+    processes = [ctx.Process(target=_write_and_read, args=(path, w, count, start)) for w in range(workers)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    assert all(p.exitcode == 0 for p in processes)
+
+    cache = PositionCache(path)
+    stats = cache.stats()
+    assert stats["hits"] == workers * count and stats["misses"] == 0  # header counters updated under the lock
+    assert stats["entries"] == workers * count - stats["evictions"]
+    for w in range(workers):
+        visits, _ = cache.get(w * count + count - 1, 0)
+        assert visits.tolist() == (VISITS + w).tolist()
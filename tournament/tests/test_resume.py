@@ -0,0 +1,44 @@
+"""Resuming an interrupted knockout with `run_tournament(resume=True)`"""
+
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connect4.evaluation import RandomPolicy
+from tournament import completed_matches, play, run_tournament
+
+PLAYERS = [(f"R{i}", RandomPolicy) for i in range(5)]
+
+
+def knockout(play_fn, resume=False):
+    seed = 1 if resume else 0  # a resumed run starts in a new process: the state file restores the generators
+    random.seed(seed)
+    np.random.seed(seed)
+    champion = run_tournament(PLAYERS, play_fn, best_of=3, state_path="knockout.json", resume=resume)
+    results = [(m.player_a, m.player_b, m.player_a_wins, m.player_b_wins, m.draws, m.winner, m.games)
+               for m in completed_matches]
+    return champion[0], results
+
+
+def test_resumed_knockout_matches_an_uninterrupted_one(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.mkdir("versus")
+    expected = knockout(play)
+
+    calls = 0
+
+    def interrupted(*args):
+        nonlocal calls
+        calls += 1
+        if calls == 3:  # in the middle of the second round
+            raise KeyboardInterrupt
+        return play(*args)
+
+    with pytest.raises(KeyboardInterrupt):
+        knockout(interrupted)
+    assert knockout(play, resume=True) == expected
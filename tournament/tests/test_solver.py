@@ -0,0 +1,71 @@
+"""Bitboard win detection and `NegamaxAgent` scores on known positions"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from connect4 import bitboard as bb
+from connect4.connect_state import ConnectState
+from connect4.solver import WIN, NegamaxAgent
+
+
+def cells(*coords):
+    """Bitboard with a stone on every (col, row) cell, row 0 at the bottom."""
+    return sum(1 << (col * bb.H1 + row) for col, row in coords)
+
+
+def test_alignment_in_every_direction():
+    assert bb.alignment(cells((0, 0), (1, 0), (2, 0), (3, 0)))  # horizontal
+    assert bb.alignment(cells((6, 2), (6, 3), (6, 4), (6, 5)))  # vertical
+    assert bb.alignment(cells((0, 0), (1, 1), (2, 2), (3, 3)))  # rising diagonal
+    assert bb.alignment(cells((3, 0), (2, 1), (1, 2), (0, 3)))  # falling diagonal
+
+
+def test_alignment_does_not_wrap_around_columns():
+    assert not bb.alignment(cells((0, 0), (1, 0), (2, 0)))
+    assert not bb.alignment(cells((0, 3), (0, 4), (0, 5), (1, 0)))  # column top to next column bottom
+
+
+def test_win_detection_matches_the_engine_on_random_games():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        state = ConnectState()
+        position, mask = 0, 0
+        while not state.is_final():
+            col = int(rng.choice(state.get_free_cols()))
+            assert bb.is_winning_move(position, mask, col) == (state.transition(col).get_winner() != 0)
+            state = state.transition(col)
+            position, mask = bb.play(position, mask, col)
+            assert (position, mask) == bb.from_array(state.board)
+
+
+def test_plays_and_scores_an_immediate_win():
+    position, mask, n = bb.from_moves("445566")  # first player has three in the bottom row
+    agent = NegamaxAgent()
+    score, move = agent.search(position, mask, 1)
+    assert score == WIN - n
+    assert move in (2, 6)
+    assert agent.act(bb.to_array(position, mask, -1)) in (2, 6)
+
+
+def test_blocks_the_only_threat():
+    position, mask, n = bb.from_moves("17273")  # the first player threatens column 4 only
+    score, move = NegamaxAgent().search(position, mask, 4)
+    assert move == 3
+    assert abs(score) < WIN - 100
+
+
+def test_finds_a_forced_win_by_double_threat():
+    position, mask, n = bb.from_moves("3344")  # three in a row with both ends open after column 2 or 5
+    score, move = NegamaxAgent().search(position, mask, 3)
+    assert score == WIN - (n + 2)
+    assert move in (1, 4)
+
+
+def test_scores_a_lost_position():
+    position, mask, n = bb.from_moves("33445")  # the first player's double threat cannot be stopped
+    score, _ = NegamaxAgent().search(position, mask, 4)
+    assert score == -(WIN - (n + 1))
@@ -1,8 +1,16 @@
 from typing import Callable
 from connect4.dtos import Game, Match, Participant, Versus
 from connect4.connect_state import ConnectState
+from connect4.instrumentation import MoveTimer, print_performance_summary
+from connect4.isolation import IsolatedPolicy, MemoryLimit, MemoryLimitExceeded
+from connect4.match_cache import MatchCache
+from connect4.sprt import SPRT, likelihood_of_superiority
+from connect4.run_state import match_from_dict, read_json, restore_rng, rng_state, write_json_atomic
 import numpy as np
 
+# Matches played since the last call to `run_tournament`, used for the performance summary
+completed_matches: list[Match] = []
+
 
 def next_power_of_two(n: int) -> int:
     return 1 if n <= 1 else 1 << (n - 1).bit_length()
@@ -75,10 +83,18 @@ def play_round(
     best_of: int,
     first_player_distribution: float,
     seed: int,
+    winners: list[Participant] | None = None,
+    on_result: Callable[[list[Participant]], None] | None = None,
 ) -> list[Participant]:
-    """Run a round and return the list of winners (handles BYEs)."""
-    winners: list[Participant] = []
-    for a, b in versus:
+    """
+    Run a round and return the list of winners (handles BYEs).
+
+    `winners` are the results of the first pairings when resuming a round
+    that was interrupted; `on_result` is called with the winners so far
+    after every pairing.
+    """
+    winners = list(winners or [])
+    for a, b in versus[len(winners):]:
         if a is None and b is None:
             raise ValueError("Invalid match: two BYEs")
         if a is None:  # b advances
@@ -87,6 +103,8 @@ def play_round(
             winners.append(a)
         else:
             winners.append(play(a, b, best_of, first_player_distribution, seed))
+        if on_result is not None:
+            on_result(winners)
     return winners
 
 
@@ -101,8 +119,47 @@ def play(
     best_of: int,
     first_player_distribution: float,
     seed: int = 911,
+    sprt: SPRT | None = None,
+    memory: MemoryLimit | None = None,
+    cache: MatchCache | None = None,
 ) -> Participant:
-    """Play a match between two participants and return the winner."""
+    """
+    Play a match between two participants and return the winner.
+
+    With `cache`, a match already played with the same code and settings is
+    taken from it instead of being played again.
+    """
+    key = cache.key(a, b, best_of, first_player_distribution, seed, sprt, memory) if cache is not None else None
+    match = cache.get(key) if cache is not None else None
+    if match is None:
+        match = play_match(a, b, best_of, first_player_distribution, seed, sprt, memory)
+        if cache is not None:
+            cache.put(key, match)
+    else:
+        save_match(match)
+    completed_matches.append(match)
+    return a if match.winner == a[0] else b
+
+
+def play_match(
+    a: Participant,
+    b: Participant,
+    best_of: int,
+    first_player_distribution: float,
+    seed: int = 911,
+    sprt: SPRT | None = None,
+    memory: MemoryLimit | None = None,
+) -> Match:
+    """
+    Play a match between two participants, save it to `versus/` and return it.
+
+    By default the match ends when a player reaches `(best_of // 2) + 1`
+    wins. With `sprt`, `best_of` is ignored: games are played until the
+    sequential test accepts one of its hypotheses or `sprt.max_games` is
+    reached. With `memory`, each agent's memory per move and per game is
+    recorded, and with `memory.cap_mb` every agent runs in a worker
+    process with that cap: going over it loses the game.
+    """
     # Variables
     a_name, a_policy = a
     b_name, b_policy = b
@@ -116,51 +173,105 @@ def play(
     rng = np.random.default_rng(seed)
 
     games: list[Game] = []
+    results: list[int] = []
+    timer = MoveTimer(track_memory=memory is not None and memory.track)
+    memory_forfeits: dict[str, int] = {}
+
+    def instantiate(policy):
+        if memory is not None and memory.cap_mb is not None:
+            return IsolatedPolicy(policy, memory.cap_mb, memory.track)
+        return policy()
+
+    decision = None
 
-    while a_wins < games_to_win and b_wins < games_to_win:
+    def keep_playing() -> bool:
+        if sprt is not None:
+            return decision is None and total_games < sprt.max_games
+        return a_wins < games_to_win and b_wins < games_to_win
+
+    while keep_playing():
         total_games += 1
         # Decide who goes first based on the distribution
         if rng.random() < first_player_distribution:
             first_participant, second_participant = a, b
-            first_policy, second_policy = a_policy(), b_policy()
         else:
             first_participant, second_participant = b, a
-            first_policy, second_policy = b_policy(), a_policy()
-
-        # Mount agents
-        first_policy.mount()
-        second_policy.mount()
 
         state = ConnectState()
         game_history: Game = Game()
+        forfeit = 0  # colour that lost by exceeding its memory cap
+        first_policy = second_policy = None
+
+        try:
+            first_policy = instantiate(first_participant[1])
+            second_policy = instantiate(second_participant[1])
 
-        while not state.is_final():
-            current_policy = first_policy if state.player == -1 else second_policy
-            action = current_policy.act(state.board)
-            game_history.append((state.board.copy().tolist(), int(action)))
-            state = state.transition(int(action))
+            # Mount agents
+            current_name, current_colour = first_participant[0], -1
+            first_policy.mount()
+            current_name, current_colour = second_participant[0], 1
+            second_policy.mount()
+
+            while not state.is_final():
+                if state.player == -1:
+                    current_name, current_policy = first_participant[0], first_policy
+                else:
+                    current_name, current_policy = second_participant[0], second_policy
+                current_colour = state.player
+                action = timer.time_act(current_name, current_policy, state.view())
+                game_history.append((state.board.copy().tolist(), int(action)))
+                state = state.transition(int(action))
+        except MemoryLimitExceeded as e:
+            print(f"⚠ {current_name} pierde la partida por exceder la memoria: {e}")
+            forfeit = current_colour
+            memory_forfeits[current_name] = memory_forfeits.get(current_name, 0) + 1
+        finally:
+            # Any other agent error propagates, but workers and ponder threads stop first
+            for policy in (first_policy, second_policy):
+                if policy is not None:
+                    policy.close()
 
         games.append(game_history)
+        timer.end_game()
 
         # Determine winner
-        winner = state.get_winner()
+        winner = -forfeit if forfeit else state.get_winner()
         if winner == -1:
             if first_participant == a:
                 a_wins += 1
+                results.append(1)
             else:
                 b_wins += 1
+                results.append(-1)
         elif winner == 1:
             if second_participant == a:
                 a_wins += 1
+                results.append(1)
             else:
                 b_wins += 1
+                results.append(-1)
         else:
             draws += 1
+            results.append(0)
+
+        if sprt is not None:
+            decision = sprt.decide(a_wins, draws, b_wins)
+            continue
 
         # Early stopping in case of too many draws
         if draws >= games_to_win + 5:
             break
 
+    timer.stop_memory_tracking()
+
+    if decision == "H1":
+        winner_name = a_name
+    elif a_wins > 0 or b_wins > 0:  # accepting H0 does not show that b is stronger: decide on the games
+        winner_name = a_name if a_wins > b_wins else b_name
+    else:
+        # Decide winner at random in case of too many draws with no wins or tie
+        winner_name = a_name if rng.random() < 0.5 else b_name
+
     # Save match result
     match = Match(
         player_a=a_name,
@@ -169,17 +280,51 @@ def play(
         player_b_wins=b_wins,
         draws=draws,
         games=games,
+        results=results,
+        winner=winner_name,
+        confidence=likelihood_of_superiority(a_wins, b_wins) if winner_name == a_name
+        else likelihood_of_superiority(b_wins, a_wins),
+        sprt_llr=sprt.llr(a_wins, draws, b_wins) if sprt is not None else None,
+        sprt_decision=(decision or "cap") if sprt is not None else None,
+        move_times=dict(timer.latencies),
+        latency=timer.latency_summary(),
+        search_stats=timer.search_summary(),
+        book_hit_rate=timer.book_hit_rates(),
+        memory=timer.memory_summary(),
+        memory_forfeits=memory_forfeits,
+        wall_time=timer.elapsed,
+        moves_per_second=timer.moves_per_second(),
+        games_per_second=timer.games_per_second(),
     )
 
-    # Save to file
-    match_filename = f"match_{a_name}_vs_{b_name}.json"
-    with open("versus/" + match_filename, "w") as f:
+    save_match(match)
+    return match
+
+
+def match_path(player_a: str, player_b: str) -> str:
+    return f"versus/match_{player_a}_vs_{player_b}.json"
+
+
+def save_match(match: Match) -> None:
+    """Write a match to `versus/match_<a>_vs_<b>.json`."""
+    with open(match_path(match.player_a, match.player_b), "w") as f:
         f.write(match.model_dump_json(indent=4))
 
-    if a_wins > 0 or b_wins > 0:
-        return a if a_wins > b_wins else b
-    # Decide winner at random in case of too many draws with no wins or tie
-    return a if rng.random() < 0.5 else b
+
+RECORD_FIELDS = ("player_a", "player_b", "player_a_wins", "player_b_wins", "draws", "winner")
+
+
+def match_record(match: Match) -> dict:
+    """Names, scores and winner of a match: what the knockout state keeps of it."""
+    return {name: getattr(match, name) for name in RECORD_FIELDS}
+
+
+def load_match(record: dict) -> Match:
+    """The full match of a `match_record` from `versus/`, or just the record if the file is gone or replaced."""
+    data = read_json(match_path(record["player_a"], record["player_b"]))
+    if data is not None and all(data.get(name) == record[name] for name in RECORD_FIELDS):
+        return match_from_dict(data)
+    return Match(**record)
 
 
 def run_tournament(
@@ -189,6 +334,8 @@ def run_tournament(
     first_player_distribution: float = 0.5,
     shuffle: bool = True,
     seed: int = 911,
+    state_path: str | None = "standings/knockout.json",
+    resume: bool = False,
 ):
     """
     Run a tournament among the given players using the provided play function.
@@ -207,16 +354,70 @@ def run_tournament(
         Whether to shuffle initial pairings (default is True).
     seed : int, optional
         Random seed for reproducibility (default is 911).
+    state_path : str, optional
+        JSON file rewritten after every match with the bracket position,
+        the names, scores and winner of the completed matches (their games
+        are in `versus/`) and the random generator states.
+    resume : bool, optional
+        Continue from `state_path` if it exists (default is False). The
+        resumed tournament plays the same games as an uninterrupted one.
 
+    A per-agent latency and throughput summary of every match played is
+    printed once the champion is decided.
     """
-    versus = make_initial_matches(players, shuffle=shuffle, seed=seed)
-    print("Initial Matches:", versus)
+    by_name = {name: (name, policy) for name, policy in players}
+    config = {
+        "format": "knockout",
+        "players": sorted(by_name),
+        "best_of": best_of,
+        "first_player_distribution": first_player_distribution,
+        "shuffle": shuffle,
+        "seed": seed,
+    }
+    state = read_json(state_path) if resume and state_path else None
+
+    completed_matches.clear()
+    winners: list[Participant] = []
+    if state is not None:
+        if state["config"] != config:
+            raise ValueError(f"{state_path} belongs to a tournament with different players or settings")
+        completed_matches.extend(load_match(record) for record in state["matches"])
+        if state.get("champion"):
+            print(f"Tournament already finished, champion: {state['champion']}")
+            return by_name[state["champion"]]
+        versus = [(by_name.get(a), by_name.get(b)) for a, b in state["versus"]]
+        winners = [by_name[name] for name in state["winners"]]
+        restore_rng(state["rng"])
+        print(f"Resuming round {state['round']} after {len(winners)} of {len(versus)} matches")
+    else:
+        versus = make_initial_matches(players, shuffle=shuffle, seed=seed)
+        print("Initial Matches:", versus)
+    round_index = state["round"] if state is not None else 1
+
+    def save_state(round_winners: list[Participant], champion: str | None = None) -> None:
+        if not state_path:
+            return
+        write_json_atomic(state_path, {
+            "config": config,
+            "round": round_index,
+            "versus": [[a and a[0], b and b[0]] for a, b in versus],
+            "winners": [w[0] for w in round_winners],
+            "champion": champion,
+            "matches": [match_record(m) for m in completed_matches],
+            "rng": rng_state(),
+        })
+
     while True:
-        winners = play_round(versus, play, best_of, first_player_distribution, seed)
+        winners = play_round(versus, play, best_of, first_player_distribution, seed, winners, save_state)
         print("Winners this round:", winners)
         if len(winners) == 1:  # champion decided
+            save_state(winners, champion=winners[0][0])
+            print_performance_summary(completed_matches)
             return winners[0]
         versus = pair_next_round(winners)
+        winners = []
+        round_index += 1
+        save_state(winners)
         print("Next Matches:", versus)
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ y genera métricas detalladas del proceso de aprendizaje.
 
 import sys
 import os
+import argparse
 import numpy as np
 import random
 from datetime import datetime
@@ -21,6 +22,9 @@ from learning.q_learning_agent import QLearningAgent
 from connect4.policy import MCTSAgent
 from connect4.connect_state import ConnectState
 from connect4.environment_state import EnvironmentState
+from connect4.instrumentation import MoveTimer
+from learning.opponent_cache import CachedOpponent
+from learning.checkpoint import CheckpointWriter, discard_after, load_latest, load_run_state
 
 class TrainingEnvironment:
     """Entorno de entrenamiento para el agente Q-Learning"""
@@ -43,8 +47,12 @@ class TrainingEnvironment:
         
         return RandomAgent()
     
-    def play_game(self, agent1, agent2, verbose=False):
-        """Juega una partida entre dos agentes"""
+    def play_game(self, agent1, agent2, verbose=False, timer=None):
+        """Juega una partida entre dos agentes
+
+        Si se pasa un `MoveTimer`, cada llamada a `act` se cronometra bajo el
+        nombre de la clase del agente.
+        """
         # Inicializar el estado del juego
         board = np.zeros((6, 7), dtype=int)
         current_player = 1  # Empieza el jugador 1
@@ -65,7 +73,10 @@ class TrainingEnvironment:
             
             # Obtener acción válida
             try:
-                action = current_agent.act(state)
+                if timer is not None:
+                    action = timer.time_act(type(current_agent).__name__, current_agent, state)
+                else:
+                    action = current_agent.act(state)
                 if action not in state.valid_actions():
                     # Si la acción no es válida, elegir una aleatoria
                     action = random.choice(state.valid_actions())
@@ -91,12 +102,16 @@ class TrainingEnvironment:
                 # Juego terminado - alguien ganó
                 if verbose:
                     print(f" Jugador {winner} gana en {moves_count} movimientos!")
+                if timer is not None:
+                    timer.end_game()
                 return winner, moves_count, game_history, board
             
             # Verificar empate
             if len([col for col in range(7) if board[0][col] == 0]) == 0:
                 if verbose:
                     print(f" Empate después de {moves_count} movimientos")
+                if timer is not None:
+                    timer.end_game()
                 return 0, moves_count, game_history, board
             
             # Cambiar turno
@@ -142,8 +157,31 @@ class TrainingEnvironment:
         
         return 0
     
-    def train_q_learning(self, episodes=1000, save_freq=100, opponents=['random', 'mcts']):
-        """Entrena el agente Q-Learning"""
+    def train_q_learning(self, episodes=1000, save_freq=100, opponents=['random', 'mcts'], position_cache=None,
+                         opponent_cache=0, opponent_refresh=0.0, mcts_iterations=400,
+                         keep_checkpoints=3, full_every=5, seed=None, resume=False):
+        """Entrena el agente Q-Learning
+
+        Con `position_cache` el oponente MCTS reutiliza las búsquedas guardadas
+        en esa caché de posiciones (persistente y compartida entre procesos).
+
+        Con `opponent_cache` > 0 el oponente MCTS se envuelve en un
+        `CachedOpponent` de ese tamaño: cada posición se busca una vez y las
+        visitas siguientes muestrean una jugada de la distribución de visitas
+        guardada; `opponent_refresh` es la probabilidad de volver a buscar.
+
+        Los checkpoints (cada `save_freq` episodios) se escriben en segundo
+        plano con un `CheckpointWriter`: uno de cada `full_every` guarda la
+        tabla Q completa y el resto solo las entradas modificadas; se
+        conservan los últimos `keep_checkpoints` completos.
+
+        Cada checkpoint guarda también el estado de la ejecución (episodio,
+        epsilon, estado de los generadores aleatorios, métricas y memoria del
+        oponente). Con `resume` el entrenamiento continúa desde el último
+        checkpoint y produce los mismos resultados que una ejecución sin
+        interrupciones (salvo con `position_cache`, que se sigue modificando
+        fuera del checkpoint). `seed` fija los generadores al empezar.
+        """
         print(f" Iniciando entrenamiento Q-Learning por {episodes} episodios...")
         
         # Crear agente Q-Learning
@@ -162,7 +200,9 @@ class TrainingEnvironment:
         if 'random' in opponents:
             opponents_pool['Random'] = self.create_random_agent()
         if 'mcts' in opponents:
-            mcts_agent = MCTSAgent()
+            mcts_agent = MCTSAgent(iterations=mcts_iterations, position_cache=position_cache)
+            if opponent_cache > 0:
+                mcts_agent = CachedOpponent(mcts_agent, max_size=opponent_cache, refresh=opponent_refresh)
             mcts_agent.mount()
             opponents_pool['MCTS'] = mcts_agent
         
@@ -170,86 +210,130 @@ class TrainingEnvironment:
         
         # Entrenamiento
         checkpoint_data = []
+        timer = MoveTimer()
+        start_episode = 0
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed)
+
+        state = load_run_state("models") if resume else None
+        if state is not None:
+            start_episode = state['episode']
+            _, q_agent.q_table = load_latest("models", upto=start_episode)
+            discard_after("models", start_episode)
+            q_agent.epsilon = state['epsilon']
+            q_agent.training_metrics = state['metrics']
+            checkpoint_data = state['checkpoint_data']
+            if state['opponent_cache'] is not None and isinstance(opponents_pool.get('MCTS'), CachedOpponent):
+                opponents_pool['MCTS'].entries = state['opponent_cache']
+            random.setstate(state['random_state'])
+            np.random.set_state(state['numpy_state'])
+            print(f" Reanudando desde el episodio {start_episode} ({len(q_agent.q_table)} entradas en la tabla Q)")
+        elif resume:
+            print(" No hay estado guardado en models/, empezando desde cero")
+
+        writer = CheckpointWriter("models", "metrics", keep=keep_checkpoints, full_every=full_every)
         
-        for episode in range(episodes):
-            # Seleccionar oponente aleatoriamente
-            opponent_name, opponent = random.choice(list(opponents_pool.items()))
+        # Los checkpoints pendientes se escriben aunque el entrenamiento falle o se interrumpa
+        try:
+            for episode in range(start_episode, episodes):
+                # Seleccionar oponente aleatoriamente
+                opponent_name, opponent = random.choice(list(opponents_pool.items()))
             
-            # Decidir quién juega primero (50/50)
-            q_agent_goes_first = random.choice([True, False])
+                # Decidir quién juega primero (50/50)
+                q_agent_goes_first = random.choice([True, False])
             
-            if q_agent_goes_first:
-                winner, moves, history, final_board = self.play_game(q_agent, opponent)
-                q_agent_player = 1
-            else:
-                winner, moves, history, final_board = self.play_game(opponent, q_agent)
-                q_agent_player = -1
+                if q_agent_goes_first:
+                    winner, moves, history, final_board = self.play_game(q_agent, opponent, timer=timer)
+                    q_agent_player = 1
+                else:
+                    winner, moves, history, final_board = self.play_game(opponent, q_agent, timer=timer)
+                    q_agent_player = -1
             
-            # Calcular recompensas y actualizar Q-Learning
-            total_reward = 0
-            if hasattr(q_agent, 'training_metrics'):
-                for i, move_info in enumerate(history):
-                    if move_info['player'] == q_agent_player:
-                        # Calcular recompensa
-                        if winner == q_agent_player:
-                            reward = 10  # Victoria
-                        elif winner == -q_agent_player:
-                            reward = -10  # Derrota
-                        else:
-                            reward = 0  # Empate
+                # Calcular recompensas y actualizar Q-Learning
+                total_reward = 0
+                if hasattr(q_agent, 'training_metrics'):
+                    for i, move_info in enumerate(history):
+                        if move_info['player'] == q_agent_player:
+                            # Calcular recompensa
+                            if winner == q_agent_player:
+                                reward = 10  # Victoria
+                            elif winner == -q_agent_player:
+                                reward = -10  # Derrota
+                            else:
+                                reward = 0  # Empate
                         
-                        # Recompensa por movimiento (pequeña penalización por juegos largos)
-                        reward += -0.1
+                            # Recompensa por movimiento (pequeña penalización por juegos largos)
+                            reward += -0.1
                         
-                        total_reward += reward
+                            total_reward += reward
                         
-                        # Actualizar Q-table (simplificado)
-                        state_key = q_agent.get_state_key(move_info['state'])
-                        if i < len(history) - 1:
-                            next_state = history[i+1]['state'] if i+1 < len(history) else final_board
-                            next_valid = [col for col in range(7) if next_state[0][col] == 0]
-                            q_agent.update(move_info['state'], move_info['action'], reward, next_state, next_valid)
+                            # Actualizar Q-table (simplificado)
+                            state_key = q_agent.get_state_key(move_info['state'])
+                            if i < len(history) - 1:
+                                next_state = history[i+1]['state'] if i+1 < len(history) else final_board
+                                next_valid = [col for col in range(7) if next_state[0][col] == 0]
+                                q_agent.update(move_info['state'], move_info['action'], reward, next_state, next_valid)
                 
-                # Actualizar métricas
-                if winner == q_agent_player:
-                    result = 'win'
-                elif winner == -q_agent_player:
-                    result = 'loss'
-                else:
-                    result = 'draw'
+                    # Actualizar métricas
+                    if winner == q_agent_player:
+                        result = 'win'
+                    elif winner == -q_agent_player:
+                        result = 'loss'
+                    else:
+                        result = 'draw'
                 
-                q_agent.update_metrics(result, moves, total_reward)
+                    q_agent.update_metrics(result, moves, total_reward)
             
-            # Decay epsilon
-            q_agent.decay_epsilon()
+                # Decay epsilon
+                q_agent.decay_epsilon()
             
-            # Checkpoint cada save_freq episodios
-            if (episode + 1) % save_freq == 0:
-                metrics = q_agent.get_metrics_report()
-                checkpoint_data.append({
-                    'episode': episode + 1,
-                    'win_rate': metrics['win_rate'],
-                    'epsilon': q_agent.epsilon,
-                    'q_table_size': len(q_agent.q_table)
-                })
+                # Checkpoint cada save_freq episodios
+                if (episode + 1) % save_freq == 0:
+                    metrics = q_agent.get_metrics_report()
+                    checkpoint_data.append({
+                        'episode': episode + 1,
+                        'win_rate': metrics['win_rate'],
+                        'epsilon': q_agent.epsilon,
+                        'q_table_size': len(q_agent.q_table)
+                    })
                 
-                print(f" Episodio {episode + 1}/{episodes}")
-                print(f"   Win Rate: {metrics['win_rate']:.1%}")
-                print(f"   Epsilon: {q_agent.epsilon:.3f}")
-                print(f"   Q-Table: {len(q_agent.q_table)} estados")
+                    print(f" Episodio {episode + 1}/{episodes}")
+                    print(f"   Win Rate: {metrics['win_rate']:.1%}")
+                    print(f"   Epsilon: {q_agent.epsilon:.3f}")
+                    print(f"   Q-Table: {len(q_agent.q_table)} estados")
+                    print(f"   Velocidad: {timer.games_per_second():.2f} episodios/s, {timer.moves_per_second():.1f} movimientos/s")
+                    if isinstance(opponents_pool.get('MCTS'), CachedOpponent):
+                        print(f"   Caché del oponente: {opponents_pool['MCTS'].hit_rate:.1%} aciertos, "
+                              f"{len(opponents_pool['MCTS'].entries)} posiciones")
                 
-                # Guardar progreso
-                q_agent.save(f"models/q_agent_episode_{episode + 1}.pkl")
-                q_agent.save_metrics(f"metrics/training_metrics_episode_{episode + 1}.json")
-        
+                    # Guardar progreso (en segundo plano)
+                    memo = opponents_pool.get('MCTS')
+                    writer.submit(episode + 1, q_agent, {
+                        'episode': episode + 1,
+                        'epsilon': q_agent.epsilon,
+                        'random_state': random.getstate(),
+                        'numpy_state': np.random.get_state(),
+                        'metrics': {k: list(v) if isinstance(v, list) else v for k, v in q_agent.training_metrics.items()},
+                        'checkpoint_data': list(checkpoint_data),
+                        'opponent_cache': memo.entries.copy() if isinstance(memo, CachedOpponent) else None,
+                    })
+        finally:
+            writer.close()
+
         # Entrenamiento completado
         print(f"\nEntrenamiento completado!")
         q_agent.print_training_summary()
+        self.print_timing_summary(timer)
+        if isinstance(opponents_pool.get('MCTS'), CachedOpponent):
+            stats = opponents_pool['MCTS'].stats()
+            print(
+                f"   Caché del oponente MCTS: {stats['hit_rate']:.1%} aciertos ({stats['hits']} aciertos, "
+                f"{stats['misses']} búsquedas, {stats['refreshes']} refrescos), "
+                f"{stats['entries']}/{stats['capacity']} posiciones, {stats['evictions']} desalojos"
+            )
         
         # Guardar modelo final
-        os.makedirs("models", exist_ok=True)
-        os.makedirs("metrics", exist_ok=True)
-        
         q_agent.save("models/q_agent_final.pkl")
         q_agent.save_metrics("metrics/training_metrics_final.json")
         
@@ -259,8 +343,45 @@ class TrainingEnvironment:
         
         return q_agent, checkpoint_data
 
+    def print_timing_summary(self, timer):
+        """Imprime latencias por agente y throughput del entrenamiento"""
+        print(f"\n⏱ Rendimiento: {timer.games_per_second():.2f} episodios/s, {timer.moves_per_second():.1f} movimientos/s")
+        for name, s in timer.latency_summary().items():
+            print(
+                f"   {name}: p50={s['p50'] * 1e3:.2f}ms p95={s['p95'] * 1e3:.2f}ms "
+                f"p99={s['p99'] * 1e3:.2f}ms max={s['max'] * 1e3:.2f}ms ({s['count']} movimientos)"
+            )
+        for name, counters in timer.search_summary().items():
+            print(f"   {name}: " + ", ".join(f"{k}/mov={v:.1f}" for k, v in counters.items()))
+
 def main():
     """Función principal"""
+    parser = argparse.ArgumentParser(description="Entrenamiento Q-Learning para Connect 4")
+    parser.add_argument('--episodes', type=int, default=2000, help='Número de episodios')
+    parser.add_argument('--save-freq', type=int, default=200, help='Frecuencia de guardado en episodios')
+    parser.add_argument('--opponents', nargs='+', choices=['random', 'mcts'], default=['random', 'mcts'],
+                        help='Oponentes de entrenamiento')
+    parser.add_argument('--position-cache', default=None, metavar='PATH',
+                        help='Caché de posiciones persistente para el oponente MCTS (p.ej. .cache/positions.bin)')
+    parser.add_argument('--keep-checkpoints', type=int, default=3, metavar='K',
+                        help='Checkpoints completos de la tabla Q que se conservan')
+    parser.add_argument('--full-every', type=int, default=5, metavar='N',
+                        help='Uno de cada N checkpoints guarda la tabla Q completa; el resto, solo los cambios')
+    parser.add_argument('--seed', type=int, default=None, help='Semilla de los generadores aleatorios')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continuar desde el último checkpoint en models/ (mismos resultados que sin interrupción)')
+    parser.add_argument('--opponent-cache', type=int, default=0, metavar='SIZE',
+                        help='Memorizar hasta SIZE posiciones del oponente MCTS y muestrear sus visitas (0 = sin caché)')
+    parser.add_argument('--opponent-refresh', type=float, default=0.0, metavar='P',
+                        help='Probabilidad de volver a buscar una posición memorizada del oponente MCTS')
+    parser.add_argument('--mcts-iterations', type=int, default=400,
+                        help='Iteraciones por jugada del oponente MCTS')
+    parser.add_argument('--profile', nargs='?', const='profiles/training', default=None, metavar='PREFIX',
+                        help='Perfilar el entrenamiento y escribir PREFIX.pstats, PREFIX.collapsed y PREFIX_top.txt')
+    parser.add_argument('--profile-top', type=int, default=25,
+                        help='Número de funciones en el reporte de hot spots')
+    args = parser.parse_args()
+
     print(" Entrenamiento de Agente Q-Learning para Connect 4")
     print("=" * 50)
     
@@ -268,9 +389,9 @@ def main():
     env = TrainingEnvironment()
     
     # Configurar entrenamiento
-    episodes = 2000
-    save_frequency = 200
-    opponents = ['random', 'mcts']
+    episodes = args.episodes
+    save_frequency = args.save_freq
+    opponents = args.opponents
     
     print(f"  Configuración:")
     print(f"   Episodios: {episodes}")
@@ -280,11 +401,29 @@ def main():
     
     # Ejecutar entrenamiento
     try:
-        trained_agent, checkpoint_data = env.train_q_learning(
-            episodes=episodes,
-            save_freq=save_frequency,
-            opponents=opponents
-        )
+        def training():
+            return env.train_q_learning(
+                episodes=episodes,
+                save_freq=save_frequency,
+                opponents=opponents,
+                position_cache=args.position_cache,
+                opponent_cache=args.opponent_cache,
+                opponent_refresh=args.opponent_refresh,
+                mcts_iterations=args.mcts_iterations,
+                keep_checkpoints=args.keep_checkpoints,
+                full_every=args.full_every,
+                seed=args.seed,
+                resume=args.resume
+            )
+
+        if args.profile:
+            from connect4.profiling import profile_run
+            participants = [("Q-Learning", QLearningAgent), ("MCTS", MCTSAgent)]
+            trained_agent, checkpoint_data = profile_run(
+                training, args.profile, participants=participants, top_n=args.profile_top
+            )
+        else:
+            trained_agent, checkpoint_data = training()
         
         print(f"\n Entrenamiento exitoso!")
         print(f" Archivos generados:")